@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+Generates load on a Concent server by simulating concurrent pairs of providers and requestors, each with its own keys,
+running complete protocol flows:
+
+1. ForceReportComputedTask -> receive -> AckReportComputedTask -> receive,
+2. ForceSubtaskResults -> receive -> ForceSubtaskResultsResponse -> receive,
+3. ForcePayment -> receive.
+
+Reports throughput and latency percentiles of each request type. Meant to be run against a local server
+which uses the mock payment backend, e.g.:
+
+    ./api-load-test.py http://127.0.0.1:8000 --clients 20 --rate 5 --duration 60
+"""
+from threading import Lock
+from threading import Thread
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Type
+import argparse
+import math
+import os
+import sys
+import time
+
+from golem_messages import message
+from golem_messages.factories.tasks import ComputeTaskDefFactory
+from golem_messages.factories.tasks import TaskToComputeFactory
+from golem_messages.factories.tasks import WantToComputeTaskFactory
+from golem_messages.message import Message
+from golem_messages.shortcuts import dump
+from golem_messages.utils import encode_hex
+import requests
+
+from api_testing_common import PROVIDER_ETHEREUM_PUBLIC_KEY
+from api_testing_common import REPORT_COMPUTED_TASK_SIZE
+from api_testing_common import REQUEST_HEADERS
+from api_testing_common import REQUESTOR_ETHEREUM_PRIVATE_KEY
+from api_testing_common import REQUESTOR_ETHEREUM_PUBLIC_KEY
+from api_testing_common import create_client_auth_message
+from api_testing_common import try_to_decode_golem_message
+from common.helpers import get_current_utc_timestamp
+from common.helpers import sign_message
+from common.testing_helpers import generate_ecc_key_pair
+from core.utils import calculate_maximum_download_time
+from protocol_constants import ProtocolConstants
+from protocol_constants import get_protocol_constants
+from protocol_constants import print_protocol_constants
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "concent_api.settings")
+
+# Maximum number of `receive` calls made while waiting for a message which should already be queued.
+MAXIMUM_NUMBER_OF_RECEIVE_ATTEMPTS = 10
+
+# Time between `receive` calls made while waiting for a message (seconds).
+RECEIVE_RETRY_INTERVAL = 0.1
+
+# Time in the past used as payment_ts in ForcePayment, so that the payment is overdue (seconds).
+AVERAGE_TIME_FOR_TWO_BLOCKS = 30
+
+# Percentiles of latency printed in the report.
+REPORTED_PERCENTILES = (50, 95, 99)
+
+SimulatedClients = NamedTuple(
+    'SimulatedClients',
+    [
+        ('provider_private_key', bytes),
+        ('provider_public_key', bytes),
+        ('requestor_private_key', bytes),
+        ('requestor_public_key', bytes),
+    ]
+)
+
+
+class FlowFailed(Exception):
+    pass
+
+
+class LatencyRecorder:
+    """ Collects latencies and failures of requests made by all simulated clients. """
+
+    def __init__(self) -> None:
+        self.latencies = {}  # type: Dict[str, List[float]]
+        self.failures = {}  # type: Dict[str, int]
+        self._lock = Lock()
+
+    def record(self, request_type: str, latency: float, failed: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(request_type, []).append(latency)
+            if failed:
+                self.failures[request_type] = self.failures.get(request_type, 0) + 1
+
+    def print_report(self, elapsed_time: float, number_of_flows: int, number_of_failed_flows: int) -> None:
+        print(f'Flows: {number_of_flows} completed, {number_of_failed_flows} failed in {elapsed_time:.1f} s '
+              f'({number_of_flows / elapsed_time:.2f} flows/s)')
+        percentile_headers = ' '.join(f'{f"p{percentile} [ms]":>10}' for percentile in REPORTED_PERCENTILES)
+        print(f'{"Request":60} {"count":>7} {"failed":>7} {"req/s":>8} {percentile_headers}')
+        for request_type, latencies in sorted(self.latencies.items()):
+            sorted_latencies = sorted(latencies)
+            percentile_values = ' '.join(
+                f'{get_percentile(sorted_latencies, percentile) * 1000:10.1f}' for percentile in REPORTED_PERCENTILES
+            )
+            print(
+                f'{request_type:60} {len(latencies):7} {self.failures.get(request_type, 0):7} '
+                f'{len(latencies) / elapsed_time:8.2f} {percentile_values}'
+            )
+
+
+class FlowScheduler:
+    """
+    Hands out start times of flows to simulated clients so that flows start at the target rate in total.
+    Rate equal to 0 means that flows start as soon as a simulated client is free.
+    """
+
+    def __init__(self, rate: float, duration: float, maximum_number_of_flows: Optional[int]) -> None:
+        self.rate = rate
+        self.end_time = time.monotonic() + duration
+        self.maximum_number_of_flows = maximum_number_of_flows
+        self.number_of_scheduled_flows = 0
+        self._next_start_time = time.monotonic()
+        self._lock = Lock()
+
+    def wait_for_next_flow(self) -> bool:
+        with self._lock:
+            if self.maximum_number_of_flows is not None and self.number_of_scheduled_flows >= self.maximum_number_of_flows:
+                return False
+            start_time = max(self._next_start_time, time.monotonic())
+            if start_time >= self.end_time:
+                return False
+            if self.rate > 0:
+                self._next_start_time = start_time + 1 / self.rate
+            self.number_of_scheduled_flows += 1
+        time.sleep(max(0.0, start_time - time.monotonic()))
+        return True
+
+
+def get_percentile(sorted_values: List[float], percentile: int) -> float:
+    """ Returns the percentile of already sorted values using the nearest-rank method. """
+    assert len(sorted_values) > 0
+    return sorted_values[max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+
+def send_request(
+    session: requests.Session,
+    cluster_url: str,
+    endpoint: str,
+    data: bytes,
+    private_key: bytes,
+    request_type: str,
+    recorder: LatencyRecorder,
+    expected_status: int,
+    expected_message_type: Optional[Type[Message]],
+) -> Optional[Message]:
+    start_time = time.perf_counter()
+    try:
+        response = session.post(f'{cluster_url}/api/v1/{endpoint}/', headers=REQUEST_HEADERS, data=data, verify=False)
+    except requests.exceptions.RequestException as exception:
+        recorder.record(request_type, time.perf_counter() - start_time, failed=True)
+        raise FlowFailed(f'{request_type}: {exception}')
+    latency = time.perf_counter() - start_time
+
+    if response.status_code == 204 and expected_message_type is not None:
+        recorder.record(f'{request_type} (queue empty)', latency, failed=False)
+        return None
+    response_message = None
+    if response.headers.get('Content-Type') == 'application/octet-stream':
+        response_message = try_to_decode_golem_message(private_key, CONCENT_PUBLIC_KEY, response.content)
+    failed = (
+        response.status_code != expected_status or
+        (expected_message_type is not None and not isinstance(response_message, expected_message_type))
+    )
+    recorder.record(request_type, latency, failed=failed)
+    if failed:
+        raise FlowFailed(
+            f'{request_type}: expected HTTP {expected_status} and {expected_message_type}, '
+            f'got HTTP {response.status_code} and {type(response_message).__name__}: {response.content[:200]!r}'
+        )
+    return response_message
+
+
+def send_message(
+    session: requests.Session,
+    cluster_url: str,
+    golem_message: Message,
+    private_key: bytes,
+    recorder: LatencyRecorder,
+    expected_status: int = 202,
+    expected_message_type: Optional[Type[Message]] = None,
+) -> Optional[Message]:
+    return send_request(
+        session,
+        cluster_url,
+        'send',
+        dump(golem_message, private_key, CONCENT_PUBLIC_KEY),
+        private_key,
+        f'send {type(golem_message).__name__}',
+        recorder,
+        expected_status,
+        expected_message_type,
+    )
+
+
+def receive_message(
+    session: requests.Session,
+    cluster_url: str,
+    private_key: bytes,
+    public_key: bytes,
+    recorder: LatencyRecorder,
+    expected_message_type: Type[Message],
+) -> Message:
+    for _ in range(MAXIMUM_NUMBER_OF_RECEIVE_ATTEMPTS):
+        received_message = send_request(
+            session,
+            cluster_url,
+            'receive',
+            create_client_auth_message(private_key, public_key, CONCENT_PUBLIC_KEY),
+            private_key,
+            f'receive {expected_message_type.__name__}',
+            recorder,
+            200,
+            expected_message_type,
+        )
+        if received_message is not None:
+            return received_message
+        time.sleep(RECEIVE_RETRY_INTERVAL)
+    raise FlowFailed(f'receive {expected_message_type.__name__}: message not queued after {MAXIMUM_NUMBER_OF_RECEIVE_ATTEMPTS} attempts')
+
+
+def set_timestamp(golem_message: Message, timestamp: int) -> Message:
+    """
+    Sets the timestamp in the header of a message which is not signed yet. The helpers in api_testing_common use
+    freezegun instead but it patches time globally and is not safe to use in several threads at once. It would also
+    freeze the clocks other threads use to measure latencies and to schedule flows.
+    """
+    assert golem_message.sig is None
+    golem_message.header = golem_message.header._replace(timestamp=timestamp)
+    return golem_message
+
+
+def sign_message_with_timestamp(golem_message: Message, timestamp: int, private_key: bytes) -> Message:
+    return sign_message(set_timestamp(golem_message, timestamp), private_key)
+
+
+def create_signed_task_to_compute(
+    timestamp: int,
+    deadline: int,
+    clients: SimulatedClients,
+) -> message.tasks.TaskToCompute:
+    want_to_compute_task = sign_message_with_timestamp(
+        WantToComputeTaskFactory(
+            provider_public_key=encode_hex(clients.provider_public_key),
+            provider_ethereum_public_key=encode_hex(PROVIDER_ETHEREUM_PUBLIC_KEY),
+        ),
+        timestamp,
+        clients.provider_private_key,
+    )
+    task_to_compute = TaskToComputeFactory(
+        requestor_public_key=encode_hex(clients.requestor_public_key),
+        compute_task_def=ComputeTaskDefFactory(
+            deadline=deadline,
+            extra_data={
+                'output_format': 'png',
+                'scene_file': '/golem/resources/golem-header-light.blend',
+                'frames': [1],
+                'script_src': None,
+            }
+        ),
+        want_to_compute_task=want_to_compute_task,
+        requestor_ethereum_public_key=encode_hex(REQUESTOR_ETHEREUM_PUBLIC_KEY),
+        price=1000,
+        size=1,
+        package_hash='sha1:57786d92d1a6f7eaaba1c984db5e108c68b03f0d',
+    )
+    set_timestamp(task_to_compute, timestamp)
+    task_to_compute.generate_ethsig(REQUESTOR_ETHEREUM_PRIVATE_KEY)
+    return sign_message(task_to_compute, clients.requestor_private_key)
+
+
+def create_signed_report_computed_task(
+    task_to_compute: message.tasks.TaskToCompute,
+    timestamp: int,
+    clients: SimulatedClients,
+) -> message.tasks.ReportComputedTask:
+    return sign_message_with_timestamp(
+        message.tasks.ReportComputedTask(
+            task_to_compute=task_to_compute,
+            size=REPORT_COMPUTED_TASK_SIZE,
+        ),
+        timestamp,
+        clients.provider_private_key,
+    )
+
+
+def create_signed_subtask_results_accepted(
+    report_computed_task: message.tasks.ReportComputedTask,
+    payment_ts: int,
+    timestamp: int,
+    clients: SimulatedClients,
+) -> message.tasks.SubtaskResultsAccepted:
+    return sign_message_with_timestamp(
+        message.tasks.SubtaskResultsAccepted(
+            payment_ts=payment_ts,
+            report_computed_task=report_computed_task,
+        ),
+        timestamp,
+        clients.requestor_private_key,
+    )
+
+
+def get_subtask_verification_time(cluster_consts: ProtocolConstants) -> int:
+    maximum_download_time = calculate_maximum_download_time(
+        size=REPORT_COMPUTED_TASK_SIZE,
+        rate=cluster_consts.minimum_upload_rate,
+    )
+    return 4 * cluster_consts.concent_messaging_time + 3 * maximum_download_time
+
+
+def run_force_report_computed_task_flow(
+    session: requests.Session,
+    cluster_url: str,
+    clients: SimulatedClients,
+    recorder: LatencyRecorder,
+) -> None:
+    current_time = get_current_utc_timestamp()
+    report_computed_task = create_signed_report_computed_task(
+        task_to_compute=create_signed_task_to_compute(
+            timestamp=current_time,
+            deadline=current_time + 100,
+            clients=clients,
+        ),
+        timestamp=current_time,
+        clients=clients,
+    )
+    send_message(
+        session,
+        cluster_url,
+        message.concents.ForceReportComputedTask(report_computed_task=report_computed_task),
+        clients.provider_private_key,
+        recorder,
+    )
+    receive_message(
+        session,
+        cluster_url,
+        clients.requestor_private_key,
+        clients.requestor_public_key,
+        recorder,
+        message.concents.ForceReportComputedTask,
+    )
+    send_message(
+        session,
+        cluster_url,
+        message.tasks.AckReportComputedTask(report_computed_task=report_computed_task),
+        clients.requestor_private_key,
+        recorder,
+    )
+    receive_message(
+        session,
+        cluster_url,
+        clients.provider_private_key,
+        clients.provider_public_key,
+        recorder,
+        message.concents.ForceReportComputedTaskResponse,
+    )
+
+
+def run_force_subtask_results_flow(
+    session: requests.Session,
+    cluster_url: str,
+    cluster_consts: ProtocolConstants,
+    clients: SimulatedClients,
+    recorder: LatencyRecorder,
+) -> None:
+    # The task must have been computed long enough ago for ForceSubtaskResults to be accepted now.
+    current_time = get_current_utc_timestamp()
+    subtask_verification_time = get_subtask_verification_time(cluster_consts)
+    report_computed_task = create_signed_report_computed_task(
+        task_to_compute=create_signed_task_to_compute(
+            timestamp=current_time - (2 * cluster_consts.concent_messaging_time + subtask_verification_time),
+            deadline=current_time - (cluster_consts.concent_messaging_time + subtask_verification_time),
+            clients=clients,
+        ),
+        timestamp=current_time,
+        clients=clients,
+    )
+    send_message(
+        session,
+        cluster_url,
+        message.concents.ForceSubtaskResults(
+            ack_report_computed_task=sign_message_with_timestamp(
+                message.tasks.AckReportComputedTask(report_computed_task=report_computed_task),
+                current_time,
+                clients.requestor_private_key,
+            ),
+        ),
+        clients.provider_private_key,
+        recorder,
+    )
+    receive_message(
+        session,
+        cluster_url,
+        clients.requestor_private_key,
+        clients.requestor_public_key,
+        recorder,
+        message.concents.ForceSubtaskResults,
+    )
+    send_message(
+        session,
+        cluster_url,
+        message.concents.ForceSubtaskResultsResponse(
+            subtask_results_accepted=create_signed_subtask_results_accepted(
+                report_computed_task=report_computed_task,
+                payment_ts=current_time + 1,
+                timestamp=current_time,
+                clients=clients,
+            ),
+        ),
+        clients.requestor_private_key,
+        recorder,
+    )
+    receive_message(
+        session,
+        cluster_url,
+        clients.provider_private_key,
+        clients.provider_public_key,
+        recorder,
+        message.concents.ForceSubtaskResultsResponse,
+    )
+
+
+def run_force_payment_flow(
+    session: requests.Session,
+    cluster_url: str,
+    cluster_consts: ProtocolConstants,
+    clients: SimulatedClients,
+    recorder: LatencyRecorder,
+) -> None:
+    current_time = get_current_utc_timestamp()
+    subtask_results_accepted_list = [
+        create_signed_subtask_results_accepted(
+            report_computed_task=create_signed_report_computed_task(
+                task_to_compute=create_signed_task_to_compute(
+                    timestamp=current_time,
+                    deadline=current_time,
+                    clients=clients,
+                ),
+                timestamp=current_time,
+                clients=clients,
+            ),
+            payment_ts=current_time - cluster_consts.payment_due_time - AVERAGE_TIME_FOR_TWO_BLOCKS,
+            timestamp=current_time,
+            clients=clients,
+        )
+        for _ in range(2)
+    ]
+    send_message(
+        session,
+        cluster_url,
+        message.concents.ForcePayment(subtask_results_accepted_list=subtask_results_accepted_list),
+        clients.provider_private_key,
+        recorder,
+        expected_status=200,
+        expected_message_type=message.concents.ForcePaymentCommitted,
+    )
+    receive_message(
+        session,
+        cluster_url,
+        clients.requestor_private_key,
+        clients.requestor_public_key,
+        recorder,
+        message.concents.ForcePaymentCommitted,
+    )
+
+
+class SimulatedClientsThread(Thread):
+    """ Runs complete protocol flows of one provider and one requestor, one flow at a time. """
+
+    def __init__(
+        self,
+        cluster_url: str,
+        cluster_consts: ProtocolConstants,
+        scheduler: FlowScheduler,
+        recorder: LatencyRecorder,
+    ) -> None:
+        super().__init__(daemon=True)
+        (provider_private_key, provider_public_key) = generate_ecc_key_pair()
+        (requestor_private_key, requestor_public_key) = generate_ecc_key_pair()
+        self.clients = SimulatedClients(
+            provider_private_key,
+            provider_public_key,
+            requestor_private_key,
+            requestor_public_key,
+        )
+        self.cluster_url = cluster_url
+        self.cluster_consts = cluster_consts
+        self.scheduler = scheduler
+        self.recorder = recorder
+        self.number_of_flows = 0
+        self.number_of_failed_flows = 0
+
+    def run(self) -> None:
+        session = requests.Session()
+        while self.scheduler.wait_for_next_flow():
+            try:
+                run_force_report_computed_task_flow(session, self.cluster_url, self.clients, self.recorder)
+                run_force_subtask_results_flow(session, self.cluster_url, self.cluster_consts, self.clients, self.recorder)
+                run_force_payment_flow(session, self.cluster_url, self.cluster_consts, self.clients, self.recorder)
+                self.number_of_flows += 1
+            except FlowFailed as exception:
+                self.number_of_failed_flows += 1
+                print(f'Flow failed: {exception}', file=sys.stderr)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cluster_url')
+    parser.add_argument('--clients', type=int, default=10, help='Number of simulated provider and requestor pairs running flows concurrently.')
+    parser.add_argument('--rate', type=float, default=0, help='Target number of flows started per second in total. 0 means no limit.')
+    parser.add_argument('--duration', type=float, default=60, help='Time during which new flows are started (seconds).')
+    parser.add_argument('--flows', type=int, default=None, help='Maximum number of flows started in total.')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    cluster_consts = get_protocol_constants(args.cluster_url)
+    print_protocol_constants(cluster_consts)
+
+    recorder = LatencyRecorder()
+    scheduler = FlowScheduler(args.rate, args.duration, args.flows)
+    threads = [SimulatedClientsThread(args.cluster_url, cluster_consts, scheduler, recorder) for _ in range(args.clients)]
+    start_time = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    recorder.print_report(
+        time.monotonic() - start_time,
+        sum(thread.number_of_flows for thread in threads),
+        sum(thread.number_of_failed_flows for thread in threads),
+    )
+
+
+if __name__ == '__main__':
+    try:
+        from concent_api.settings import CONCENT_PUBLIC_KEY
+        main()
+    except requests.exceptions.ConnectionError as exception:
+        print("\nERROR: Failed connect to the server.\n", file=sys.stderr)
+        sys.exit(exception)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compares the cost of signing messages which Concent signs itself while building responses
+using `sign_message()` with the previous approach (serializing signed message and deserializing it again).
+"""
+import argparse
+import os
+import timeit
+from typing import Callable
+from typing import List
+
+from golem_messages import message
+from golem_messages.factories.concents import FileTransferTokenFactory
+from golem_messages.factories.tasks import AckReportComputedTaskFactory
+
+from common.helpers import deserialize_message
+from common.helpers import sign_message
+from common.testing_helpers import generate_ecc_key_pair
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "concent_api.settings")
+
+(CONCENT_PRIVATE_KEY, _) = generate_ecc_key_pair()
+
+# Messages signed by Concent for given PendingResponse types.
+MESSAGE_FACTORIES_FOR_RESPONSE_TYPES = {
+    'ForceReportComputedTaskResponse (ConcentAck)': AckReportComputedTaskFactory,
+    'VerdictReportComputedTask': AckReportComputedTaskFactory,
+    'ForceGetTaskResultUpload': FileTransferTokenFactory,
+    'ForceGetTaskResultDownload': FileTransferTokenFactory,
+}
+
+
+def sign_message_with_deserialization(golem_message: message.Message, priv_key: bytes) -> message.Message:
+    return deserialize_message(golem_message.serialize(sign_as=priv_key))
+
+
+def measure(signing_function: Callable, unsigned_messages: List[message.Message]) -> float:
+    messages_to_sign = iter(unsigned_messages)
+    return timeit.timeit(
+        lambda: signing_function(next(messages_to_sign), CONCENT_PRIVATE_KEY),
+        number=len(unsigned_messages),
+    ) / len(unsigned_messages)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500, help='Number of messages signed in each measurement.')
+    args = parser.parse_args()
+
+    print(f'{"Response type":50} {"serialize+deserialize":>22} {"sign_message":>14} {"saving":>8}')
+    for response_type, message_factory in MESSAGE_FACTORIES_FOR_RESPONSE_TYPES.items():
+        old_time = measure(sign_message_with_deserialization, [message_factory() for _ in range(args.iterations)])
+        new_time = measure(sign_message, [message_factory() for _ in range(args.iterations)])
+        print(
+            f'{response_type:50} {old_time * 1000:19.3f} ms {new_time * 1000:11.3f} ms '
+            f'{(1 - new_time / old_time) * 100:7.1f}%'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 from django.forms import Form
 from django.http.request import HttpRequest
 from django.db.models import Model
+from django.db.models import QuerySet
+
+from common.database_replicas import read_from_replica
 
 
 class ModelAdminReadOnlyMixin:
@@ -29,3 +32,13 @@ class ModelAdminReadOnlyMixin:
 
     def save_related(self, request: HttpRequest, form: Form, formsets: list, change: bool) -> None:  # pylint: disable=no-self-use
         pass
+
+
+class ModelAdminReadFromReplicaMixin:
+    """
+    Makes subclasses of ModelAdmin list and display objects read from a replica of the database, if one is usable.
+    Meant only for admins which do not modify objects.
+    """
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return read_from_replica(super().get_queryset(request))  # type: ignore
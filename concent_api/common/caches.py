@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+from typing import Hashable
+from typing import Optional
+import time
+
+
+class LRUCache:
+    """
+    Simple thread-safe, bounded, process-local cache which discards least recently used items first.
+    Counts hits and misses so that its effectiveness can be monitored.
+    Maximum size equal to 0 disables the cache.
+    """
+
+    def __init__(self, maximum_size: int) -> None:
+        assert isinstance(maximum_size, int) and maximum_size >= 0
+        self.maximum_size = maximum_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # type: OrderedDict
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        assert value is not None
+        if self.maximum_size == 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maximum_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class ExpiringCache:
+    """
+    Simple thread-safe, process-local cache whose items expire after a fixed number of seconds.
+    Items can also be removed explicitly, e.g. when the value they were read from changes.
+    Timeout equal to 0 disables the cache.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        assert isinstance(timeout, (int, float)) and timeout >= 0
+        self.timeout = timeout
+        self._items = {}  # type: dict
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._items:
+                return None
+            (value, expiration_time) = self._items[key]
+            if time.monotonic() >= expiration_time:
+                del self._items[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        assert value is not None
+        if self.timeout == 0:
+            return
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.timeout)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
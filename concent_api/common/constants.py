@@ -1,3 +1,4 @@
+from typing import NamedTuple
 import enum
 
 
@@ -87,4 +88,60 @@ class MessageIdField(enum.Enum):
     SUBTASK_ID = 'subtask_id'
 
 
+class QueryBudgetViolationAction(enum.Enum):
+    """ What happens when a view executes more SQL queries or row-locking statements than its query budget allows. """
+
+    LOG     = 'log'
+    RAISE   = 'raise'
+
+
+QueryBudget = NamedTuple(
+    'QueryBudget',
+    [
+        ('maximum_number_of_queries', int),
+        ('maximum_number_of_row_locks', int),
+    ]
+)
+
+
 ERROR_IN_GOLEM_MESSAGE = 'Error in Golem Message.'
+
+# Upper bounds (in seconds) of buckets of histograms of durations of request phases measured by the request profiler.
+PROFILING_HISTOGRAM_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Minimum time (in seconds) between writes of metrics of a process to its file in METRICS_DIRECTORY.
+METRICS_FILE_WRITE_INTERVAL = 1
+
+# Maximum numbers of SQL queries (including savepoints) and row-locking statements (UPDATE, DELETE and SELECT ... FOR UPDATE)
+# executed while handling a single request, keyed by view name and type of Golem message received by the view.
+# Views which do not receive Golem messages use None as message type. Views not listed here are not checked.
+# The numbers are the highest counts found by tracing the code paths of each view as they run in the test suite,
+# i.e. with savepoints of nested transactions and without clients cached in the process, plus about 15% of margin.
+# Views of the receive family are traced with one timed-out subtask of the client and receive_batch with a full batch.
+# Run the test suite with CONCENT_REPORT_QUERY_COUNTS environment variable set to compare them with the measured counts.
+QUERY_BUDGETS = {
+    ('send', 'ForceReportComputedTask'): QueryBudget(40, 2),
+    ('send', 'AckReportComputedTask'): QueryBudget(45, 4),
+    ('send', 'RejectReportComputedTask'): QueryBudget(45, 4),
+    ('send', 'ForceGetTaskResult'): QueryBudget(40, 4),
+    ('send', 'ForceSubtaskResults'): QueryBudget(60, 4),
+    ('send', 'ForceSubtaskResultsResponse'): QueryBudget(50, 6),
+    ('send', 'SubtaskResultsVerify'): QueryBudget(65, 4),
+    ('send', 'ForcePayment'): QueryBudget(40, 3),
+    ('receive', 'ClientAuthorization'): QueryBudget(50, 5),
+    ('receive_long_poll', 'ClientAuthorization'): QueryBudget(55, 6),
+    ('receive_batch', 'ClientAuthorization'): QueryBudget(95, 25),
+    ('report_upload', None): QueryBudget(20, 4),
+    ('upload', None): QueryBudget(0, 0),
+    ('download', None): QueryBudget(0, 0),
+}
+
+# Defines aliases of optional read-only replicas of Concent databases. A replica is used only if its alias is defined
+# in DATABASES. Only queries explicitly marked with `read_from_replica()` are sent to replicas.
+DATABASE_REPLICAS = {
+    'control': 'control_replica',
+    'storage': 'storage_replica',
+}
+
+# Defines for how many seconds each process remembers whether a replica is usable before checking its replication lag again.
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = 1
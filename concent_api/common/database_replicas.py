@@ -0,0 +1,84 @@
+from logging import getLogger
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db import connections
+from django.db.models import QuerySet
+
+from common.caches import ExpiringCache
+from common.constants import DATABASE_REPLICA_LAG_CHECK_INTERVAL
+from common.constants import DATABASE_REPLICAS
+from common.logging import LoggingLevel
+from common.logging import log
+
+logger = getLogger(__name__)
+
+# Whether replicas can be read from, keyed by replica alias.
+replica_usability_cache = ExpiringCache(DATABASE_REPLICA_LAG_CHECK_INTERVAL)
+
+# Returns the number of seconds the replica is behind the primary. A replica which has replayed everything it has received
+# is not lagging even if the primary has been idle for a while. A database which is not in recovery is not a replica
+# of anything (e.g. when the replica alias points to the primary in development) and it cannot lag either.
+# NULL means that the replica has not replayed any transaction yet.
+REPLICATION_LAG_QUERY = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+'''
+
+
+def get_replication_lag(replica: str) -> Optional[float]:
+    with connections[replica].cursor() as cursor:
+        cursor.execute(REPLICATION_LAG_QUERY)
+        replication_lag = cursor.fetchone()[0]
+    return None if replication_lag is None else float(replication_lag)
+
+
+def is_replica_usable(replica: str) -> bool:
+    """
+    Checks if the replica lags behind the primary by at most DATABASE_REPLICA_MAXIMUM_LAG seconds.
+    Unreachable replicas are not usable. The result is remembered for DATABASE_REPLICA_LAG_CHECK_INTERVAL seconds.
+    """
+    is_usable = replica_usability_cache.get(replica)
+    if is_usable is not None:
+        return is_usable
+
+    try:
+        replication_lag = get_replication_lag(replica)
+    except DatabaseError as exception:
+        log(
+            logger,
+            f'Replication lag of database {replica} could not be checked. Reading from primary instead. Exception: {exception}.',
+            logging_level=LoggingLevel.WARNING,
+        )
+        replication_lag = None
+
+    is_usable = replication_lag is not None and replication_lag <= settings.DATABASE_REPLICA_MAXIMUM_LAG
+    if replication_lag is not None and not is_usable:
+        log(
+            logger,
+            f'Database {replica} lags {replication_lag:.1f} s behind primary. Reading from primary instead.',
+            logging_level=LoggingLevel.WARNING,
+        )
+    replica_usability_cache.set(replica, is_usable)
+    return is_usable
+
+
+def get_database_for_reporting(database: str) -> str:
+    """ Returns alias of the replica of the database if it is defined and usable, otherwise the database itself. """
+    assert database in DATABASE_REPLICAS
+
+    replica = DATABASE_REPLICAS[database]
+    if replica in settings.DATABASES and is_replica_usable(replica):
+        return replica
+    return database
+
+
+def read_from_replica(query_set: QuerySet) -> QuerySet:
+    """
+    Marks a read-only query as one that can be executed on a replica. Meant for reporting queries (admin panel, metrics)
+    which can see data slightly out of date. Objects read this way must not be modified.
+    """
+    return query_set.using(get_database_for_reporting(query_set.db))
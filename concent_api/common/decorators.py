@@ -2,6 +2,7 @@ from functools import wraps
 from logging import getLogger
 from typing import Any
 from typing import Callable
+import time
 import traceback
 
 from django.conf import settings
@@ -9,6 +10,9 @@ from django.conf import settings
 from common.exceptions import ConcentFeatureIsNotAvailable
 from common.logging import LoggingLevel
 from common.logging import log
+from common.metrics import record_task
+from common.query_budgets import check_query_budget
+from common.query_budgets import count_queries
 
 logger = getLogger(__name__)
 crash_logger = getLogger('concent.crash')
@@ -37,9 +41,13 @@ def log_task_errors(task: Callable) -> Callable:
 
     @wraps(task)
     def wrapper(*args: Any, **kwargs: Any) -> None:
+        start_time = time.perf_counter()
         try:
-            return task(*args, **kwargs)
+            result = task(*args, **kwargs)
+            record_task(task.__name__, True, time.perf_counter() - start_time)
+            return result
         except Exception as exception:
+            record_task(task.__name__, False, time.perf_counter() - start_time)
             log(
                 crash_logger,
                 f'Exception occurred while executing task {task.__name__}: {exception}, Traceback: {traceback.format_exc()}',
@@ -47,3 +55,19 @@ def log_task_errors(task: Callable) -> Callable:
                 logging_level=LoggingLevel.ERROR)
             raise
     return wrapper
+
+
+def enforce_query_budget(view: Callable) -> Callable:
+    """
+    Decorator for views which do not receive Golem messages. Checks SQL queries and row-locking statements
+    executed by decorated view against its budget in QUERY_BUDGETS if QUERY_BUDGET_VIOLATION_ACTION setting is not None.
+    """
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if settings.QUERY_BUDGET_VIOLATION_ACTION is None:
+            return view(*args, **kwargs)
+        with count_queries() as query_counter:
+            response = view(*args, **kwargs)
+        check_query_budget(view.__name__, None, query_counter)
+        return response
+    return wrapper
@@ -3,6 +3,13 @@ import base64
 import binascii
 import datetime
 import time
+from operator import attrgetter
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Type
 
 from django.conf import settings
 from django.utils import timezone
@@ -15,9 +22,11 @@ import requests
 from golem_messages                 import message
 from golem_messages.datastructures  import FrozenDict
 from golem_messages.exceptions      import MessageError
+from golem_messages.register import library
 from golem_messages.shortcuts import dump
 from golem_messages.utils import decode_hex
 
+from core.constants import BATCH_MESSAGE_LENGTH_PREFIX_SIZE
 from core.constants import ETHEREUM_PUBLIC_KEY_LENGTH
 from core.exceptions import Http400
 from common.constants import ErrorCode
@@ -77,6 +86,38 @@ def parse_timestamp_to_utc_datetime(timestamp: Union[int, float]) -> datetime.da
     return datetime.datetime.fromtimestamp(timestamp, timezone.utc)
 
 
+class MessageFieldAccessors:
+    """
+    Names of attributes and slots of a Golem message class, computed once per class,
+    and a getter returning values of all slots of a message in a single call.
+    """
+
+    def __init__(self, message_class: Type[message.base.Message]) -> None:
+        self.attributes = frozenset(dir(message_class))
+        self.slots = tuple(message_class.__slots__)
+        self.get_slot_values = (
+            attrgetter(*self.slots) if len(self.slots) > 1 else lambda golem_message: (getattr(golem_message, self.slots[0]),)
+        )  # type: Callable[[message.base.Message], Tuple[Any, ...]]
+
+
+MESSAGE_FIELD_ACCESSORS = {
+    message_class: MessageFieldAccessors(message_class)
+    for message_class in library._types.values()  # pylint: disable=protected-access
+}  # type: Dict[Type[message.base.Message], MessageFieldAccessors]
+
+
+def get_message_field_accessors(message_class: Type[message.base.Message]) -> MessageFieldAccessors:
+    """ Returns accessors of given message class. Classes registered after this module was imported are added on first use. """
+    if message_class not in MESSAGE_FIELD_ACCESSORS:
+        MESSAGE_FIELD_ACCESSORS[message_class] = MessageFieldAccessors(message_class)
+    return MESSAGE_FIELD_ACCESSORS[message_class]
+
+
+def has_message_field(golem_message: message.base.Message, field_name: str) -> bool:
+    """ Works like `field_name in dir(golem_message)` without listing attributes of the message. """
+    return field_name in get_message_field_accessors(type(golem_message)).attributes
+
+
 def get_field_from_message(
     golem_message: message.base.Message,
     field_name: str
@@ -95,11 +136,15 @@ def get_field_from_message(
                 return golem_message[field_name]
             else:
                 return None
-        elif hasattr(golem_message, field_name):
-            return getattr(golem_message, field_name)
-        for slot in golem_message.__slots__:
-            if isinstance(getattr(golem_message, slot), (message.base.Message, FrozenDict)):
-                task_id = check_task_id(getattr(golem_message, slot))
+        accessors = get_message_field_accessors(type(golem_message))
+        if field_name in accessors.attributes:
+            try:
+                return getattr(golem_message, field_name)
+            except AttributeError:
+                pass
+        for slot_value in accessors.get_slot_values(golem_message):
+            if isinstance(slot_value, (message.base.Message, FrozenDict)):
+                task_id = check_task_id(slot_value)
                 if task_id is not None:
                     return task_id
         return None
@@ -124,12 +169,15 @@ def deserialize_message(raw_message_data: bytes) -> message.Message:
 
 
 def sign_message(golem_message: message.Message, priv_key: bytes) -> message.Message:
+    """
+    Attaches signature to given message in place and returns it.
+    Signing requires serializing the message payload once, there's no need to deserialize it afterwards.
+    """
     assert isinstance(golem_message, message.Message)
     assert isinstance(priv_key, bytes) and len(priv_key) == 32
     assert golem_message.sig is None
 
-    golem_message = golem_message.serialize(sign_as = priv_key)
-    golem_message = deserialize_message(golem_message)
+    golem_message.sign_message(priv_key)
     return golem_message
 
 
@@ -156,6 +204,34 @@ def join_messages(*messages: str) -> str:
     return ' '.join(m.strip() for m in messages if m not in ['', None])
 
 
+def pack_serialized_messages_into_batch(serialized_messages: List[bytes]) -> bytes:
+    """
+    Joins already serialized (and possibly encrypted) Golem messages into a single payload.
+    Each message is preceded by its length encoded as a big-endian unsigned integer.
+    """
+    assert all(isinstance(serialized_message, bytes) for serialized_message in serialized_messages)
+    return b''.join(
+        len(serialized_message).to_bytes(BATCH_MESSAGE_LENGTH_PREFIX_SIZE, byteorder='big') + serialized_message
+        for serialized_message in serialized_messages
+    )
+
+
+def unpack_serialized_messages_from_batch(batch: bytes) -> List[bytes]:
+    """ Reverses `pack_serialized_messages_into_batch()`. """
+    serialized_messages = []
+    offset = 0
+    while offset < len(batch):
+        if offset + BATCH_MESSAGE_LENGTH_PREFIX_SIZE > len(batch):
+            raise ValueError('Batch of messages is truncated.')
+        message_length = int.from_bytes(batch[offset:offset + BATCH_MESSAGE_LENGTH_PREFIX_SIZE], byteorder='big')
+        offset += BATCH_MESSAGE_LENGTH_PREFIX_SIZE
+        if offset + message_length > len(batch):
+            raise ValueError('Batch of messages is truncated.')
+        serialized_messages.append(batch[offset:offset + message_length])
+        offset += message_length
+    return serialized_messages
+
+
 def upload_file_to_storage_cluster(
     file_content: Union[str, bytes],
     file_path: str,
@@ -209,12 +285,3 @@ def ethereum_public_key_to_address(ethereum_public_key: str) -> str:
     return to_checksum_address(
         sha3(decode_hex(ethereum_public_key))[12:].hex()
     )
-
-
-def deserialize_database_message(serialized_message: 'StoredMessage') -> message.Message:  # type: ignore # noqa
-    if isinstance(serialized_message.data, bytes):
-        return deserialize_message(serialized_message.data)
-    elif isinstance(serialized_message.data, memoryview):
-        return deserialize_message(serialized_message.data.tobytes())
-    else:
-        raise ValueError('Given serialized_messages data must be `bytes` or `memoryview` instance')
@@ -1,6 +1,11 @@
 import json
+import random
 from base64 import b64decode
 from enum import Enum
+from functools import wraps
+from logging import ERROR
+from logging import INFO
+from logging import WARNING
 from logging import Logger
 from typing import Any
 from typing import Callable
@@ -8,6 +13,7 @@ from typing import Dict
 from typing import Optional
 from typing import Union
 
+from django.conf import settings
 from django.http import JsonResponse
 from golem_messages.message.base import Message
 from golem_messages.message.concents import FileTransferToken
@@ -27,6 +33,39 @@ class LoggingLevel(Enum):
     ERROR = 'error'
 
 
+LOGGING_LEVEL_NUMBERS = {
+    LoggingLevel.INFO: INFO,
+    LoggingLevel.EXCEPTION: ERROR,
+    LoggingLevel.WARNING: WARNING,
+    LoggingLevel.ERROR: ERROR,
+}
+
+
+class LazyMessageDump:
+    """
+    Golem message passed as an argument of a log record and rendered as JSON only when the record is formatted,
+    i.e. when it passes levels and filters of the logger and a handler.
+    """
+
+    def __init__(self, golem_message: Message) -> None:
+        self.golem_message = golem_message
+
+    def __str__(self) -> str:
+        return get_json_from_message_without_redundant_fields_for_logging(self.golem_message)
+
+
+def log_only_if_info_is_enabled(log_function: Callable) -> Callable:
+    """
+    Skips preparing the log message, e.g. getting fields of nested messages,
+    if the logger given as the first argument does not handle INFO level.
+    """
+    @wraps(log_function)
+    def wrap(logger: Logger, *args: Any, **kwargs: Any) -> None:
+        if logger.isEnabledFor(INFO):
+            log_function(logger, *args, **kwargs)
+    return wrap
+
+
 def replace_element_to_unavailable_instead_of_none(log_function: Callable) -> Callable:
     def wrap(*args: Any, **kwargs: Any) -> None:
         args_list = [arg if arg is not None else '-not available-' for arg in args]
@@ -35,6 +74,7 @@ def replace_element_to_unavailable_instead_of_none(log_function: Callable) -> Ca
     return wrap
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_message_received(logger: Logger, message: Message, client_public_key: bytes) -> None:
     task_id = _get_field_value_from_messages_for_logging(MessageIdField.TASK_ID, message)
@@ -47,6 +87,7 @@ def log_message_received(logger: Logger, message: Message, client_public_key: by
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_message_returned(
     logger: Logger,
@@ -64,6 +105,7 @@ def log_message_returned(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_message_accepted(logger: Logger, message: Message, client_public_key: bytes) -> None:
     task_id = _get_field_value_from_messages_for_logging(MessageIdField.TASK_ID, message)
@@ -76,6 +118,7 @@ def log_message_accepted(logger: Logger, message: Message, client_public_key: by
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_message_added_to_queue(logger: Logger, message: Message, client_public_key: bytes) -> None:
     task_id = _get_field_value_from_messages_for_logging(MessageIdField.TASK_ID, message)
@@ -88,6 +131,7 @@ def log_message_added_to_queue(logger: Logger, message: Message, client_public_k
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_timeout(
     logger: Logger,
@@ -106,6 +150,7 @@ def log_timeout(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_400_error(
     logger: Logger,
@@ -126,6 +171,7 @@ def log_400_error(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_subtask_stored(
     logger: Logger,
@@ -151,6 +197,7 @@ def log_subtask_stored(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_subtask_updated(
     logger: Logger,
@@ -172,6 +219,7 @@ def log_subtask_updated(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_stored_message_added_to_subtask(
     logger: Logger,
@@ -193,6 +241,7 @@ def log_stored_message_added_to_subtask(
     )
 
 
+@log_only_if_info_is_enabled
 def log_new_pending_response(
     logger: Logger,
     response_type: str,
@@ -213,6 +262,7 @@ def log_new_pending_response(
     )
 
 
+@log_only_if_info_is_enabled
 @replace_element_to_unavailable_instead_of_none
 def log_receive_message_from_database(
     logger: Logger,
@@ -244,6 +294,10 @@ def log(
     client_public_key: Union[bytes, str, None] = None,
     logging_level: Optional[LoggingLevel] = LoggingLevel.INFO
 ) -> None:
+    if not isinstance(logging_level, LoggingLevel):
+        raise TypeError('Unexpected logging level')
+    if not logger.isEnabledFor(LOGGING_LEVEL_NUMBERS[logging_level]):
+        return
     client_key_message = f'CLIENT_PUBLIC_KEY: {convert_public_key_to_hex(client_public_key)}. ' if client_public_key is not None else ''
     subtask_id_message = f'SUBTASK_ID: {subtask_id}. ' if subtask_id is not None else ''
     if isinstance(logging_level, LoggingLevel) and logging_level == logging_level.INFO:
@@ -258,6 +312,18 @@ def log(
         raise TypeError('Unexpected logging level')
 
 
+def log_message_dump(logger: Logger, golem_message: Message) -> None:
+    """
+    Logs all fields of the message as JSON. Only a fraction of messages, defined by LOG_MESSAGE_DUMP_SAMPLING_RATE
+    setting, is logged and the JSON is rendered only if the record is emitted.
+    """
+    if not logger.isEnabledFor(INFO):
+        return
+    if settings.LOG_MESSAGE_DUMP_SAMPLING_RATE < 1 and random.random() >= settings.LOG_MESSAGE_DUMP_SAMPLING_RATE:
+        return
+    logger.info('%s', LazyMessageDump(golem_message))
+
+
 def _get_field_value_from_messages_for_logging(field_name: MessageIdField, message: Message) -> str:
     value: str = get_field_from_message(message, field_name.value) if isinstance(message, Message) else '-not available-'  # type: ignore
     return value if value is not None else '-not available-'
@@ -0,0 +1,70 @@
+from logging import LogRecord
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from queue import Full
+from queue import Queue
+from threading import Lock
+from typing import Any
+from typing import Optional
+import atexit
+import os
+
+from django.utils.module_loading import import_string
+
+from common.metrics import record_dropped_log_record
+
+
+class NonBlockingHandler(QueueHandler):
+    """
+    Logging handler which formats records and puts them in an in-memory queue instead of writing them.
+    The records are passed to the target handler by a background thread so that slow output does not block
+    the thread which logs. If the queue is full, records are dropped instead of waiting. Dropped records are counted
+    and exported by the metrics endpoint.
+
+    The background thread is started in the process which emits the first record, so the handler can be configured
+    before worker processes are forked.
+    """
+
+    def __init__(self, handler_class: str, maximum_queue_size: int = 10000, **handler_kwargs: Any) -> None:
+        super().__init__(Queue(maximum_queue_size))
+        self.maximum_queue_size = maximum_queue_size
+        self.target_handler = import_string(handler_class)(**handler_kwargs)
+        self.number_of_dropped_records = 0
+        self._listener = None  # type: Optional[QueueListener]
+        self._listener_process_id = None  # type: Optional[int]
+        self._listener_lock = Lock()
+
+    def enqueue(self, record: LogRecord) -> None:
+        self._start_listener_if_needed()
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self.number_of_dropped_records += 1
+            record_dropped_log_record(self.name or '')
+
+    def _start_listener_if_needed(self) -> None:
+        if self._listener_process_id == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_process_id == os.getpid():
+                return
+            # A listener inherited from the parent process has no thread in this process.
+            # Records queued before the fork belong to the parent so a new queue is used.
+            self.queue = Queue(self.maximum_queue_size)
+            self._listener = QueueListener(self.queue, self.target_handler, respect_handler_level=True)
+            self._listener.start()
+            self._listener_process_id = os.getpid()
+            atexit.register(self.stop_listener)
+
+    def stop_listener(self) -> None:
+        """ Waits until all queued records are passed to the target handler and stops the background thread. """
+        with self._listener_lock:
+            if self._listener is not None and self._listener_process_id == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._listener_process_id = None
+
+    def close(self) -> None:
+        self.stop_listener()
+        self.target_handler.close()
+        super().close()
@@ -0,0 +1,374 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging import getLogger
+from threading import Lock
+from threading import Timer
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+
+from common.constants import METRICS_FILE_WRITE_INTERVAL
+from common.constants import PROFILING_HISTOGRAM_BUCKETS
+from common.logging import LoggingLevel
+from common.logging import log
+
+logger = getLogger(__name__)
+
+
+class Counters:
+    """ Thread-safe, process-level counters keyed by tuples of label values. """
+
+    def __init__(self) -> None:
+        self._counters = {}  # type: Dict[Tuple[str, ...], int]
+        self._lock = Lock()
+
+    def increment(self, labels: Tuple[str, ...], value: int = 1) -> None:
+        with self._lock:
+            self._counters[labels] = self._counters.get(labels, 0) + value
+
+    def get_snapshot(self) -> Dict[Tuple[str, ...], int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def add_snapshot(self, snapshot: Dict[Tuple[str, ...], int]) -> None:
+        """ Adds counters from a snapshot taken from another instance, e.g. in another process. """
+        with self._lock:
+            for labels, value in snapshot.items():
+                self._counters[labels] = self._counters.get(labels, 0) + value
+
+    def create_empty_copy(self) -> 'Counters':
+        return Counters()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class Histograms:
+    """
+    Thread-safe, process-level histograms keyed by tuples of label values.
+    Each histogram counts measurements not greater than each of the bucket bounds (the last bucket counts the rest)
+    and keeps their sum, like Prometheus histograms do.
+    """
+
+    def __init__(self, bucket_bounds: List[float]) -> None:
+        assert bucket_bounds == sorted(bucket_bounds)
+        self.bucket_bounds = bucket_bounds
+        self._histograms = {}  # type: Dict[Tuple[str, ...], Dict]
+        self._lock = Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._observe(labels, value)
+
+    def _observe(self, labels: Tuple[str, ...], value: float) -> None:
+        histogram = self._get_or_create_histogram(labels)
+        histogram['buckets'][bisect_left(self.bucket_bounds, value)] += 1
+        histogram['sum'] += value
+        histogram['count'] += 1
+
+    def _get_or_create_histogram(self, labels: Tuple[str, ...]) -> Dict:
+        if labels not in self._histograms:
+            self._histograms[labels] = {
+                'buckets': [0] * (len(self.bucket_bounds) + 1),
+                'sum': 0.0,
+                'count': 0,
+            }
+        return self._histograms[labels]
+
+    def get_snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """ Returns a copy of histograms keyed by tuples of label values. """
+        with self._lock:
+            return {
+                labels: {
+                    'buckets': list(histogram['buckets']),
+                    'sum': histogram['sum'],
+                    'count': histogram['count'],
+                }
+                for labels, histogram in self._histograms.items()
+            }
+
+    def add_snapshot(self, snapshot: Dict[Tuple[str, ...], Dict]) -> None:
+        """ Adds histograms from a snapshot taken from another instance with the same buckets, e.g. in another process. """
+        with self._lock:
+            for labels, other_histogram in snapshot.items():
+                assert len(other_histogram['buckets']) == len(self.bucket_bounds) + 1
+                histogram = self._get_or_create_histogram(labels)
+                histogram['buckets'] = [
+                    count + other_count
+                    for count, other_count in zip(histogram['buckets'], other_histogram['buckets'])
+                ]
+                histogram['sum'] += other_histogram['sum']
+                histogram['count'] += other_histogram['count']
+
+    def create_empty_copy(self) -> 'Histograms':
+        return type(self)(self.bucket_bounds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+class MetricsFile:
+    """
+    Makes metrics of a process available to other processes. Snapshots of all shared metrics of the process are written
+    to its own file in METRICS_DIRECTORY, so that the metrics endpoint, whichever process serves it, can export the sum
+    of metrics of all processes, including Celery workers which do not serve HTTP at all.
+
+    A file is written at most once per METRICS_FILE_WRITE_INTERVAL seconds. Changes made in the meantime are written
+    by a timer at the end of the interval. Files of processes which have exited are kept so that counters never decrease.
+    """
+
+    def __init__(self) -> None:
+        self.metrics = {}  # type: Dict[str, Union[Counters, Histograms]]
+        self._lock = Lock()
+        self._process_id = None  # type: Optional[int]
+        self._directory = None  # type: Optional[str]
+        self._path = None  # type: Optional[str]
+        self._last_write_time = None  # type: Optional[float]
+        self._timer = None  # type: Optional[Timer]
+
+    def register(self, name: str, metric: Union[Counters, Histograms]) -> None:
+        assert name not in self.metrics
+        self.metrics[name] = metric
+
+    def prepare_for_update(self) -> None:
+        """
+        Must be called before shared metrics are updated. Metrics inherited by a forked process have already been written
+        by its parent, so the child clears them and writes its own file.
+        """
+        if settings.METRICS_DIRECTORY is None or self._is_prepared():
+            return
+        with self._lock:
+            if self._is_prepared():
+                return
+            if self._process_id not in [None, os.getpid()]:
+                for metric in self.metrics.values():
+                    metric.clear()
+            self._process_id = os.getpid()
+            self._directory = settings.METRICS_DIRECTORY
+            self._path = os.path.join(self._directory, f'{self._process_id}-{uuid.uuid4().hex}.json')
+            self._last_write_time = None
+            self._timer = None
+
+    def _is_prepared(self) -> bool:
+        return self._process_id == os.getpid() and self._directory == settings.METRICS_DIRECTORY
+
+    def schedule_write(self) -> None:
+        """ Writes the file now or, if it has been written recently, at the end of METRICS_FILE_WRITE_INTERVAL. """
+        if settings.METRICS_DIRECTORY is None:
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            delay = 0.0
+            if self._last_write_time is not None:
+                delay = self._last_write_time + METRICS_FILE_WRITE_INTERVAL - time.monotonic()
+            if delay <= 0:
+                self._write()
+            else:
+                self._timer = Timer(delay, self._write_when_timer_expires)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def write(self) -> None:
+        if settings.METRICS_DIRECTORY is None:
+            return
+        self.prepare_for_update()
+        with self._lock:
+            self._write()
+
+    def _write_when_timer_expires(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._write()
+
+    def _write(self) -> None:
+        assert self._directory is not None and self._path is not None
+        content = {
+            name: [[list(labels), value] for labels, value in metric.get_snapshot().items()]
+            for name, metric in self.metrics.items()
+        }
+        self._last_write_time = time.monotonic()
+        try:
+            # The file is replaced atomically so that it's never read while only partially written.
+            (file_descriptor, temporary_path) = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w') as temporary_file:
+                json.dump(content, temporary_file)
+            os.replace(temporary_path, self._path)
+        except OSError as exception:
+            log(
+                logger,
+                f'Metrics could not be written to {self._path}. Exception: {exception}.',
+                logging_level=LoggingLevel.WARNING,
+            )
+
+    def get_metrics_of_all_processes(self) -> Dict[str, Union[Counters, Histograms]]:
+        """
+        Returns shared metrics summed over all processes which have written them to METRICS_DIRECTORY,
+        including the current one. If METRICS_DIRECTORY is not set, returns metrics of the current process.
+        """
+        if settings.METRICS_DIRECTORY is None:
+            return self.metrics
+
+        self.write()
+        metrics_of_all_processes = {name: metric.create_empty_copy() for name, metric in self.metrics.items()}
+        for file_name in os.listdir(settings.METRICS_DIRECTORY):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(settings.METRICS_DIRECTORY, file_name)) as metrics_file:
+                    content = json.load(metrics_file)  # type: Dict[str, List[List[Any]]]
+            except FileNotFoundError:
+                continue
+            for name, snapshot in content.items():
+                if name in metrics_of_all_processes:
+                    metrics_of_all_processes[name].add_snapshot(  # type: ignore
+                        {tuple(labels): value for labels, value in snapshot}
+                    )
+        return metrics_of_all_processes
+
+
+@contextmanager
+def updating_shared_metrics() -> Iterator[None]:
+    """ Context in which shared metrics of the process are updated. They're written to METRICS_DIRECTORY afterwards. """
+    metrics_file.prepare_for_update()
+    yield
+    metrics_file.schedule_write()
+
+
+# Metrics of this process shared with other processes through METRICS_DIRECTORY.
+metrics_file = MetricsFile()
+
+# Requests handled by Concent views, keyed by (view, message type, HTTP status code).
+request_counters = Counters()
+
+# Durations of requests handled by Concent views in seconds, keyed by (view, message type).
+request_duration_histograms = Histograms(PROFILING_HISTOGRAM_BUCKETS)
+
+# Celery tasks executed in this process, keyed by (task, outcome).
+task_counters = Counters()
+
+# Durations of Celery tasks executed in this process in seconds, keyed by (task,).
+task_duration_histograms = Histograms(PROFILING_HISTOGRAM_BUCKETS)
+
+# Advisory locks of subtasks taken by message handlers, keyed by (contended,).
+# A lock is contended if another request for the same subtask held it and it had to be waited for.
+subtask_lock_counters = Counters()
+
+# Times spent waiting for contended advisory locks of subtasks in seconds.
+subtask_lock_wait_histograms = Histograms(PROFILING_HISTOGRAM_BUCKETS)
+
+# Log records dropped by NonBlockingHandler because its queue was full, keyed by (handler,).
+dropped_log_record_counters = Counters()
+
+metrics_file.register('request_counters', request_counters)
+metrics_file.register('request_duration_histograms', request_duration_histograms)
+metrics_file.register('task_counters', task_counters)
+metrics_file.register('task_duration_histograms', task_duration_histograms)
+metrics_file.register('subtask_lock_counters', subtask_lock_counters)
+metrics_file.register('subtask_lock_wait_histograms', subtask_lock_wait_histograms)
+metrics_file.register('dropped_log_record_counters', dropped_log_record_counters)
+
+
+def record_request(view_name: str, message_type: str, status_code: int, duration: float) -> None:
+    with updating_shared_metrics():
+        request_counters.increment((view_name, message_type, str(status_code)))
+        request_duration_histograms.observe((view_name, message_type), duration)
+
+
+def record_task(task_name: str, succeeded: bool, duration: float) -> None:
+    with updating_shared_metrics():
+        task_counters.increment((task_name, 'succeeded' if succeeded else 'failed'))
+        task_duration_histograms.observe((task_name,), duration)
+
+
+def record_subtask_lock(wait_time: Optional[float]) -> None:
+    """ Records an advisory lock of a subtask. `wait_time` is None if the lock was taken without waiting. """
+    with updating_shared_metrics():
+        subtask_lock_counters.increment(('false' if wait_time is None else 'true',))
+        if wait_time is not None:
+            subtask_lock_wait_histograms.observe((), wait_time)
+
+
+def record_dropped_log_record(handler_name: str) -> None:
+    """
+    Unlike other metrics, dropped log records do not trigger writing the metrics file. Writing may log a warning,
+    which would be dropped by the same full handler again. The count is written along with the next update of other
+    metrics or when metrics are exported.
+    """
+    metrics_file.prepare_for_update()
+    dropped_log_record_counters.increment((handler_name,))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: Iterable[str], label_values: Iterable[str]) -> str:
+    labels = ','.join(
+        f'{name}="{_escape_label_value(str(value))}"'
+        for name, value in zip(label_names, label_values)
+    )
+    return f'{{{labels}}}' if labels != '' else ''
+
+
+def format_counters(
+    name: str,
+    description: str,
+    label_names: Tuple[str, ...],
+    counters: Dict[Tuple[str, ...], Union[int, float]],
+    metric_type: str = 'counter',
+) -> List[str]:
+    """ Returns lines describing counters (or gauges) in Prometheus text exposition format. """
+    lines = [
+        f'# HELP {name} {description}',
+        f'# TYPE {name} {metric_type}',
+    ]
+    for label_values, value in sorted(counters.items()):
+        lines.append(f'{name}{_format_labels(label_names, label_values)} {value}')
+    return lines
+
+
+def format_gauges(
+    name: str,
+    description: str,
+    label_names: Tuple[str, ...],
+    gauges: Dict[Tuple[str, ...], Union[int, float]],
+) -> List[str]:
+    return format_counters(name, description, label_names, gauges, metric_type='gauge')
+
+
+def format_histograms(
+    name: str,
+    description: str,
+    label_names: Tuple[str, ...],
+    histograms: Histograms,
+) -> List[str]:
+    """ Returns lines describing histograms in Prometheus text exposition format, with cumulative buckets. """
+    lines = [
+        f'# HELP {name} {description}',
+        f'# TYPE {name} histogram',
+    ]
+    bucket_label_values = [str(bound) for bound in histograms.bucket_bounds] + ['+Inf']
+    for label_values, histogram in sorted(histograms.get_snapshot().items()):
+        cumulative_count = 0
+        for bucket_label_value, count in zip(bucket_label_values, histogram['buckets']):
+            cumulative_count += count
+            bucket_labels = _format_labels(label_names + ('le',), label_values + (bucket_label_value,))
+            lines.append(f'{name}_bucket{bucket_labels} {cumulative_count}')
+        lines.append(f'{name}_sum{_format_labels(label_names, label_values)} {histogram["sum"]}')
+        lines.append(f'{name}_count{_format_labels(label_names, label_values)} {histogram["count"]}')
+    return lines
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from threading import local
+from typing import Iterator
+from typing import Optional
+import time
+
+from django.db import connections
+
+from common.constants import PROFILING_HISTOGRAM_BUCKETS
+from common.metrics import Histograms
+from common.metrics import metrics_file
+
+# Name of the phase covering the whole request, including all the other phases.
+REQUEST_PHASE = 'request'
+
+# Name used instead of message type for requests which did not contain a Golem message.
+UNKNOWN_MESSAGE_TYPE = 'unknown'
+
+
+class PhaseMeasurement:
+
+    def __init__(self) -> None:
+        self.wall_time = 0.0
+        self.database_time = 0.0
+        self.number_of_queries = 0
+
+
+class RequestProfile:
+    """
+    Wall-clock time and time spent in database queries measured in each phase of processing a single request.
+    All times are in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.message_type = UNKNOWN_MESSAGE_TYPE
+        self.phases = OrderedDict()  # type: OrderedDict
+
+    def add_measurement(self, phase: str, wall_time: float, database_time: float, number_of_queries: int) -> None:
+        if phase not in self.phases:
+            self.phases[phase] = PhaseMeasurement()
+        measurement = self.phases[phase]
+        measurement.wall_time += wall_time
+        measurement.database_time += database_time
+        measurement.number_of_queries += number_of_queries
+
+    def to_server_timing_header(self) -> str:
+        """ Returns the value for `Server-Timing` HTTP header, with durations in milliseconds. """
+        metrics = []
+        for phase, measurement in self.phases.items():
+            metrics.append(f'{phase};dur={measurement.wall_time * 1000:.3f}')
+            metrics.append(f'{phase}-db;dur={measurement.database_time * 1000:.3f};desc="{measurement.number_of_queries} queries"')
+        return ', '.join(metrics)
+
+
+class PhaseHistograms(Histograms):
+    """
+    Process-level histograms of wall-clock and database times of request phases,
+    keyed by (message type, phase, metric).
+    """
+
+    METRICS = ('wall_time', 'database_time')
+
+    def add_request_profile(self, request_profile: RequestProfile) -> None:
+        with self._lock:
+            for phase, measurement in request_profile.phases.items():
+                for metric in self.METRICS:
+                    self._observe((request_profile.message_type, phase, metric), getattr(measurement, metric))
+
+
+phase_histograms = PhaseHistograms(PROFILING_HISTOGRAM_BUCKETS)
+metrics_file.register('phase_histograms', phase_histograms)
+
+_current_request = local()
+
+
+def start_request_profile() -> RequestProfile:
+    """
+    Starts profiling the request processed by the current thread.
+    Queries are recorded by all database connections of the thread until `finish_request_profile()` is called.
+    """
+    assert getattr(_current_request, 'profile', None) is None
+    _current_request.profile = RequestProfile()
+    _current_request.previous_force_debug_cursor = {}
+    for connection in connections.all():
+        _current_request.previous_force_debug_cursor[connection.alias] = connection.force_debug_cursor
+        connection.force_debug_cursor = True
+    return _current_request.profile
+
+
+def finish_request_profile() -> Optional[RequestProfile]:
+    request_profile = getattr(_current_request, 'profile', None)
+    if request_profile is not None:
+        for connection in connections.all():
+            connection.force_debug_cursor = _current_request.previous_force_debug_cursor.get(connection.alias, False)
+    _current_request.profile = None
+    return request_profile
+
+
+def get_current_request_profile() -> Optional[RequestProfile]:
+    return getattr(_current_request, 'profile', None)
+
+
+def set_profiled_message_type(message_type: str) -> None:
+    request_profile = get_current_request_profile()
+    if request_profile is not None:
+        request_profile.message_type = message_type
+
+
+@contextmanager
+def profile_phase(phase: str) -> Iterator[None]:
+    """
+    Measures the code executed in the context as given phase of the request being profiled.
+    Does nothing if the request is not profiled.
+    """
+    request_profile = get_current_request_profile()
+    if request_profile is None:
+        yield
+        return
+
+    all_connections = connections.all()
+    numbers_of_logged_queries = [len(connection.queries_log) for connection in all_connections]
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - start_time
+        database_time = 0.0
+        number_of_queries = 0
+        for connection, number_of_logged_queries in zip(all_connections, numbers_of_logged_queries):
+            for query in islice(connection.queries_log, number_of_logged_queries, None):
+                database_time += float(query['time'])
+                number_of_queries += 1
+        request_profile.add_measurement(phase, wall_time, database_time, number_of_queries)
@@ -0,0 +1,160 @@
+from contextlib import contextmanager
+from logging import getLogger
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.utils import CursorWrapper
+
+from common.constants import QUERY_BUDGETS
+from common.constants import QueryBudget
+from common.constants import QueryBudgetViolationAction
+from common.exceptions import QueryBudgetExceeded
+from common.logging import LoggingLevel
+from common.logging import log
+
+logger = getLogger(__name__)
+
+# Matches statements which lock rows: UPDATE, DELETE and SELECT ... FOR [NO KEY] UPDATE / FOR [KEY] SHARE.
+ROW_LOCKING_QUERY_REGEX = re.compile(
+    r'^\s*(UPDATE|DELETE)\b|\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b',
+    re.IGNORECASE,
+)
+
+# Highest numbers of queries and row locks counted so far in a single request, keyed by view name and message type.
+# Used to measure real query counts (e.g. over the whole test suite) on which budgets in QUERY_BUDGETS should be based.
+maximum_query_counts = {}  # type: Dict[Tuple[str, Optional[str]], QueryBudget]
+
+
+class QueryCounter:
+
+    def __init__(self) -> None:
+        self.number_of_queries = 0
+        self.number_of_row_locks = 0
+
+    def add_query(self, sql: str) -> None:
+        self.number_of_queries += 1
+        if ROW_LOCKING_QUERY_REGEX.search(sql) is not None:
+            self.number_of_row_locks += 1
+
+
+class CountingCursorWrapper(CursorWrapper):
+    """ Cursor wrapper which adds each statement to a QueryCounter before executing it with the wrapped cursor. """
+
+    def __init__(self, cursor: Any, db: BaseDatabaseWrapper, query_counter: QueryCounter) -> None:
+        super().__init__(cursor, db)
+        self.query_counter = query_counter
+
+    def execute(self, sql: str, params: Any = None) -> Any:
+        self.query_counter.add_query(sql)
+        return super().execute(sql, params)
+
+    def executemany(self, sql: str, param_list: Any) -> Any:
+        self.query_counter.add_query(sql)
+        return super().executemany(sql, param_list)
+
+
+def _wrap_cursor_factory(
+    connection: BaseDatabaseWrapper,
+    make_cursor: Callable[[Any], Any],
+    query_counter: QueryCounter,
+) -> Callable[[Any], Any]:
+    def make_counting_cursor(cursor: Any) -> CountingCursorWrapper:
+        return CountingCursorWrapper(make_cursor(cursor), connection, query_counter)
+    return make_counting_cursor
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Counts SQL queries and row-locking statements executed in the context by all database connections of the thread.
+
+    Statements are counted by wrapping cursors created by the connections rather than by reading `queries_log`,
+    which keeps only a limited number of the most recent queries.
+    """
+    all_connections = connections.all()
+    # Cursors are wrapped by setting instance attributes which shadow the methods of the connection class.
+    # Instance attributes set before, e.g. by an outer count_queries(), are restored afterwards.
+    previous_cursor_factories = [
+        {name: connection.__dict__.get(name) for name in ['make_cursor', 'make_debug_cursor']}
+        for connection in all_connections
+    ]
+    query_counter = QueryCounter()
+    for connection in all_connections:
+        connection.make_cursor = _wrap_cursor_factory(connection, connection.make_cursor, query_counter)
+        connection.make_debug_cursor = _wrap_cursor_factory(connection, connection.make_debug_cursor, query_counter)
+
+    try:
+        yield query_counter
+    finally:
+        for connection, cursor_factories in zip(all_connections, previous_cursor_factories):
+            for name, cursor_factory in cursor_factories.items():
+                if cursor_factory is None:
+                    delattr(connection, name)
+                else:
+                    setattr(connection, name, cursor_factory)
+
+
+def check_query_budget(view_name: str, message_type: Optional[str], query_counter: QueryCounter) -> None:
+    """
+    Compares queries counted while handling a request with the budget declared in QUERY_BUDGETS
+    and logs a warning or raises QueryBudgetExceeded, depending on QUERY_BUDGET_VIOLATION_ACTION setting.
+    """
+    record_query_count(view_name, message_type, query_counter)
+    query_budget = QUERY_BUDGETS.get((view_name, message_type))
+    if query_budget is None:
+        return
+    if (
+        query_counter.number_of_queries <= query_budget.maximum_number_of_queries and
+        query_counter.number_of_row_locks <= query_budget.maximum_number_of_row_locks
+    ):
+        return
+
+    error_message = (
+        f'View {view_name} exceeded its query budget while handling {message_type or "a request"}. '
+        f'Queries: {query_counter.number_of_queries} (budget: {query_budget.maximum_number_of_queries}). '
+        f'Row locks: {query_counter.number_of_row_locks} (budget: {query_budget.maximum_number_of_row_locks}).'
+    )
+    if settings.QUERY_BUDGET_VIOLATION_ACTION == QueryBudgetViolationAction.RAISE.value:
+        raise QueryBudgetExceeded(error_message)
+    log(logger, error_message, logging_level=LoggingLevel.WARNING)
+
+
+def record_query_count(view_name: str, message_type: Optional[str], query_counter: QueryCounter) -> None:
+    maximum_query_count = maximum_query_counts.get((view_name, message_type), QueryBudget(0, 0))
+    maximum_query_counts[(view_name, message_type)] = QueryBudget(
+        max(maximum_query_count.maximum_number_of_queries, query_counter.number_of_queries),
+        max(maximum_query_count.maximum_number_of_row_locks, query_counter.number_of_row_locks),
+    )
+
+
+def format_query_count_report() -> List[str]:
+    """
+    Returns lines comparing the highest query counts recorded in this process with budgets in QUERY_BUDGETS,
+    including views without a budget and budgets of views which have not been measured.
+    """
+    lines = []  # type: List[str]
+    for (view_name, message_type) in sorted(
+        set(maximum_query_counts) | set(QUERY_BUDGETS),
+        key=lambda key: (key[0], key[1] or ''),
+    ):
+        maximum_query_count = maximum_query_counts.get((view_name, message_type))
+        query_budget = QUERY_BUDGETS.get((view_name, message_type))
+        measured = (
+            f'{maximum_query_count.maximum_number_of_queries} queries, {maximum_query_count.maximum_number_of_row_locks} row locks'
+            if maximum_query_count is not None else 'not measured'
+        )
+        budget = (
+            f'{query_budget.maximum_number_of_queries} queries, {query_budget.maximum_number_of_row_locks} row locks'
+            if query_budget is not None else 'none'
+        )
+        lines.append(f'{view_name} {message_type}: {measured} (budget: {budget})')
+    return lines
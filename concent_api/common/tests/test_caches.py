@@ -0,0 +1,80 @@
+import mock
+from django.test import TestCase
+
+from common.caches import ExpiringCache
+from common.caches import LRUCache
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_that_cache_returns_stored_value_and_counts_hits_and_misses(self):
+        cache = LRUCache(2)
+
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_that_least_recently_used_item_is_discarded_when_cache_is_full(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_that_cache_with_maximum_size_equal_to_zero_does_not_store_anything(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_that_clear_removes_all_items_and_resets_counters(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.get('a')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+
+class ExpiringCacheTestCase(TestCase):
+
+    def test_that_cache_returns_stored_value_until_it_expires(self):
+        cache = ExpiringCache(1)
+
+        with mock.patch('common.caches.time.monotonic', return_value=100.0):
+            cache.set('a', False)
+        with mock.patch('common.caches.time.monotonic', return_value=100.5):
+            self.assertIs(cache.get('a'), False)
+        with mock.patch('common.caches.time.monotonic', return_value=101.0):
+            self.assertIsNone(cache.get('a'))
+
+        self.assertEqual(len(cache), 0)
+
+    def test_that_deleted_item_is_not_returned(self):
+        cache = ExpiringCache(1)
+        cache.set('a', 1)
+
+        cache.delete('a')
+        cache.delete('b')
+
+        self.assertIsNone(cache.get('a'))
+
+    def test_that_cache_with_timeout_equal_to_zero_does_not_store_anything(self):
+        cache = ExpiringCache(0)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,78 @@
+import mock
+from django.conf import settings
+from django.db import DatabaseError
+from django.test import TestCase
+from django.test import override_settings
+
+from common.database_replicas import get_database_for_reporting
+from common.database_replicas import read_from_replica
+from common.database_replicas import replica_usability_cache
+from concent_api.database_router import DatabaseRouter
+from core.models import Subtask
+
+
+def get_databases_with_control_replica():
+    return {**settings.DATABASES, 'control_replica': {**settings.DATABASES['control'], 'ATOMIC_REQUESTS': False}}
+
+
+@override_settings(DATABASE_REPLICA_MAXIMUM_LAG=5)
+class GetDatabaseForReportingTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        replica_usability_cache.clear()
+        self.addCleanup(replica_usability_cache.clear)
+
+    def test_that_primary_is_used_when_replica_is_not_defined(self):
+        with mock.patch('common.database_replicas.get_replication_lag') as get_replication_lag_mock:
+            database = get_database_for_reporting('control')
+
+        self.assertEqual(database, 'control')
+        get_replication_lag_mock.assert_not_called()
+
+    def test_that_replica_is_used_when_its_lag_does_not_exceed_maximum(self):
+        with override_settings(DATABASES=get_databases_with_control_replica()), \
+                mock.patch('common.database_replicas.get_replication_lag', return_value=5.0):
+            self.assertEqual(get_database_for_reporting('control'), 'control_replica')
+            self.assertEqual(read_from_replica(Subtask.objects.all()).db, 'control_replica')
+
+    def test_that_primary_is_used_when_replica_lags_too_much_or_did_not_replay_anything(self):
+        for replication_lag in [5.1, None]:
+            replica_usability_cache.clear()
+            with override_settings(DATABASES=get_databases_with_control_replica()), \
+                    mock.patch('common.database_replicas.get_replication_lag', return_value=replication_lag), \
+                    mock.patch('common.database_replicas.log'):
+                self.assertEqual(get_database_for_reporting('control'), 'control')
+
+    def test_that_primary_is_used_when_replica_is_unreachable(self):
+        with override_settings(DATABASES=get_databases_with_control_replica()), \
+                mock.patch('common.database_replicas.get_replication_lag', side_effect=DatabaseError), \
+                mock.patch('common.database_replicas.log') as log_mock:
+            database = get_database_for_reporting('control')
+
+        self.assertEqual(database, 'control')
+        log_mock.assert_called_once()
+
+    def test_that_replication_lag_is_not_checked_again_while_result_is_cached(self):
+        with override_settings(DATABASES=get_databases_with_control_replica()), \
+                mock.patch('common.database_replicas.get_replication_lag', return_value=0.0) as get_replication_lag_mock:
+            get_database_for_reporting('control')
+            get_database_for_reporting('control')
+
+        get_replication_lag_mock.assert_called_once_with('control_replica')
+
+
+class DatabaseRouterReplicaTestCase(TestCase):
+
+    def test_that_related_objects_of_instance_read_from_replica_are_read_from_the_same_replica(self):
+        instance = Subtask()
+        instance._state.db = 'control_replica'
+
+        self.assertEqual(DatabaseRouter().db_for_read(Subtask, instance=instance), 'control_replica')
+
+    def test_that_reads_without_replica_hint_go_to_primary(self):
+        instance = Subtask()
+        instance._state.db = 'control'
+
+        self.assertEqual(DatabaseRouter().db_for_read(Subtask), 'control')
+        self.assertEqual(DatabaseRouter().db_for_read(Subtask, instance=instance), 'control')
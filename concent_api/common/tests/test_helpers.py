@@ -6,14 +6,21 @@ from django.test import TestCase
 from django.utils import timezone
 
 from golem_messages import message
+from golem_messages.factories.tasks import ReportComputedTaskFactory
 
 from common.helpers import ethereum_public_key_to_address
 from common.helpers import generate_ethereum_address_from_ethereum_public_key
 from common.helpers import generate_ethereum_address_from_ethereum_public_key_bytes
+from common.helpers import get_field_from_message
+from common.helpers import get_message_field_accessors
+from common.helpers import has_message_field
 from common.helpers import join_messages
+from common.helpers import MESSAGE_FIELD_ACCESSORS
+from common.helpers import pack_serialized_messages_into_batch
 from common.helpers import parse_datetime_to_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
 from common.helpers import sign_message
+from common.helpers import unpack_serialized_messages_from_batch
 from common.testing_helpers import generate_ecc_key_pair
 
 (CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
@@ -74,6 +81,14 @@ class HelpersTestCase(TestCase):
         self.assertIsNot(ping_message.sig, None)
         self.assertIsInstance(ping_message.sig, bytes)
 
+    def test_that_sign_message_attaches_valid_signature_in_place(self):
+        ping_message = message.Ping()
+
+        signed_ping_message = sign_message(ping_message, CONCENT_PRIVATE_KEY)
+
+        self.assertIs(signed_ping_message, ping_message)
+        self.assertTrue(ping_message.verify_signature(CONCENT_PUBLIC_KEY))
+
     def test_join_messages_should_return_joined_string_separeted_with_whitespace(self):
         """ Tests if join_messages function works as expected. """
         for messages, expected_join in {
@@ -88,6 +103,20 @@ class HelpersTestCase(TestCase):
     def test_join_messages_with_single_argument_should_return_single_string(self):
         self.assertEqual(join_messages('Error in Golem Message.'), 'Error in Golem Message.')
 
+    def test_that_unpack_serialized_messages_from_batch_should_return_messages_packed_with_pack_serialized_messages_into_batch(self):
+        serialized_messages = [b'first message', b'', b'\x00' * 300]
+
+        batch = pack_serialized_messages_into_batch(serialized_messages)
+
+        self.assertEqual(len(batch), sum(len(serialized_message) + 4 for serialized_message in serialized_messages))
+        self.assertEqual(unpack_serialized_messages_from_batch(batch), serialized_messages)
+
+    def test_that_unpack_serialized_messages_from_batch_should_raise_exception_if_batch_is_truncated(self):
+        batch = pack_serialized_messages_into_batch([b'first message', b'second message'])
+
+        with self.assertRaises(ValueError):
+            unpack_serialized_messages_from_batch(batch[:-1])
+
     @override_settings(
         CONCENT_ETHEREUM_PUBLIC_KEY='b51e9af1ae9303315ca0d6f08d15d8fbcaecf6958f037cc68f9ec18a77c6f63eae46daaba5c637e06a3e4a52a2452725aafba3d4fda4e15baf48798170eb7412',
     )
@@ -114,3 +143,46 @@ class HelpersTestCase(TestCase):
             ethereum_public_key_to_address(settings.CONCENT_ETHEREUM_PUBLIC_KEY),
             '0x24CA754BC4B73997c289bbCD0D666Ec0E0Dd7368'
         )
+
+
+class MessageFieldAccessorsTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.report_computed_task = ReportComputedTaskFactory()
+        self.force_report_computed_task = message.concents.ForceReportComputedTask(
+            report_computed_task=self.report_computed_task,
+        )
+
+    def test_that_accessors_of_registered_message_classes_are_computed_in_advance(self):
+        self.assertIn(message.concents.ForceReportComputedTask, MESSAGE_FIELD_ACCESSORS)
+        self.assertIn(message.Ping, MESSAGE_FIELD_ACCESSORS)
+
+    def test_that_accessors_contain_all_slots_and_attributes_of_message_class(self):
+        accessors = get_message_field_accessors(message.concents.ForceReportComputedTask)
+
+        self.assertEqual(accessors.slots, tuple(self.force_report_computed_task.__slots__))
+        self.assertEqual(accessors.attributes, frozenset(dir(self.force_report_computed_task)))
+        self.assertEqual(
+            accessors.get_slot_values(self.force_report_computed_task),
+            tuple(getattr(self.force_report_computed_task, slot) for slot in self.force_report_computed_task.__slots__),
+        )
+
+    def test_that_has_message_field_works_like_checking_dir_of_message(self):
+        for field_name in ['task_id', 'subtask_id', 'report_computed_task', 'not_a_field']:
+            self.assertEqual(
+                has_message_field(self.force_report_computed_task, field_name),
+                field_name in dir(self.force_report_computed_task),
+            )
+        self.assertFalse(has_message_field(message.Ping(), 'subtask_id'))
+
+    def test_that_get_field_from_message_returns_fields_of_nested_messages(self):
+        self.assertEqual(
+            get_field_from_message(self.force_report_computed_task, 'subtask_id'),
+            self.report_computed_task.subtask_id,
+        )
+        self.assertEqual(
+            get_field_from_message(self.force_report_computed_task, 'task_to_compute'),
+            self.report_computed_task.task_to_compute,
+        )
+        self.assertIsNone(get_field_from_message(message.Ping(), 'subtask_id'))
@@ -1,13 +1,20 @@
+from logging import INFO
+from logging import WARNING
 from logging import getLogger
 from unittest import TestCase
 
+from django.test import override_settings
 import mock
 from golem_messages import dump
 from golem_messages import load
 from golem_messages import message
 from golem_messages.factories import tasks
 
+from common.logging import LazyMessageDump
 from common.logging import Message
+from common.logging import log
+from common.logging import log_message_dump
+from common.logging import log_message_received
 from common.logging import serialize_message_to_dictionary
 from common.logging import replace_element_to_unavailable_instead_of_none
 from common.testing_helpers import generate_ecc_key_pair
@@ -84,3 +91,67 @@ class SerializeMessageToDictionaryTestCase(TestCase):
         dictionary = serialize_message_to_dictionary(self.ack_report_computed_task)
         self.assertIn('ReportComputedTask', dictionary)
         self.assertIn('TaskToCompute', str(dictionary))
+
+
+class LazyLoggingTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.logger = mock.Mock()
+        self.ping = message.Ping()
+
+    def test_that_log_does_nothing_if_level_is_not_enabled_for_logger(self):
+        self.logger.isEnabledFor.return_value = False
+
+        log(self.logger, 'message', client_public_key=PROVIDER_PUBLIC_KEY)
+
+        self.logger.isEnabledFor.assert_called_once_with(INFO)
+        self.logger.info.assert_not_called()
+
+    def test_that_log_helpers_do_not_get_fields_of_message_if_info_is_not_enabled_for_logger(self):
+        self.logger.isEnabledFor.return_value = False
+
+        with mock.patch('common.logging._get_field_value_from_messages_for_logging') as get_field_value_mock:
+            log_message_received(self.logger, self.ping, PROVIDER_PUBLIC_KEY)
+
+        get_field_value_mock.assert_not_called()
+        self.logger.info.assert_not_called()
+
+    def test_that_message_dump_is_rendered_only_when_record_is_formatted(self):
+        self.logger.isEnabledFor.return_value = True
+
+        with mock.patch('common.logging.get_json_from_message_without_redundant_fields_for_logging', return_value='{}') as get_json_mock:
+            log_message_dump(self.logger, self.ping)
+
+            get_json_mock.assert_not_called()
+            (message_format, lazy_message_dump) = self.logger.info.call_args[0]
+            self.assertIsInstance(lazy_message_dump, LazyMessageDump)
+            self.assertEqual(message_format % lazy_message_dump, '{}')
+            get_json_mock.assert_called_once_with(self.ping)
+
+    @override_settings(LOG_MESSAGE_DUMP_SAMPLING_RATE=0.25)
+    def test_that_only_sampled_message_dumps_are_logged(self):
+        self.logger.isEnabledFor.return_value = True
+
+        with mock.patch('common.logging.random.random', side_effect=[0.2, 0.3]):
+            log_message_dump(self.logger, self.ping)
+            log_message_dump(self.logger, self.ping)
+
+        self.assertEqual(self.logger.info.call_count, 1)
+
+    @override_settings(LOG_MESSAGE_DUMP_SAMPLING_RATE=0)
+    def test_that_message_dumps_are_not_logged_if_sampling_rate_is_zero(self):
+        self.logger.isEnabledFor.return_value = True
+
+        log_message_dump(self.logger, self.ping)
+
+        self.logger.info.assert_not_called()
+
+    def test_that_message_dump_is_not_logged_if_info_is_not_enabled_for_logger(self):
+        real_logger = getLogger('common.tests.test_logging.disabled')
+        real_logger.setLevel(WARNING)
+
+        with mock.patch('common.logging.get_json_from_message_without_redundant_fields_for_logging') as get_json_mock:
+            log_message_dump(real_logger, self.ping)
+
+        get_json_mock.assert_not_called()
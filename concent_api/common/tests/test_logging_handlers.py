@@ -0,0 +1,40 @@
+from logging import Formatter
+from logging import INFO
+from logging import makeLogRecord
+from unittest import TestCase
+
+import mock
+
+from common.logging_handlers import NonBlockingHandler
+
+
+class NonBlockingHandlerTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.handler = NonBlockingHandler('logging.NullHandler', maximum_queue_size=2)
+        self.handler.setFormatter(Formatter('%(levelname)s | %(message)s'))
+        self.emitted_records = []
+        self.handler.target_handler.handle = self.emitted_records.append
+
+    def tearDown(self):
+        self.handler.close()
+        super().tearDown()
+
+    def test_that_records_are_formatted_and_passed_to_target_handler_in_background(self):
+        self.handler.handle(makeLogRecord({'msg': 'message %s', 'args': ('argument',), 'levelno': INFO, 'levelname': 'INFO'}))
+
+        self.handler.stop_listener()
+
+        self.assertEqual(len(self.emitted_records), 1)
+        self.assertEqual(self.emitted_records[0].getMessage(), 'INFO | message argument')
+
+    def test_that_records_are_dropped_instead_of_blocking_when_queue_is_full(self):
+        self.handler.set_name('console')
+        with mock.patch('common.logging_handlers.QueueListener'), \
+                mock.patch('common.logging_handlers.record_dropped_log_record') as record_dropped_log_record_mock:
+            for _ in range(3):
+                self.handler.handle(makeLogRecord({'msg': 'message', 'levelno': INFO, 'levelname': 'INFO'}))
+
+        self.assertEqual(self.handler.number_of_dropped_records, 1)
+        record_dropped_log_record_mock.assert_called_once_with('console')
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+
+from django.test import TestCase
+from django.test import override_settings
+
+from common.decorators import log_task_errors
+from common.metrics import Counters
+from common.metrics import Histograms
+from common.metrics import MetricsFile
+from common.metrics import format_counters
+from common.metrics import format_histograms
+from common.metrics import task_counters
+from common.metrics import task_duration_histograms
+
+
+class FormatMetricsTestCase(TestCase):
+
+    def test_that_counters_are_formatted_with_escaped_label_values(self):
+        counters = Counters()
+        counters.increment(('send', 'Ping'))
+        counters.increment(('send', 'Ping'))
+        counters.increment(('a "quoted"\nvalue', 'Ping'))
+
+        lines = format_counters('requests_total', 'Requests.', ('view', 'message_type'), counters.get_snapshot())
+
+        self.assertEqual(lines, [
+            '# HELP requests_total Requests.',
+            '# TYPE requests_total counter',
+            'requests_total{view="a \\"quoted\\"\\nvalue",message_type="Ping"} 1',
+            'requests_total{view="send",message_type="Ping"} 2',
+        ])
+
+    def test_that_histogram_buckets_are_formatted_as_cumulative_counts(self):
+        histograms = Histograms([0.1, 1.0])
+        histograms.observe(('send',), 0.05)
+        histograms.observe(('send',), 0.5)
+        histograms.observe(('send',), 5.0)
+
+        lines = format_histograms('duration_seconds', 'Durations.', ('view',), histograms)
+
+        self.assertEqual(lines, [
+            '# HELP duration_seconds Durations.',
+            '# TYPE duration_seconds histogram',
+            'duration_seconds_bucket{view="send",le="0.1"} 1',
+            'duration_seconds_bucket{view="send",le="1.0"} 2',
+            'duration_seconds_bucket{view="send",le="+Inf"} 3',
+            'duration_seconds_sum{view="send"} 5.55',
+            'duration_seconds_count{view="send"} 3',
+        ])
+
+
+class LogTaskErrorsMetricsTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        task_counters.clear()
+        task_duration_histograms.clear()
+
+    def tearDown(self):
+        task_counters.clear()
+        task_duration_histograms.clear()
+        super().tearDown()
+
+    def test_that_succeeded_and_failed_tasks_are_counted(self):
+        @log_task_errors
+        def task(fail):
+            if fail:
+                raise ValueError
+
+        task(fail=False)
+        with self.assertRaises(ValueError):
+            task(fail=True)
+
+        self.assertEqual(task_counters.get_snapshot(), {('task', 'succeeded'): 1, ('task', 'failed'): 1})
+        self.assertEqual(task_duration_histograms.get_snapshot()[('task',)]['count'], 2)
+
+
+class MetricsFileTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.metrics_directory = tempfile.TemporaryDirectory()
+        self.metrics_file = MetricsFile()
+        self.counters = Counters()
+        self.histograms = Histograms([0.1, 1.0])
+        self.metrics_file.register('counters', self.counters)
+        self.metrics_file.register('histograms', self.histograms)
+
+    def tearDown(self):
+        self.metrics_directory.cleanup()
+        super().tearDown()
+
+    def _write_metrics_of_another_process(self):
+        with open(os.path.join(self.metrics_directory.name, '1-other.json'), 'w') as metrics_file:
+            json.dump(
+                {
+                    'counters': [[['task', 'succeeded'], 2]],
+                    'histograms': [[['task'], {'buckets': [1, 0, 1], 'sum': 5.05, 'count': 2}]],
+                    'unknown': [[['task'], 1]],
+                },
+                metrics_file,
+            )
+
+    def test_that_metrics_of_all_processes_are_summed_if_metrics_directory_is_set(self):
+        with override_settings(METRICS_DIRECTORY=self.metrics_directory.name):
+            self.metrics_file.prepare_for_update()
+            self.counters.increment(('task', 'succeeded'))
+            self.histograms.observe(('task',), 0.5)
+            self._write_metrics_of_another_process()
+
+            metrics = self.metrics_file.get_metrics_of_all_processes()
+
+        self.assertEqual(set(metrics), {'counters', 'histograms'})
+        self.assertEqual(metrics['counters'].get_snapshot(), {('task', 'succeeded'): 3})
+        self.assertEqual(
+            metrics['histograms'].get_snapshot(),
+            {('task',): {'buckets': [1, 1, 1], 'sum': 5.55, 'count': 3}},
+        )
+        # Metrics of the current process are not modified.
+        self.assertEqual(self.counters.get_snapshot(), {('task', 'succeeded'): 1})
+
+    def test_that_only_metrics_of_current_process_are_returned_if_metrics_directory_is_not_set(self):
+        self._write_metrics_of_another_process()
+        self.counters.increment(('task', 'succeeded'))
+
+        with override_settings(METRICS_DIRECTORY=None):
+            metrics = self.metrics_file.get_metrics_of_all_processes()
+
+        self.assertEqual(metrics['counters'].get_snapshot(), {('task', 'succeeded'): 1})
+        self.assertEqual(os.listdir(self.metrics_directory.name), ['1-other.json'])
+
+    def test_that_file_written_recently_is_not_written_again_until_end_of_interval(self):
+        with override_settings(METRICS_DIRECTORY=self.metrics_directory.name):
+            self.metrics_file.prepare_for_update()
+            self.counters.increment(('task', 'succeeded'))
+            self.metrics_file.schedule_write()
+            self.counters.increment(('task', 'succeeded'))
+            self.metrics_file.schedule_write()
+
+            [file_name] = os.listdir(self.metrics_directory.name)
+            with open(os.path.join(self.metrics_directory.name, file_name)) as metrics_file:
+                content = json.load(metrics_file)
+
+            self.assertEqual(content['counters'], [[['task', 'succeeded'], 1]])
+            self.assertIsNotNone(self.metrics_file._timer)  # pylint: disable=protected-access
+            self.metrics_file._timer.cancel()  # pylint: disable=protected-access
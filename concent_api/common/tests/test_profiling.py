@@ -0,0 +1,87 @@
+from django.db import connections
+from django.test import TestCase
+
+from common.profiling import PhaseHistograms
+from common.profiling import RequestProfile
+from common.profiling import UNKNOWN_MESSAGE_TYPE
+from common.profiling import finish_request_profile
+from common.profiling import get_current_request_profile
+from common.profiling import profile_phase
+from common.profiling import set_profiled_message_type
+from common.profiling import start_request_profile
+from core.models import Client
+
+
+class ProfilePhaseTestCase(TestCase):
+
+    multi_db = True
+
+    def tearDown(self):
+        finish_request_profile()
+        super().tearDown()
+
+    def test_that_profile_phase_does_nothing_when_request_is_not_profiled(self):
+        with profile_phase('phase'):
+            set_profiled_message_type('Ping')
+
+        self.assertIsNone(get_current_request_profile())
+
+    def test_that_profile_phase_measures_wall_time_and_database_queries_of_each_phase(self):
+        request_profile = start_request_profile()
+
+        with profile_phase('phase'):
+            list(Client.objects.all())
+            list(Client.objects.all())
+        with profile_phase('other_phase'):
+            pass
+
+        self.assertEqual(list(request_profile.phases), ['phase', 'other_phase'])
+        self.assertEqual(request_profile.phases['phase'].number_of_queries, 2)
+        self.assertGreaterEqual(request_profile.phases['phase'].wall_time, request_profile.phases['phase'].database_time)
+        self.assertEqual(request_profile.phases['other_phase'].number_of_queries, 0)
+        self.assertEqual(request_profile.message_type, UNKNOWN_MESSAGE_TYPE)
+
+    def test_that_measurements_of_repeated_phase_are_summed(self):
+        request_profile = start_request_profile()
+
+        for _ in range(2):
+            with profile_phase('phase'):
+                list(Client.objects.all())
+
+        self.assertEqual(request_profile.phases['phase'].number_of_queries, 2)
+
+    def test_that_finishing_request_profile_restores_debug_cursors(self):
+        start_request_profile()
+        self.assertTrue(connections['control'].force_debug_cursor)
+
+        request_profile = finish_request_profile()
+
+        self.assertIsInstance(request_profile, RequestProfile)
+        self.assertFalse(connections['control'].force_debug_cursor)
+        self.assertIsNone(get_current_request_profile())
+
+
+class PhaseHistogramsTestCase(TestCase):
+
+    def test_that_measurements_are_counted_in_buckets_per_message_type_and_phase(self):
+        histograms = PhaseHistograms([0.01, 0.1])
+        for wall_time in [0.005, 0.05, 0.5]:
+            request_profile = RequestProfile()
+            request_profile.message_type = 'Ping'
+            request_profile.add_measurement('phase', wall_time, 0.0, 0)
+            histograms.add_request_profile(request_profile)
+
+        snapshot = histograms.get_snapshot()
+
+        self.assertEqual(snapshot[('Ping', 'phase', 'wall_time')]['buckets'], [1, 1, 1])
+        self.assertEqual(snapshot[('Ping', 'phase', 'wall_time')]['count'], 3)
+        self.assertAlmostEqual(snapshot[('Ping', 'phase', 'wall_time')]['sum'], 0.555)
+        self.assertEqual(snapshot[('Ping', 'phase', 'database_time')]['buckets'], [3, 0, 0])
+
+    def test_that_clear_removes_all_histograms(self):
+        histograms = PhaseHistograms([0.01])
+        histograms.add_request_profile(RequestProfile())
+
+        histograms.clear()
+
+        self.assertEqual(histograms.get_snapshot(), {})
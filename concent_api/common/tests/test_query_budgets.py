@@ -0,0 +1,163 @@
+from collections import deque
+
+import mock
+from django.db import connections
+from django.test import TestCase
+from django.test import override_settings
+
+from common.constants import QueryBudget
+from common.decorators import enforce_query_budget
+from common.exceptions import QueryBudgetExceeded
+from common.query_budgets import QueryCounter
+from common.query_budgets import check_query_budget
+from common.query_budgets import count_queries
+from common.query_budgets import format_query_count_report
+from core.models import Client
+
+
+def dummy_view_with_two_queries(_request):
+    list(Client.objects.all())
+    list(Client.objects.select_for_update().all())
+    return 'response'
+
+
+class QueryCounterTestCase(TestCase):
+
+    def test_that_only_row_locking_statements_are_counted_as_row_locks(self):
+        query_counter = QueryCounter()
+
+        for sql in [
+            'SELECT "core_client"."id" FROM "core_client"',
+            'INSERT INTO "core_client" ("public_key") VALUES (\'a\')',
+            'SAVEPOINT "s1_x1"',
+            'UPDATE "core_subtask" SET "state" = \'REPORTED\'',
+            'DELETE FROM "core_pendingresponse"',
+            'SELECT "core_subtask"."id" FROM "core_subtask" FOR UPDATE',
+            'WITH claimed AS (SELECT id FROM x LIMIT 1 FOR UPDATE SKIP LOCKED) UPDATE x SET delivered = true',
+        ]:
+            query_counter.add_query(sql)
+
+        self.assertEqual(query_counter.number_of_queries, 7)
+        self.assertEqual(query_counter.number_of_row_locks, 4)
+
+
+class CountQueriesTestCase(TestCase):
+
+    multi_db = True
+
+    def test_that_queries_executed_in_context_are_counted_and_cursor_factories_are_restored(self):
+        with count_queries() as query_counter:
+            dummy_view_with_two_queries(None)
+
+        self.assertEqual(query_counter.number_of_queries, 2)
+        self.assertEqual(query_counter.number_of_row_locks, 1)
+        self.assertNotIn('make_cursor', connections['control'].__dict__)
+        self.assertNotIn('make_debug_cursor', connections['control'].__dict__)
+
+    def test_that_queries_are_counted_when_query_log_is_full(self):
+        previous_queries_log = connections['control'].queries_log
+        connections['control'].queries_log = deque([{'sql': '', 'time': '0'}], maxlen=1)
+        try:
+            with override_settings(DEBUG=True), count_queries() as query_counter:
+                dummy_view_with_two_queries(None)
+        finally:
+            connections['control'].queries_log = previous_queries_log
+
+        self.assertEqual(query_counter.number_of_queries, 2)
+        self.assertEqual(query_counter.number_of_row_locks, 1)
+
+    def test_that_queries_are_counted_by_nested_contexts(self):
+        with count_queries() as outer_query_counter:
+            list(Client.objects.all())
+            with count_queries() as inner_query_counter:
+                dummy_view_with_two_queries(None)
+
+        self.assertEqual(inner_query_counter.number_of_queries, 2)
+        self.assertEqual(outer_query_counter.number_of_queries, 3)
+        self.assertNotIn('make_cursor', connections['control'].__dict__)
+
+
+class CheckQueryBudgetTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.query_counter = QueryCounter()
+        self.query_counter.number_of_queries = 5
+        self.query_counter.number_of_row_locks = 2
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='raise')
+    def test_that_views_without_budget_are_not_checked(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {}):
+            check_query_budget('send', 'Ping', self.query_counter)
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='raise')
+    def test_that_budget_which_is_not_exceeded_passes(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {('send', 'Ping'): QueryBudget(5, 2)}):
+            check_query_budget('send', 'Ping', self.query_counter)
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='raise')
+    def test_that_exceeded_number_of_queries_raises_exception(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {('send', 'Ping'): QueryBudget(4, 2)}):
+            with self.assertRaises(QueryBudgetExceeded):
+                check_query_budget('send', 'Ping', self.query_counter)
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='raise')
+    def test_that_exceeded_number_of_row_locks_raises_exception(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {('send', 'Ping'): QueryBudget(5, 1)}):
+            with self.assertRaises(QueryBudgetExceeded):
+                check_query_budget('send', 'Ping', self.query_counter)
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='log')
+    def test_that_exceeded_budget_is_logged_as_warning(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {('send', 'Ping'): QueryBudget(4, 2)}), \
+                mock.patch('common.query_budgets.log') as log_mock:
+            check_query_budget('send', 'Ping', self.query_counter)
+
+        log_mock.assert_called_once()
+
+
+class RecordQueryCountTestCase(TestCase):
+
+    def _create_query_counter(self, number_of_queries, number_of_row_locks):  # pylint: disable=no-self-use
+        query_counter = QueryCounter()
+        query_counter.number_of_queries = number_of_queries
+        query_counter.number_of_row_locks = number_of_row_locks
+        return query_counter
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='log')
+    def test_that_highest_counts_are_recorded_and_reported_next_to_budgets(self):
+        with mock.patch('common.query_budgets.maximum_query_counts', {}), \
+                mock.patch('common.query_budgets.QUERY_BUDGETS', {
+                    ('send', 'Ping'): QueryBudget(10, 2),
+                    ('upload', None): QueryBudget(0, 0),
+                }):
+            check_query_budget('send', 'Ping', self._create_query_counter(5, 1))
+            check_query_budget('send', 'Ping', self._create_query_counter(3, 2))
+            check_query_budget('receive', 'ClientAuthorization', self._create_query_counter(4, 0))
+
+            report = format_query_count_report()
+
+        self.assertEqual(report, [
+            'receive ClientAuthorization: 4 queries, 0 row locks (budget: none)',
+            'send Ping: 5 queries, 2 row locks (budget: 10 queries, 2 row locks)',
+            'upload None: not measured (budget: 0 queries, 0 row locks)',
+        ])
+
+
+class EnforceQueryBudgetTestCase(TestCase):
+
+    multi_db = True
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION='raise')
+    def test_that_view_exceeding_its_budget_raises_exception(self):
+        with mock.patch('common.query_budgets.QUERY_BUDGETS', {('dummy_view_with_two_queries', None): QueryBudget(1, 1)}):
+            with self.assertRaises(QueryBudgetExceeded):
+                enforce_query_budget(dummy_view_with_two_queries)(None)
+
+    @override_settings(QUERY_BUDGET_VIOLATION_ACTION=None)
+    def test_that_queries_are_not_counted_when_budgets_are_disabled(self):
+        with mock.patch('common.decorators.count_queries') as count_queries_mock:
+            response = enforce_query_budget(dummy_view_with_two_queries)(None)
+
+        self.assertEqual(response, 'response')
+        count_queries_mock.assert_not_called()
@@ -4,6 +4,7 @@ from django.conf.urls import url, include
 from django.contrib   import admin
 
 import core.urls
+import core.views
 import conductor.urls
 import gatekeeper.urls
 
@@ -59,6 +60,15 @@ AVAILABLE_CONCENT_FEATURES = OrderedDict([
         ],
     }),
 
+    ("metrics", {
+        "required_django_apps": [
+            "core",
+        ],
+        "url_patterns": [
+            url(r'^metrics/$', core.views.metrics, name='metrics'),
+        ],
+    }),
+
     ("middleman", {
         "required_django_apps": [
             "middleman",
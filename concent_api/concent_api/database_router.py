@@ -2,17 +2,26 @@ from typing import Any
 
 from django.db.models import Model
 
+from common.constants import DATABASE_REPLICAS
 from concent_api.constants import APP_LABEL_TO_DATABASE
 
 
 class DatabaseRouter:
     """ A router to control all database operations on models in Concent. """
 
-    def db_for_read(self, model: Model, **hints: Any) -> str:  # pylint: disable=unused-argument,no-self-use
-        """ Returns database name which should be used to read given models data. """
+    def db_for_read(self, model: Model, **hints: Any) -> str:  # pylint: disable=no-self-use
+        """
+        Returns database name which should be used to read given models data.
+        Objects related to an instance read from a replica are read from the same replica.
+        Other queries are sent to replicas only if marked explicitly with `read_from_replica()`.
+        """
         assert model._meta.app_label in APP_LABEL_TO_DATABASE
 
-        return APP_LABEL_TO_DATABASE[model._meta.app_label]
+        database = APP_LABEL_TO_DATABASE[model._meta.app_label]
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == DATABASE_REPLICAS.get(database):
+            return instance._state.db
+        return database
 
     def db_for_write(self, model: Model, **hints: Any) -> str:  # pylint: disable=unused-argument,no-self-use
         """ Returns database name which should be used to write given models data. """
@@ -31,6 +40,7 @@ class DatabaseRouter:
         """
         Returns True if migration for given app_label should be created.
         Migration for given app_label should be created if its assigned database is equal to currently migrated.
+        Replicas are never migrated.
         """
         assert app_label in APP_LABEL_TO_DATABASE
 
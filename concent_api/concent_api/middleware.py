@@ -15,6 +15,12 @@ from mimeparse import best_match
 
 from concent_api.constants import DEFAULT_ERROR_MESSAGE
 from common.constants import ErrorCode
+from common.metrics import updating_shared_metrics
+from common.profiling import REQUEST_PHASE
+from common.profiling import finish_request_profile
+from common.profiling import phase_histograms
+from common.profiling import profile_phase
+from common.profiling import start_request_profile
 
 
 class GolemMessagesVersionMiddleware():
@@ -53,6 +59,35 @@ class ConcentVersionMiddleware(object):
         return response
 
 
+class RequestProfilingMiddleware(object):
+    """
+    Used to measure wall-clock time and time spent in database queries in each phase of processing the request
+    if REQUEST_PROFILING setting is enabled. In DEBUG mode measurements are attached to the response
+    in `Server-Timing` header, otherwise they are added to per-process histograms.
+    """
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.REQUEST_PROFILING:
+            return self.get_response(request)
+
+        request_profile = start_request_profile()
+        try:
+            with profile_phase(REQUEST_PHASE):
+                response = self.get_response(request)
+        finally:
+            finish_request_profile()
+
+        if settings.DEBUG:
+            response['Server-Timing'] = request_profile.to_server_timing_header()
+        else:
+            with updating_shared_metrics():
+                phase_histograms.add_request_profile(request_profile)
+        return response
+
+
 def determine_return_type(request_meta: dict) -> str:
     try:
         # The list of preferred mime-types should be sorted in order of increasing desirability,
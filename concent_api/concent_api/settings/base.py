@@ -45,6 +45,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'concent_api.middleware.GolemMessagesVersionMiddleware',
     'concent_api.middleware.ConcentVersionMiddleware',
+    'concent_api.middleware.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'concent_api.urls'
@@ -96,11 +97,25 @@ DATABASES = {
 
         # Wrap each request in a transactions and rolled back on failure by default
         'ATOMIC_REQUESTS': True,
-    }
+    },
+    # Optional read-only replicas of the databases above, named 'control_replica' and 'storage_replica'.
+    # Reporting queries of the admin panel and of the metrics endpoint are sent to a replica if it is defined
+    # and does not lag behind the primary more than DATABASE_REPLICA_MAXIMUM_LAG. Otherwise they go to the primary.
+    # 'control_replica': {
+    #     'ENGINE':   'django.db.backends.postgresql_psycopg2',
+    #     'NAME':     'concent_api',
+    #     'HOST':     '',
+    #
+    #     # Nothing is written to replicas so there is no need to open a transaction for every request.
+    #     'ATOMIC_REQUESTS': False,
+    # },
 }  # type: Dict[str, Dict]
 
 DATABASE_ROUTERS = ['concent_api.database_router.DatabaseRouter']
 
+# Maximum number of seconds a replica of a database can lag behind the primary and still be read from.
+DATABASE_REPLICA_MAXIMUM_LAG = 5
+
 # Defines database used by Constance app.
 CONSTANCE_DBS = ['control']
 
@@ -172,9 +187,12 @@ LOGGING = {
             'class':   'django.utils.log.AdminEmailHandler',
         },
         'console': {
-            'level':     'INFO',
-            'class':     'logging.StreamHandler',
-            'formatter': 'console',
+            # Records are formatted in the thread which logs them but written to the stream by a background thread
+            # so that requests do not wait for the output.
+            'level':         'INFO',
+            'class':         'common.logging_handlers.NonBlockingHandler',
+            'handler_class': 'logging.StreamHandler',
+            'formatter':     'console',
         },
     },
     'loggers': {
@@ -316,6 +334,44 @@ ADDITIONAL_VERIFICATION_TIME_MULTIPLIER = 2.0
 # A global constant defining deadline for submitting SubtaskResultsVerify.
 ADDITIONAL_VERIFICATION_CALL_TIME = int(constants.AVCT.total_seconds())
 
+# A global constant defining the maximum time (in seconds) for which `/receive-long-poll/` endpoint waits for a new message
+# for the client before returning an empty response. 0 makes it behave just like `/receive/`.
+LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME = 30
+
+# Defines if requests waiting in `/receive-long-poll/` should be woken up by a single listening connection per process
+# instead of each of them listening on its own database connection. Waiting requests then hold no database connection,
+# which lets threaded workers keep many clients waiting at once.
+LONG_POLLING_SHARED_LISTENER = False
+
+# A global constant defining for how long (in seconds) messages built in advance, when a response for the client is queued,
+# can be delivered to the client instead of building them again when the client receives them.
+# Such messages have timestamps from the moment they were queued. 0 disables building messages in advance.
+PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE = 0
+
+# Directory in which each process (API server workers and Celery workers alike) stores its request and task metrics,
+# so that the metrics endpoint can export their sum. None means that the endpoint exports only metrics of the process
+# which serves it. Files of processes which have exited are kept so that counters never decrease. The directory
+# should be shared by all Concent processes on the machine and emptied when they are all restarted.
+METRICS_DIRECTORY = None
+
+# Defines if wall-clock time and time spent in database queries should be measured in each phase of processing requests.
+# In DEBUG mode measurements are attached to responses in `Server-Timing` header,
+# otherwise they are aggregated into per-process histograms for each message type.
+REQUEST_PROFILING = False
+
+# Fraction of incoming messages, between 0 and 1, which are logged with all their fields as JSON.
+# Dumping whole messages is expensive at high request rates. 0 disables dumps and 1 dumps every message.
+LOG_MESSAGE_DUMP_SAMPLING_RATE = 1.0
+
+# What happens when a view executes more SQL queries or row-locking statements than allowed by its budget in QUERY_BUDGETS:
+# 'log' logs a warning, 'raise' raises an exception (meant for tests) and None disables counting queries altogether.
+QUERY_BUDGET_VIOLATION_ACTION = None
+
+# Defines if Subtask.clean() should run all validations every time. Otherwise validations which deserialize related
+# messages are run again only when the fields they depend on change, which makes a plain state change cheap.
+# Meant for debugging, to catch invalid data which the incremental validation would not look at.
+STRICT_SUBTASK_VALIDATION = False
+
 # Which components of this Django application should be enabled in this particular server instance.
 # The application is basically a bunch of services with totally different responsibilites that share a lot of code.
 # In a typical setup each instance has only one or two features enabled. Some of them provide public APIs, others are
@@ -329,6 +385,8 @@ ADDITIONAL_VERIFICATION_CALL_TIME = int(constants.AVCT.total_seconds())
 # - "verifier": Celery worker that processes verification and notifies control cluster about its result.
 # - "middleman":  A socket server that mediates communication between Signing Service and Concent.
 # - "gatekeeper":  An internal helper that validates file transfer tokens.
+# - "metrics":  An internal endpoint exporting request, task and queue metrics in Prometheus text format.
+#               Request and task metrics of all processes are exported only if METRICS_DIRECTORY is set.
 # - "admin-panel": Django admin panel that provides access to database content and service statistics.
 CONCENT_FEATURES = []  # type: ignore
 
@@ -26,6 +26,7 @@ CONCENT_FEATURES = [
     "conductor-urls",
     "conductor-worker",
     "gatekeeper",
+    "metrics",
     "middleman",
     "verifier",
 ]
@@ -52,3 +53,5 @@ SIGNING_SERVICE_PUBLIC_KEY = b'\x19\xaew&P>\xce\xd7D\xfb\xbff)55\xc1%\xea\xebN\x
 GNT_DEPOSIT_CONTRACT_ADDRESS = '0xcfB81A6EE3ae6aD4Ac59ddD21fB4589055c13DaD'
 
 ADDITIONAL_VERIFICATION_COST = 10
+
+QUERY_BUDGET_VIOLATION_ACTION = 'log'
@@ -56,6 +56,7 @@ CONCENT_FEATURES = [
     "conductor-urls",
     "conductor-worker",
     "gatekeeper",
+    "metrics",
     "middleman",
     "verifier",
 ]
@@ -86,6 +87,12 @@ SIGNING_SERVICE_PUBLIC_KEY = b'\x19\xaew&P>\xce\xd7D\xfb\xbff)55\xc1%\xea\xebN\x
 
 ADDITIONAL_VERIFICATION_COST = 0
 
+# Any request exceeding its budget in QUERY_BUDGETS fails the test which sent it.
+QUERY_BUDGET_VIOLATION_ACTION = 'raise'
+
+# Tests run the incremental validation used in production. Tests of the strict validation enable it with override_settings().
+STRICT_SUBTASK_VALIDATION = False
+
 # disable HandleServerErrorMiddleware in tests
 if MIDDLEWARE.index('concent_api.middleware.HandleServerErrorMiddleware') is not None:
     MIDDLEWARE.remove('concent_api.middleware.HandleServerErrorMiddleware')
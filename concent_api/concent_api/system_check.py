@@ -11,6 +11,8 @@ from django.core.exceptions import ValidationError
 
 from golem_messages import constants
 
+from common.constants import DATABASE_REPLICAS
+from common.constants import QueryBudgetViolationAction
 from common.exceptions import ConcentValidationError
 from concent_api.constants import AVAILABLE_CONCENT_FEATURES
 from core.constants import ETHEREUM_PUBLIC_KEY_LENGTH
@@ -445,6 +447,150 @@ def create_error_62_additional_verification_call_time_has_wrong_value() -> Error
     )
 
 
+def create_error_63_long_polling_receive_maximum_wait_time_is_not_set() -> Error:
+    return Error(
+        "LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME is not set",
+        hint="LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME must be set to non-negative integer",
+        id="concent.E063",
+    )
+
+
+def create_error_64_long_polling_receive_maximum_wait_time_has_wrong_value() -> Error:
+    return Error(
+        "LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME has wrong value",
+        hint="LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME must be set to non-negative integer",
+        id="concent.E064",
+    )
+
+
+def create_error_65_pending_response_payload_maximum_age_is_not_set() -> Error:
+    return Error(
+        "PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE is not set",
+        hint="PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE must be set to non-negative integer",
+        id="concent.E065",
+    )
+
+
+def create_error_66_pending_response_payload_maximum_age_has_wrong_value() -> Error:
+    return Error(
+        "PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE has wrong value",
+        hint="PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE must be set to non-negative integer",
+        id="concent.E066",
+    )
+
+
+def create_error_67_request_profiling_is_not_set() -> Error:
+    return Error(
+        "REQUEST_PROFILING is not set",
+        hint="Set REQUEST_PROFILING to True if you want to measure duration of phases of processing requests, otherwise False.",
+        id="concent.E067",
+    )
+
+
+def create_error_68_request_profiling_has_wrong_type(value: Any) -> Error:
+    return Error(
+        f"Setting REQUEST_PROFILING has incorrect type `{type(value)}` instead of `bool`.",
+        hint="Set setting REQUEST_PROFILING to be a boolean.",
+        id="concent.E068",
+    )
+
+
+def create_error_69_log_message_dump_sampling_rate_is_not_set() -> Error:
+    return Error(
+        "LOG_MESSAGE_DUMP_SAMPLING_RATE is not set",
+        hint="LOG_MESSAGE_DUMP_SAMPLING_RATE must be set to a number between 0 and 1",
+        id="concent.E069",
+    )
+
+
+def create_error_70_log_message_dump_sampling_rate_has_wrong_value() -> Error:
+    return Error(
+        "LOG_MESSAGE_DUMP_SAMPLING_RATE has wrong value",
+        hint="LOG_MESSAGE_DUMP_SAMPLING_RATE must be set to a number between 0 and 1",
+        id="concent.E070",
+    )
+
+
+def create_error_71_query_budget_violation_action_is_not_set() -> Error:
+    return Error(
+        "QUERY_BUDGET_VIOLATION_ACTION is not set",
+        hint=f"QUERY_BUDGET_VIOLATION_ACTION must be set to None or one of: {[action.value for action in QueryBudgetViolationAction]}",
+        id="concent.E071",
+    )
+
+
+def create_error_72_query_budget_violation_action_has_wrong_value(value: Any) -> Error:
+    return Error(
+        f"QUERY_BUDGET_VIOLATION_ACTION has wrong value `{value}`",
+        hint=f"QUERY_BUDGET_VIOLATION_ACTION must be set to None or one of: {[action.value for action in QueryBudgetViolationAction]}",
+        id="concent.E072",
+    )
+
+
+def create_error_73_long_polling_shared_listener_is_not_set() -> Error:
+    return Error(
+        "LONG_POLLING_SHARED_LISTENER is not set",
+        hint="Set LONG_POLLING_SHARED_LISTENER to True if waiting long-polling requests should not hold database connections, otherwise False.",
+        id="concent.E073",
+    )
+
+
+def create_error_74_long_polling_shared_listener_has_wrong_type(value: Any) -> Error:
+    return Error(
+        f"Setting LONG_POLLING_SHARED_LISTENER has incorrect type `{type(value)}` instead of `bool`.",
+        hint="Set setting LONG_POLLING_SHARED_LISTENER to be a boolean.",
+        id="concent.E074",
+    )
+
+
+def create_error_75_strict_subtask_validation_is_not_set() -> Error:
+    return Error(
+        "STRICT_SUBTASK_VALIDATION is not set",
+        hint="Set STRICT_SUBTASK_VALIDATION to True if Subtask.clean() should always run all validations, otherwise False.",
+        id="concent.E075",
+    )
+
+
+def create_error_76_strict_subtask_validation_has_wrong_type(value: Any) -> Error:
+    return Error(
+        f"Setting STRICT_SUBTASK_VALIDATION has incorrect type `{type(value)}` instead of `bool`.",
+        hint="Set setting STRICT_SUBTASK_VALIDATION to be a boolean.",
+        id="concent.E076",
+    )
+
+
+def create_error_77_database_replica_maximum_lag_is_not_set() -> Error:
+    return Error(
+        "DATABASE_REPLICA_MAXIMUM_LAG is not set",
+        hint="Set DATABASE_REPLICA_MAXIMUM_LAG to the number of seconds replicas can lag behind the primary database and still be read from.",
+        id="concent.E077",
+    )
+
+
+def create_error_78_database_replica_maximum_lag_has_wrong_value(value: Any) -> Error:
+    return Error(
+        f"DATABASE_REPLICA_MAXIMUM_LAG has wrong value `{value}`",
+        hint="DATABASE_REPLICA_MAXIMUM_LAG must be a non-negative number.",
+        id="concent.E078",
+    )
+
+
+def create_error_79_metrics_directory_is_not_set() -> Error:
+    return Error(
+        "METRICS_DIRECTORY is not set",
+        hint="Set METRICS_DIRECTORY to the path to a directory shared by all Concent processes or to None.",
+        id="concent.E079",
+    )
+
+
+def create_error_80_metrics_directory_is_not_writable(value: Any) -> Error:
+    return Error(
+        f"METRICS_DIRECTORY `{value}` is not a writable directory",
+        hint="Create the directory, give the current user write permissions to it or set METRICS_DIRECTORY to None.",
+        id="concent.E080",
+    )
+
+
 @register()
 def check_settings_concent_features(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
 
@@ -590,6 +736,10 @@ def check_atomic_requests(app_configs: None=None, **kwargs: Any) -> list:  # pyl
     if hasattr(settings, 'DATABASES') and isinstance(settings.DATABASES, dict):
         for database_name, database_config in settings.DATABASES.items():
 
+            # Replicas are only read from so there is nothing to roll back.
+            if database_name in DATABASE_REPLICAS.values():
+                continue
+
             if database_config.get('ENGINE') != 'django.db.backends.dummy':
                 atomic_requests = database_config.get('ATOMIC_REQUESTS', False)
 
@@ -812,3 +962,111 @@ def check_additional_verification_call_time(app_configs: None=None, **kwargs: An
     if not isinstance(settings.ADDITIONAL_VERIFICATION_CALL_TIME, int) or settings.ADDITIONAL_VERIFICATION_CALL_TIME < 0:
         return [create_error_62_additional_verification_call_time_has_wrong_value()]
     return errors
+
+
+@register()
+def check_long_polling_receive_maximum_wait_time(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if 'concent-api' in settings.CONCENT_FEATURES:
+        if not hasattr(settings, 'LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME'):
+            return [create_error_63_long_polling_receive_maximum_wait_time_is_not_set()]
+        if not isinstance(settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME, int) or settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME < 0:
+            return [create_error_64_long_polling_receive_maximum_wait_time_has_wrong_value()]
+
+    return []
+
+
+@register()
+def check_pending_response_payload_maximum_age(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if 'concent-api' in settings.CONCENT_FEATURES or 'concent-worker' in settings.CONCENT_FEATURES:
+        if not hasattr(settings, 'PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE'):
+            return [create_error_65_pending_response_payload_maximum_age_is_not_set()]
+        if not isinstance(settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE, int) or settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE < 0:
+            return [create_error_66_pending_response_payload_maximum_age_has_wrong_value()]
+
+    return []
+
+
+@register()
+def check_request_profiling(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'REQUEST_PROFILING'):
+        return [create_error_67_request_profiling_is_not_set()]
+    if not isinstance(settings.REQUEST_PROFILING, bool):
+        return [create_error_68_request_profiling_has_wrong_type(settings.REQUEST_PROFILING)]
+
+    return []
+
+
+@register()
+def check_log_message_dump_sampling_rate(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'LOG_MESSAGE_DUMP_SAMPLING_RATE'):
+        return [create_error_69_log_message_dump_sampling_rate_is_not_set()]
+    if (
+        not isinstance(settings.LOG_MESSAGE_DUMP_SAMPLING_RATE, (int, float)) or
+        isinstance(settings.LOG_MESSAGE_DUMP_SAMPLING_RATE, bool) or
+        not 0 <= settings.LOG_MESSAGE_DUMP_SAMPLING_RATE <= 1
+    ):
+        return [create_error_70_log_message_dump_sampling_rate_has_wrong_value()]
+
+    return []
+
+
+@register()
+def check_query_budget_violation_action(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'QUERY_BUDGET_VIOLATION_ACTION'):
+        return [create_error_71_query_budget_violation_action_is_not_set()]
+    if (
+        settings.QUERY_BUDGET_VIOLATION_ACTION is not None and
+        settings.QUERY_BUDGET_VIOLATION_ACTION not in [action.value for action in QueryBudgetViolationAction]
+    ):
+        return [create_error_72_query_budget_violation_action_has_wrong_value(settings.QUERY_BUDGET_VIOLATION_ACTION)]
+
+    return []
+
+
+@register()
+def check_long_polling_shared_listener(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if 'concent-api' in settings.CONCENT_FEATURES:
+        if not hasattr(settings, 'LONG_POLLING_SHARED_LISTENER'):
+            return [create_error_73_long_polling_shared_listener_is_not_set()]
+        if not isinstance(settings.LONG_POLLING_SHARED_LISTENER, bool):
+            return [create_error_74_long_polling_shared_listener_has_wrong_type(settings.LONG_POLLING_SHARED_LISTENER)]
+
+    return []
+
+
+@register()
+def check_strict_subtask_validation(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'STRICT_SUBTASK_VALIDATION'):
+        return [create_error_75_strict_subtask_validation_is_not_set()]
+    if not isinstance(settings.STRICT_SUBTASK_VALIDATION, bool):
+        return [create_error_76_strict_subtask_validation_has_wrong_type(settings.STRICT_SUBTASK_VALIDATION)]
+
+    return []
+
+
+@register()
+def check_database_replica_maximum_lag(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'DATABASE_REPLICA_MAXIMUM_LAG'):
+        return [create_error_77_database_replica_maximum_lag_is_not_set()]
+    if (
+        not isinstance(settings.DATABASE_REPLICA_MAXIMUM_LAG, (int, float)) or
+        isinstance(settings.DATABASE_REPLICA_MAXIMUM_LAG, bool) or
+        settings.DATABASE_REPLICA_MAXIMUM_LAG < 0
+    ):
+        return [create_error_78_database_replica_maximum_lag_has_wrong_value(settings.DATABASE_REPLICA_MAXIMUM_LAG)]
+
+    return []
+
+
+@register()
+def check_metrics_directory(app_configs: None=None, **kwargs: Any) -> list:  # pylint: disable=unused-argument
+    if not hasattr(settings, 'METRICS_DIRECTORY'):
+        return [create_error_79_metrics_directory_is_not_set()]
+    if settings.METRICS_DIRECTORY is not None and (
+        not isinstance(settings.METRICS_DIRECTORY, str) or
+        not os.path.isdir(settings.METRICS_DIRECTORY) or
+        not os.access(settings.METRICS_DIRECTORY, os.W_OK)
+    ):
+        return [create_error_80_metrics_directory_is_not_writable(settings.METRICS_DIRECTORY)]
+
+    return []
@@ -76,3 +76,18 @@ class TestAtomicRequestsCheck(TestCase):
         errors = check_atomic_requests()
 
         self.assertEqual(errors, [])
+
+    @override_settings(
+        DATABASES={
+            'control': {
+                'ATOMIC_REQUESTS': True
+            },
+            'control_replica': {
+                'ATOMIC_REQUESTS': False
+            }
+        }
+    )
+    def test_atomic_request_setting_is_not_required_for_replicas(self):
+        errors = check_atomic_requests()
+
+        self.assertEqual(errors, [])
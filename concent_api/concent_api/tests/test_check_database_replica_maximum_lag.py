@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_database_replica_maximum_lag
+from concent_api.system_check import create_error_77_database_replica_maximum_lag_is_not_set
+from concent_api.system_check import create_error_78_database_replica_maximum_lag_has_wrong_value
+
+
+class TestDatabaseReplicaMaximumLagCheck:
+
+    @pytest.mark.parametrize('database_replica_maximum_lag', [
+        0,
+        5,
+        0.5,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_non_negative_number_will_not_produce_error(self, database_replica_maximum_lag):
+        settings.DATABASE_REPLICA_MAXIMUM_LAG = database_replica_maximum_lag
+
+        errors = check_database_replica_maximum_lag()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_database_replica_maximum_lag_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.DATABASE_REPLICA_MAXIMUM_LAG
+
+        errors = check_database_replica_maximum_lag()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_77_database_replica_maximum_lag_is_not_set()])
+
+    @pytest.mark.parametrize('database_replica_maximum_lag', [
+        None,
+        -1,
+        True,
+        '5',
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_database_replica_maximum_lag_with_wrong_value_will_produce_error(self, database_replica_maximum_lag):
+        settings.DATABASE_REPLICA_MAXIMUM_LAG = database_replica_maximum_lag
+
+        errors = check_database_replica_maximum_lag()
+
+        assertpy.assert_that(errors).is_equal_to([
+            create_error_78_database_replica_maximum_lag_has_wrong_value(database_replica_maximum_lag)
+        ])
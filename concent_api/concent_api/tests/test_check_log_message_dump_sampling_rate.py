@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_log_message_dump_sampling_rate
+from concent_api.system_check import create_error_69_log_message_dump_sampling_rate_is_not_set
+from concent_api.system_check import create_error_70_log_message_dump_sampling_rate_has_wrong_value
+
+
+class TestLogMessageDumpSamplingRateCheck:
+
+    @pytest.mark.parametrize('log_message_dump_sampling_rate', [
+        0,
+        0.01,
+        1,
+        1.0,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_number_between_zero_and_one_will_not_produce_error(self, log_message_dump_sampling_rate):
+        settings.LOG_MESSAGE_DUMP_SAMPLING_RATE = log_message_dump_sampling_rate
+
+        errors = check_log_message_dump_sampling_rate()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_log_message_dump_sampling_rate_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.LOG_MESSAGE_DUMP_SAMPLING_RATE
+
+        errors = check_log_message_dump_sampling_rate()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_69_log_message_dump_sampling_rate_is_not_set()])
+
+    @pytest.mark.parametrize('log_message_dump_sampling_rate', [
+        -0.1,
+        1.1,
+        None,
+        True,
+        '0.5',
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_log_message_dump_sampling_rate_with_wrong_value_will_produce_error(self, log_message_dump_sampling_rate):
+        settings.LOG_MESSAGE_DUMP_SAMPLING_RATE = log_message_dump_sampling_rate
+
+        errors = check_log_message_dump_sampling_rate()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_70_log_message_dump_sampling_rate_has_wrong_value()])
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_long_polling_receive_maximum_wait_time
+from concent_api.system_check import create_error_63_long_polling_receive_maximum_wait_time_is_not_set
+from concent_api.system_check import create_error_64_long_polling_receive_maximum_wait_time_has_wrong_value
+
+
+class TestLongPollingReceiveMaximumWaitTimeCheck:
+
+    @pytest.mark.parametrize('long_polling_receive_maximum_wait_time', [
+        0,
+        30,
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_non_negative_integer_will_not_produce_error(self, long_polling_receive_maximum_wait_time):
+        settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME = long_polling_receive_maximum_wait_time
+
+        errors = check_long_polling_receive_maximum_wait_time()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_long_polling_receive_maximum_wait_time_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME
+
+        errors = check_long_polling_receive_maximum_wait_time()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_63_long_polling_receive_maximum_wait_time_is_not_set()])
+
+    @pytest.mark.parametrize('long_polling_receive_maximum_wait_time', [
+        -1,
+        None,
+        1.1,
+        '30',
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_long_polling_receive_maximum_wait_time_with_wrong_value_will_produce_error(self, long_polling_receive_maximum_wait_time):
+        settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME = long_polling_receive_maximum_wait_time
+
+        errors = check_long_polling_receive_maximum_wait_time()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_64_long_polling_receive_maximum_wait_time_has_wrong_value()])
+
+    @override_settings(CONCENT_FEATURES=[])
+    def test_that_long_polling_receive_maximum_wait_time_is_not_checked_without_concent_api_feature(self):  # pylint: disable=no-self-use
+        del settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME
+
+        errors = check_long_polling_receive_maximum_wait_time()
+
+        assertpy.assert_that(errors).is_empty()
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_long_polling_shared_listener
+from concent_api.system_check import create_error_73_long_polling_shared_listener_is_not_set
+from concent_api.system_check import create_error_74_long_polling_shared_listener_has_wrong_type
+
+
+class TestLongPollingSharedListenerCheck:
+
+    @pytest.mark.parametrize('long_polling_shared_listener', [
+        True,
+        False,
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_boolean_will_not_produce_error(self, long_polling_shared_listener):
+        settings.LONG_POLLING_SHARED_LISTENER = long_polling_shared_listener
+
+        errors = check_long_polling_shared_listener()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_long_polling_shared_listener_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.LONG_POLLING_SHARED_LISTENER
+
+        errors = check_long_polling_shared_listener()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_73_long_polling_shared_listener_is_not_set()])
+
+    @pytest.mark.parametrize('long_polling_shared_listener', [
+        None,
+        1,
+        'True',
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_long_polling_shared_listener_with_wrong_type_will_produce_error(self, long_polling_shared_listener):
+        settings.LONG_POLLING_SHARED_LISTENER = long_polling_shared_listener
+
+        errors = check_long_polling_shared_listener()
+
+        assertpy.assert_that(errors).is_equal_to([
+            create_error_74_long_polling_shared_listener_has_wrong_type(long_polling_shared_listener)
+        ])
+
+    @override_settings(CONCENT_FEATURES=[])
+    def test_that_setting_is_not_checked_without_concent_api_feature(self):  # pylint: disable=no-self-use
+        settings.LONG_POLLING_SHARED_LISTENER = None
+
+        errors = check_long_polling_shared_listener()
+
+        assertpy.assert_that(errors).is_empty()
@@ -0,0 +1,54 @@
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_metrics_directory
+from concent_api.system_check import create_error_79_metrics_directory_is_not_set
+from concent_api.system_check import create_error_80_metrics_directory_is_not_writable
+
+
+class TestMetricsDirectoryCheck:
+
+    @override_settings()
+    def test_that_none_will_not_produce_error(self):  # pylint: disable=no-self-use
+        settings.METRICS_DIRECTORY = None
+
+        errors = check_metrics_directory()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_existing_writable_directory_will_not_produce_error(self):  # pylint: disable=no-self-use
+        with tempfile.TemporaryDirectory() as metrics_directory:
+            settings.METRICS_DIRECTORY = metrics_directory
+
+            errors = check_metrics_directory()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_metrics_directory_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.METRICS_DIRECTORY
+
+        errors = check_metrics_directory()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_79_metrics_directory_is_not_set()])
+
+    @pytest.mark.parametrize('metrics_directory', [
+        '/nonexistent/metrics/directory',
+        __file__,
+        1,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_metrics_directory_which_is_not_writable_directory_will_produce_error(self, metrics_directory):
+        settings.METRICS_DIRECTORY = metrics_directory
+
+        errors = check_metrics_directory()
+
+        assertpy.assert_that(errors).is_equal_to([
+            create_error_80_metrics_directory_is_not_writable(metrics_directory)
+        ])
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_pending_response_payload_maximum_age
+from concent_api.system_check import create_error_65_pending_response_payload_maximum_age_is_not_set
+from concent_api.system_check import create_error_66_pending_response_payload_maximum_age_has_wrong_value
+
+
+class TestPendingResponsePayloadMaximumAgeCheck:
+
+    @pytest.mark.parametrize('pending_response_payload_maximum_age', [
+        0,
+        30,
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-worker'])
+    def test_that_non_negative_integer_will_not_produce_error(self, pending_response_payload_maximum_age):
+        settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE = pending_response_payload_maximum_age
+
+        errors = check_pending_response_payload_maximum_age()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_pending_response_payload_maximum_age_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE
+
+        errors = check_pending_response_payload_maximum_age()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_65_pending_response_payload_maximum_age_is_not_set()])
+
+    @pytest.mark.parametrize('pending_response_payload_maximum_age', [
+        -1,
+        None,
+        1.1,
+        '30',
+    ])  # pylint: disable=no-self-use
+    @override_settings(CONCENT_FEATURES=['concent-api'])
+    def test_that_pending_response_payload_maximum_age_with_wrong_value_will_produce_error(self, pending_response_payload_maximum_age):
+        settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE = pending_response_payload_maximum_age
+
+        errors = check_pending_response_payload_maximum_age()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_66_pending_response_payload_maximum_age_has_wrong_value()])
+
+    @override_settings(CONCENT_FEATURES=[])
+    def test_that_pending_response_payload_maximum_age_is_not_checked_without_concent_api_and_concent_worker_features(self):  # pylint: disable=no-self-use
+        del settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE
+
+        errors = check_pending_response_payload_maximum_age()
+
+        assertpy.assert_that(errors).is_empty()
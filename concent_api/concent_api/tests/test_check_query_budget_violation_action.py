@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_query_budget_violation_action
+from concent_api.system_check import create_error_71_query_budget_violation_action_is_not_set
+from concent_api.system_check import create_error_72_query_budget_violation_action_has_wrong_value
+
+
+class TestQueryBudgetViolationActionCheck:
+
+    @pytest.mark.parametrize('query_budget_violation_action', [
+        None,
+        'log',
+        'raise',
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_none_or_known_action_will_not_produce_error(self, query_budget_violation_action):
+        settings.QUERY_BUDGET_VIOLATION_ACTION = query_budget_violation_action
+
+        errors = check_query_budget_violation_action()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_query_budget_violation_action_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.QUERY_BUDGET_VIOLATION_ACTION
+
+        errors = check_query_budget_violation_action()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_71_query_budget_violation_action_is_not_set()])
+
+    @pytest.mark.parametrize('query_budget_violation_action', [
+        'warn',
+        'RAISE',
+        '',
+        False,
+        1,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_query_budget_violation_action_with_wrong_value_will_produce_error(self, query_budget_violation_action):
+        settings.QUERY_BUDGET_VIOLATION_ACTION = query_budget_violation_action
+
+        errors = check_query_budget_violation_action()
+
+        assertpy.assert_that(errors).is_equal_to([
+            create_error_72_query_budget_violation_action_has_wrong_value(query_budget_violation_action)
+        ])
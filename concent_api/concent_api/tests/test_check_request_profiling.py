@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_request_profiling
+from concent_api.system_check import create_error_67_request_profiling_is_not_set
+from concent_api.system_check import create_error_68_request_profiling_has_wrong_type
+
+
+class TestRequestProfilingCheck:
+
+    @pytest.mark.parametrize('request_profiling', [
+        True,
+        False,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_boolean_will_not_produce_error(self, request_profiling):
+        settings.REQUEST_PROFILING = request_profiling
+
+        errors = check_request_profiling()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_request_profiling_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.REQUEST_PROFILING
+
+        errors = check_request_profiling()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_67_request_profiling_is_not_set()])
+
+    @pytest.mark.parametrize('request_profiling', [
+        None,
+        1,
+        'True',
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_request_profiling_with_wrong_type_will_produce_error(self, request_profiling):
+        settings.REQUEST_PROFILING = request_profiling
+
+        errors = check_request_profiling()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_68_request_profiling_has_wrong_type(request_profiling)])
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.test import override_settings
+
+import assertpy
+import pytest
+
+from concent_api.system_check import check_strict_subtask_validation
+from concent_api.system_check import create_error_75_strict_subtask_validation_is_not_set
+from concent_api.system_check import create_error_76_strict_subtask_validation_has_wrong_type
+
+
+class TestStrictSubtaskValidationCheck:
+
+    @pytest.mark.parametrize('strict_subtask_validation', [
+        True,
+        False,
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_boolean_will_not_produce_error(self, strict_subtask_validation):
+        settings.STRICT_SUBTASK_VALIDATION = strict_subtask_validation
+
+        errors = check_strict_subtask_validation()
+
+        assertpy.assert_that(errors).is_empty()
+
+    @override_settings()
+    def test_that_strict_subtask_validation_not_set_will_produce_error(self):  # pylint: disable=no-self-use
+        del settings.STRICT_SUBTASK_VALIDATION
+
+        errors = check_strict_subtask_validation()
+
+        assertpy.assert_that(errors).is_equal_to([create_error_75_strict_subtask_validation_is_not_set()])
+
+    @pytest.mark.parametrize('strict_subtask_validation', [
+        None,
+        1,
+        'True',
+    ])  # pylint: disable=no-self-use
+    @override_settings()
+    def test_that_strict_subtask_validation_with_wrong_type_will_produce_error(self, strict_subtask_validation):
+        settings.STRICT_SUBTASK_VALIDATION = strict_subtask_validation
+
+        errors = check_strict_subtask_validation()
+
+        assertpy.assert_that(errors).is_equal_to([
+            create_error_76_strict_subtask_validation_has_wrong_type(strict_subtask_validation)
+        ])
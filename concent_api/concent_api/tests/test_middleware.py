@@ -14,6 +14,8 @@ from golem_messages         import __version__
 
 from concent_api.constants import DEFAULT_ERROR_MESSAGE
 from concent_api.middleware import determine_return_type
+from common.profiling import REQUEST_PHASE
+from common.profiling import phase_histograms
 from core.tests.utils import ConcentIntegrationTestCase
 from common.constants import ErrorCode
 from common.testing_helpers import generate_ecc_key_pair
@@ -111,6 +113,57 @@ class ConcentVersionMiddlewareTest(TestCase):
         )
 
 
+@override_settings(
+    CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
+    CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
+)
+class RequestProfilingMiddlewareTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        phase_histograms.clear()
+        self.serialized_ping_message = dump(message.Ping(), PROVIDER_PRIVATE_KEY, CONCENT_PUBLIC_KEY)
+
+    def tearDown(self):
+        phase_histograms.clear()
+        super().tearDown()
+
+    def _send_ping(self):
+        return self.client.post(
+            reverse('core:send'),
+            data=self.serialized_ping_message,
+            content_type='application/octet-stream',
+            HTTP_X_Golem_Messages=settings.GOLEM_MESSAGES_VERSION,
+        )
+
+    @override_settings(REQUEST_PROFILING=True, DEBUG=True)
+    def test_that_middleware_attaches_server_timing_header_in_debug_mode(self):
+        response = self._send_ping()
+
+        self.assertFalse(500 <= response.status_code < 600)
+        self.assertIn('server-timing', response._headers)
+        self.assertIn('request;dur=', response._headers['server-timing'][1])
+        self.assertIn('load_message;dur=', response._headers['server-timing'][1])
+        self.assertEqual(phase_histograms.get_snapshot(), {})
+
+    @override_settings(REQUEST_PROFILING=True, DEBUG=False)
+    def test_that_middleware_adds_measurements_to_histograms_when_not_in_debug_mode(self):
+        response = self._send_ping()
+
+        self.assertFalse(500 <= response.status_code < 600)
+        self.assertNotIn('server-timing', response._headers)
+        snapshot = phase_histograms.get_snapshot()
+        self.assertEqual(snapshot[('Ping', REQUEST_PHASE, 'wall_time')]['count'], 1)
+        self.assertEqual(snapshot[('Ping', 'load_message', 'database_time')]['count'], 1)
+
+    @override_settings(REQUEST_PROFILING=False, DEBUG=True)
+    def test_that_middleware_does_nothing_when_request_profiling_is_disabled(self):
+        response = self._send_ping()
+
+        self.assertNotIn('server-timing', response._headers)
+        self.assertEqual(phase_histograms.get_snapshot(), {})
+
+
 @override_settings(
     CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
     CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
@@ -0,0 +1,16 @@
+import os
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    If CONCENT_REPORT_QUERY_COUNTS environment variable is set, reports the highest numbers of queries and row locks
+    counted in a single request of each view during the test run, next to budgets from QUERY_BUDGETS.
+    """
+    if os.environ.get('CONCENT_REPORT_QUERY_COUNTS') is None:
+        return
+
+    from common.query_budgets import format_query_count_report
+
+    terminalreporter.section('query counts')
+    for line in format_query_count_report():
+        terminalreporter.write_line(line)
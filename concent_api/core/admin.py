@@ -6,6 +6,7 @@ from django.db.models import QuerySet
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
 from django.http.request import HttpRequest
+from common.admin import ModelAdminReadFromReplicaMixin
 from common.admin import ModelAdminReadOnlyMixin
 from common.helpers import get_current_utc_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
@@ -14,7 +15,6 @@ from .models import DepositClaim
 from .models import PendingResponse
 from .models import StoredMessage
 from .models import Subtask
-from .models import SubtaskWithTimingColumnsManager
 
 ACTIVE_STATE_NAMES = [x.name for x in Subtask.ACTIVE_STATES]
 PASSIVE_STATE_NAMES = [x.name for x in Subtask.PASSIVE_STATES]
@@ -42,14 +42,14 @@ class ActivePassiveDownloadsStateFilter(admin.SimpleListFilter):
                 Q(state__in=ACTIVE_STATE_NAMES, next_deadline__lt=parse_timestamp_to_utc_datetime(current_timestamp))
             )
         elif self.value() == 'active_or_downloads':
-            return Subtask.objects_with_timing_columns.filter(
+            return queryset.filter(
                 Q(download_deadline__gte=current_timestamp, state=Subtask.SubtaskState.RESULT_UPLOADED.name) |  # pylint: disable=no-member
                 Q(state__in=ACTIVE_STATE_NAMES, next_deadline__gte=parse_timestamp_to_utc_datetime(current_timestamp))
             )
         return queryset
 
 
-class SubtaskAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
+class SubtaskAdmin(ModelAdminReadFromReplicaMixin, ModelAdminReadOnlyMixin, admin.ModelAdmin):
     list_display = [
         'subtask_id',
         'task_id',
@@ -84,17 +84,13 @@ class SubtaskAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
         return subtask.requestor.public_key
     get_requestor_public_key.short_description = 'Requestor public key'  # type: ignore
 
-    @classmethod
-    def get_queryset(cls, request: HttpRequest) -> SubtaskWithTimingColumnsManager:
-        return Subtask.objects_with_timing_columns
-
     @classmethod
     def download_deadline(cls, subtask: Subtask) -> datetime.datetime:
         return parse_timestamp_to_utc_datetime(subtask.download_deadline)
     download_deadline.short_description = 'Download deadline'  # type: ignore
 
 
-class PendingResponseAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
+class PendingResponseAdmin(ModelAdminReadFromReplicaMixin, ModelAdminReadOnlyMixin, admin.ModelAdmin):
     list_display = [
         'response_type',
         'queue',
@@ -127,7 +123,7 @@ class PendingResponseAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
     get_client_public_key.short_description = 'Client public key'  # type: ignore
 
 
-class StoredMessageAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
+class StoredMessageAdmin(ModelAdminReadFromReplicaMixin, ModelAdminReadOnlyMixin, admin.ModelAdmin):
 
     list_display = [
         'type',
@@ -145,7 +141,7 @@ class StoredMessageAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
     ]
 
 
-class DepositAccountAdmin(ModelAdminReadOnlyMixin, admin.ModelAdmin):
+class DepositAccountAdmin(ModelAdminReadFromReplicaMixin, ModelAdminReadOnlyMixin, admin.ModelAdmin):
 
     list_display = [
         'client_public_key',
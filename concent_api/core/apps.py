@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self) -> None:
+        from constance.signals import config_updated
+        from core.runtime_switches import invalidate_runtime_switch
+        config_updated.connect(invalidate_runtime_switch, dispatch_uid='core.invalidate_runtime_switch')
@@ -37,6 +37,39 @@ TASK_OWNER_KEY_LENGTH = 64
 # Regular expresion of allowed characters and length of checksum hash
 VALID_SHA1_HASH_REGEX = re.compile(r"^[a-fA-F\d]{40}$")
 
+# Defines maximum number of messages returned by a single call to the batched receive endpoint.
+MAXIMUM_NUMBER_OF_MESSAGES_IN_RECEIVE_BATCH = 20
+
+# Defines size (in bytes) of the length prefix preceding each message in a batch of messages.
+BATCH_MESSAGE_LENGTH_PREFIX_SIZE = 4
+
+# Defines name of PostgreSQL notification channel used to wake up clients waiting for new pending responses.
+PENDING_RESPONSE_NOTIFICATION_CHANNEL = 'concent_pending_response'
+
+# Defines how many timed out subtasks are processed by `concent_update_timed_out_subtasks` command in a single transaction.
+TIMED_OUT_SUBTASKS_BATCH_SIZE = 100
+
+# Defines how many seconds `concent_update_timed_out_subtasks` command waits before checking for timed out subtasks again
+# if there were no more of them.
+TIMED_OUT_SUBTASKS_CHECK_INTERVAL = 1
+
+# Defines for how many seconds each process keeps values of Concent's runtime switches (constance config) in memory.
+# A change made in the admin panel is seen immediately by the process that made it and by all other processes
+# within this time.
+RUNTIME_SWITCHES_CACHE_TIMEOUT = 1
+
+# Defines how many deserialized Golem messages from StoredMessage table are kept in memory by each process.
+# 0 disables the cache.
+DESERIALIZED_MESSAGES_CACHE_SIZE = 1000
+
+# Defines how many successful verifications of Golem message signatures are remembered by each process.
+# 0 disables the cache.
+SIGNATURE_VERIFICATION_CACHE_SIZE = 10000
+
+# Defines how many ids of Client rows are kept in memory by each process.
+# 0 disables the cache.
+CLIENTS_CACHE_SIZE = 10000
+
 CELERY_LOCKED_SUBTASK_DELAY = 60
 
 MAXIMUM_VERIFICATION_RESULT_TASK_RETRIES = 3
@@ -3,6 +3,7 @@ from logging import getLogger
 from typing import Any
 from typing import Callable
 from typing import Union
+import time
 
 from django.conf import settings
 from django.db import transaction
@@ -24,10 +25,17 @@ from common.constants import ErrorCode
 from common.exceptions import ConcentBaseException
 from common.exceptions import ConcentInSoftShutdownMode
 from common.exceptions import ConcentValidationError
+from common.helpers import has_message_field
 from common.helpers import join_messages
-from common.logging import get_json_from_message_without_redundant_fields_for_logging
+from common.helpers import pack_serialized_messages_into_batch
 from common.logging import log
 from common.logging import log_400_error
+from common.logging import log_message_dump
+from common.metrics import record_request
+from common.profiling import profile_phase
+from common.profiling import set_profiled_message_type
+from common.query_budgets import check_query_budget
+from common.query_budgets import count_queries
 from common.shortcuts import load_without_public_key
 from core.exceptions import CreateModelIntegrityError
 from core.exceptions import UnsupportedProtocolVersion
@@ -81,7 +89,9 @@ def require_golem_auth_message(view: Callable) -> Callable:
             return JsonResponse({'error': 'Content-Type is missing.'}, status = 400)
         elif request.content_type == 'application/octet-stream':
             try:
-                auth_message = load_without_public_key(request.body)
+                with profile_phase('load_message'):
+                    auth_message = load_without_public_key(request.body)
+                set_profiled_message_type(auth_message.__class__.__name__)
                 if isinstance(auth_message, message.concents.ClientAuthorization):
                     if is_golem_message_signed_with_key(
                         auth_message.client_public_key,
@@ -146,16 +156,18 @@ def require_golem_message(view: Callable) -> Callable:
             return JsonResponse({'error': 'Content-Type is missing.'}, status = 400)
         elif request.content_type == 'application/octet-stream':
             try:
-                golem_message = load_without_public_key(request.body)
-                assert golem_message is not None
-                client_public_key = get_validated_client_public_key_from_client_message(golem_message)
+                with profile_phase('load_message'):
+                    golem_message = load_without_public_key(request.body)
+                    assert golem_message is not None
+                    client_public_key = get_validated_client_public_key_from_client_message(golem_message)
+                set_profiled_message_type(golem_message.__class__.__name__)
                 log(
                     logger,
                     f'A message has been received in `{request.resolver_match.view_name if request.resolver_match is not None else "-not available"}`.'
                     f'Message type: {golem_message.__class__.__name__}.',
                     f'Content type: {request.META["CONTENT_TYPE"] if "CONTENT_TYPE" in request.META.keys() else "-not available"}'
-                    f'TASK_ID: {golem_message.task_id if "task_id" in dir(golem_message) else "-not available"}',
-                    subtask_id=golem_message.subtask_id if 'subtask_id' in dir(golem_message) else None,
+                    f'TASK_ID: {golem_message.task_id if has_message_field(golem_message, "task_id") else "-not available"}',
+                    subtask_id=golem_message.subtask_id if has_message_field(golem_message, 'subtask_id') else None,
                     client_public_key=client_public_key
                 )
             except ConcentValidationError as exception:
@@ -262,12 +274,37 @@ def handle_errors_and_responses(database_name: str) -> Callable:
                     client_public_key,
                     request.resolver_match._func_path if request.resolver_match is not None else None,
                 )
-                serialized_message = dump(
-                    response_from_view,
-                    settings.CONCENT_PRIVATE_KEY,
-                    client_public_key,
-                )
+                with profile_phase('dump_response'):
+                    serialized_message = dump(
+                        response_from_view,
+                        settings.CONCENT_PRIVATE_KEY,
+                        client_public_key,
+                    )
                 return HttpResponse(serialized_message, content_type = 'application/octet-stream')
+            elif isinstance(response_from_view, list):
+                assert len(response_from_view) > 0
+                serialized_messages = []
+                for message_in_batch in response_from_view:
+                    assert isinstance(message_in_batch, message.Message)
+                    assert message_in_batch.sig is None
+                    logging.log_message_returned(
+                        logger,
+                        message_in_batch,
+                        client_public_key,
+                        request.resolver_match._func_path if request.resolver_match is not None else None,
+                    )
+                    with profile_phase('dump_response'):
+                        serialized_messages.append(
+                            dump(
+                                message_in_batch,
+                                settings.CONCENT_PRIVATE_KEY,
+                                client_public_key,
+                            )
+                        )
+                return HttpResponse(
+                    pack_serialized_messages_into_batch(serialized_messages),
+                    content_type='application/octet-stream',
+                )
             elif isinstance(response_from_view, dict):
 
                 json_response = JsonResponse(response_from_view, safe = False)
@@ -310,16 +347,67 @@ def handle_errors_and_responses(database_name: str) -> Callable:
             assert False, "Invalid response type"
             raise Exception("Invalid response type")
 
-        return wrapper
+        return collect_request_metrics(enforce_query_budget_per_message_type(wrapper))
     return decorator
 
 
+def collect_request_metrics(view: Callable) -> Callable:
+    """
+    Counts requests handled by decorated view and measures their duration, per view, message type and status code.
+    Metrics are kept in process memory so that no database queries are added to the request.
+    """
+    @wraps(view)
+    def wrapper(
+        request: HttpRequest,
+        client_message: message.Message,
+        client_public_key: bytes,
+        *args: list,
+        **kwargs: dict,
+    ) -> HttpResponse:
+        start_time = time.perf_counter()
+        status_code = 500
+        try:
+            response = view(request, client_message, client_public_key, *args, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            record_request(
+                view.__name__,
+                client_message.__class__.__name__,
+                status_code,
+                time.perf_counter() - start_time,
+            )
+    return wrapper
+
+
+def enforce_query_budget_per_message_type(view: Callable) -> Callable:
+    """
+    Checks SQL queries and row-locking statements executed by decorated view against the budget in QUERY_BUDGETS
+    for the view and type of received message if QUERY_BUDGET_VIOLATION_ACTION setting is not None.
+    """
+    @wraps(view)
+    def wrapper(
+        request: HttpRequest,
+        client_message: message.Message,
+        client_public_key: bytes,
+        *args: list,
+        **kwargs: dict,
+    ) -> HttpResponse:
+        if settings.QUERY_BUDGET_VIOLATION_ACTION is None:
+            return view(request, client_message, client_public_key, *args, **kwargs)
+        with count_queries() as query_counter:
+            response = view(request, client_message, client_public_key, *args, **kwargs)
+        check_query_budget(view.__name__, client_message.__class__.__name__, query_counter)
+        return response
+    return wrapper
+
+
 def log_communication(view: Callable) -> Callable:
 
     @wraps(view)
     def wrapper(request: HttpRequest, golem_message: message.Message, client_public_key: bytes) -> HttpResponse:
-        json_message_to_log = get_json_from_message_without_redundant_fields_for_logging(golem_message)
-        log(logger, str(json_message_to_log))
+        with profile_phase('log_communication'):
+            log_message_dump(logger, golem_message)
         response_from_view = view(request,  golem_message, client_public_key)
         return response_from_view
     return wrapper
@@ -0,0 +1,49 @@
+from logging import getLogger
+from typing import Any
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandParser
+
+from core.constants import TIMED_OUT_SUBTASKS_BATCH_SIZE
+from core.constants import TIMED_OUT_SUBTASKS_CHECK_INTERVAL
+from core.subtask_helpers import update_timed_out_subtasks
+
+logger = getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves subtasks with exceeded deadlines to passive states and queues related messages for the clients. '
+        'Runs until interrupted unless --once is given.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=TIMED_OUT_SUBTASKS_BATCH_SIZE,
+            help='Maximum number of subtasks processed in a single transaction.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=TIMED_OUT_SUBTASKS_CHECK_INTERVAL,
+            help='Number of seconds to wait before checking again when there are no more timed out subtasks.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process all currently timed out subtasks and exit.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        while True:
+            number_of_processed_subtasks = update_timed_out_subtasks(options['batch_size'])
+            if number_of_processed_subtasks > 0:
+                logger.info(f'Updated {number_of_processed_subtasks} timed out subtasks')
+
+            if number_of_processed_subtasks < options['batch_size']:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
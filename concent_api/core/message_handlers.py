@@ -1,6 +1,9 @@
 from base64 import b64encode
 from logging import getLogger
+import time
 from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import Union
@@ -12,8 +15,6 @@ from django.db import IntegrityError
 from django.db import transaction
 from django.http import HttpResponse
 
-from constance import config
-
 from golem_messages import message
 from golem_messages.message.concents import AckForceGetTaskResult
 from golem_messages.message.concents import FileTransferToken
@@ -35,7 +36,6 @@ from common.helpers import get_current_utc_timestamp
 from common.helpers import get_storage_result_file_path
 from common.helpers import parse_datetime_to_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
-from common.helpers import sign_message
 from common.logging import convert_public_key_to_hex
 from common.logging import log
 from common.validations import validate_secure_hash_algorithm
@@ -50,13 +50,20 @@ from core.models import PaymentInfo
 from core.models import PendingResponse
 from core.models import StoredMessage
 from core.models import Subtask
+from core.notifications import PendingResponseListener
+from core.notifications import SharedPendingResponseSubscription
 from core.payments import bankster
 from core.queue_operations import send_blender_verification_request
+from core.runtime_switches import is_soft_shutdown_mode_enabled
+from core.response_builders import PendingResponseBuilder
+from core.response_builders import PRECOMPUTABLE_PENDING_RESPONSE_BUILDERS
+from core.response_builders import is_pending_response_payload_fresh
 from core.subtask_helpers import are_keys_and_addresses_unique_in_message_subtask_results_accepted
 from core.subtask_helpers import are_subtask_results_accepted_messages_signed_by_the_same_requestor
 from core.subtask_helpers import delete_deposit_claim
 from core.subtask_helpers import get_one_or_none
 from core.subtask_helpers import is_state_transition_possible
+from core.subtask_helpers import lock_subtask
 from core.transfer_operations import create_file_transfer_token_for_golem_client
 from core.transfer_operations import create_file_transfer_token_for_verification_use_case
 from core.transfer_operations import store_pending_message
@@ -99,25 +106,28 @@ def handle_send_force_report_computed_task(
         task_to_compute,
     )
 
-    if Subtask.objects.filter(  # pylint: disable=no-member
-        subtask_id=task_to_compute.compute_task_def['subtask_id'],
-    ).exists():
-        raise Http400(
-            "{} is already being processed for this task.".format(type(client_message).__name__),
-            error_code=ErrorCode.SUBTASK_DUPLICATE_REQUEST,
-        )
-
-    if task_to_compute.compute_task_def['deadline'] < get_current_utc_timestamp():
-        logging.log_timeout(
-            logger,
-            client_message,
-            provider_public_key,
-            task_to_compute.compute_task_def['deadline'],
-        )
-        return message.concents.ForceReportComputedTaskResponse(
-            reason=message.concents.ForceReportComputedTaskResponse.REASON.SubtaskTimeout
-        )
     with transaction.atomic(using='control'):
+        lock_subtask(task_to_compute.compute_task_def['subtask_id'])
+
+        if Subtask.objects.filter(  # pylint: disable=no-member
+            subtask_id=task_to_compute.compute_task_def['subtask_id'],
+        ).exists():
+            raise Http400(
+                "{} is already being processed for this task.".format(type(client_message).__name__),
+                error_code=ErrorCode.SUBTASK_DUPLICATE_REQUEST,
+            )
+
+        if task_to_compute.compute_task_def['deadline'] < get_current_utc_timestamp():
+            logging.log_timeout(
+                logger,
+                client_message,
+                provider_public_key,
+                task_to_compute.compute_task_def['deadline'],
+            )
+            return message.concents.ForceReportComputedTaskResponse(
+                reason=message.concents.ForceReportComputedTaskResponse.REASON.SubtaskTimeout
+            )
+
         subtask = store_subtask(
             task_id=task_to_compute.compute_task_def['task_id'],
             subtask_id=task_to_compute.compute_task_def['subtask_id'],
@@ -197,11 +207,11 @@ def handle_send_ack_report_computed_task(client_message: message.tasks.AckReport
                 )
             validate_all_messages_identical([
                 task_to_compute,
-                deserialize_message(subtask.task_to_compute.data.tobytes()),
+                subtask.task_to_compute.get_deserialized_message(),
             ])
             report_computed_task = substitute_new_report_computed_task_if_needed(
                 report_computed_task_from_acknowledgement=report_computed_task,
-                stored_report_computed_task=deserialize_message(subtask.report_computed_task.data.tobytes()),
+                stored_report_computed_task=subtask.report_computed_task.get_deserialized_message(),
             )
 
             subtask = update_and_return_updated_subtask(
@@ -319,7 +329,7 @@ def handle_send_reject_report_computed_task(client_message: message.tasks.Reject
         validate_all_messages_identical(
             [
                 task_to_compute,
-                deserialize_message(subtask.task_to_compute.data.tobytes()),
+                subtask.task_to_compute.get_deserialized_message(),
             ]
         )
 
@@ -350,7 +360,7 @@ def handle_send_reject_report_computed_task(client_message: message.tasks.Reject
             )
             return HttpResponse("", status=202)
 
-        deserialized_message = deserialize_message(subtask.task_to_compute.data.tobytes())
+        deserialized_message = subtask.task_to_compute.get_deserialized_message()
 
         if get_current_utc_timestamp() <= deserialized_message.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME:
             if subtask.ack_report_computed_task_id is not None or subtask.ack_report_computed_task_id is not None:
@@ -431,6 +441,7 @@ def handle_send_force_get_task_result(
             force_get_task_result=client_message,
         )
     with transaction.atomic(using='control'):
+        lock_subtask(task_to_compute.compute_task_def['subtask_id'])
         subtask = get_one_or_none(
             Subtask.objects.select_for_update(),
             subtask_id=task_to_compute.compute_task_def['subtask_id'],
@@ -462,7 +473,7 @@ def handle_send_force_get_task_result(
             if task_to_compute is not None and subtask.task_to_compute is not None:
                 validate_all_messages_identical([
                     task_to_compute,
-                    deserialize_message(subtask.task_to_compute.data.tobytes()),
+                    subtask.task_to_compute.get_deserialized_message(),
                 ])
             subtask = update_and_return_updated_subtask(
                 subtask=subtask,
@@ -581,6 +592,7 @@ def handle_send_force_subtask_results(
         )
 
     with transaction.atomic(using='control'):
+        lock_subtask(task_to_compute.compute_task_def['subtask_id'])
         subtask = get_one_or_none(
             Subtask.objects.select_for_update(),
             subtask_id=task_to_compute.compute_task_def['subtask_id'],
@@ -602,7 +614,7 @@ def handle_send_force_subtask_results(
             if task_to_compute is not None and subtask.task_to_compute is not None:
                 validate_all_messages_identical([
                     task_to_compute,
-                    deserialize_message(subtask.task_to_compute.data.tobytes()),
+                    subtask.task_to_compute.get_deserialized_message(),
                 ])
             subtask = update_and_return_updated_subtask(
                 subtask=subtask,
@@ -708,7 +720,7 @@ def handle_send_force_subtask_results_response(
 
         validate_all_messages_identical([
             task_to_compute,
-            deserialize_message(subtask.task_to_compute.data.tobytes()),
+            subtask.task_to_compute.get_deserialized_message(),
         ])
 
         delete_deposit_claim(
@@ -752,7 +764,7 @@ def handle_send_force_payment(
 ) -> Union[ServiceRefused, ForcePaymentRejected, ForcePaymentCommitted]:
 
     # Concent should not accept payment requests in soft shutdown mode.
-    if config.SOFT_SHUTDOWN_MODE is True:
+    if is_soft_shutdown_mode_enabled():
         raise ConcentInSoftShutdownMode
 
     if not (
@@ -900,8 +912,7 @@ def store_subtask(
     assert (state in Subtask.ACTIVE_STATES)  == (isinstance(next_deadline, (int, float)))
     assert (state in Subtask.PASSIVE_STATES) == (next_deadline is None)
     try:
-        provider = Client.objects.get_or_create_full_clean(provider_public_key)
-        requestor = Client.objects.get_or_create_full_clean(requestor_public_key)
+        (provider, requestor) = Client.objects.get_or_create_many_full_clean(provider_public_key, requestor_public_key)
         computation_deadline = task_to_compute.compute_task_def['deadline']
         result_package_size = report_computed_task.size
 
@@ -914,12 +925,9 @@ def store_subtask(
             state=state.name,
             next_deadline=parse_timestamp_to_utc_datetime(next_deadline) if next_deadline is not None else None,
             computation_deadline=parse_timestamp_to_utc_datetime(computation_deadline),
-            task_to_compute=store_message(task_to_compute, task_id, subtask_id),
-            want_to_compute_task=store_message(task_to_compute.want_to_compute_task, task_id, subtask_id),
-            report_computed_task=store_message(report_computed_task, task_id, subtask_id),
         )
 
-        set_subtask_messages(
+        optional_messages_to_store = select_subtask_messages_to_store(
             subtask,
             ack_report_computed_task=ack_report_computed_task,
             reject_report_computed_task=reject_report_computed_task,
@@ -927,6 +935,16 @@ def store_subtask(
             subtask_results_rejected=subtask_results_rejected,
             force_get_task_result=force_get_task_result,
         )
+        store_and_set_subtask_messages(
+            subtask,
+            {
+                'task_to_compute':      task_to_compute,
+                'want_to_compute_task': task_to_compute.want_to_compute_task,
+                'report_computed_task': report_computed_task,
+                **optional_messages_to_store,
+            },
+        )
+        log_stored_messages_added_to_subtask(subtask, optional_messages_to_store)
 
         subtask.full_clean()
         subtask.save()
@@ -955,210 +973,226 @@ def store_subtask(
 
 
 def handle_messages_from_database(client_public_key: bytes) -> Union[message.Message, None]:
+    """
+    Returns the oldest undelivered message of given client and marks it as delivered.
+    The PendingResponse is claimed with a single statement which skips rows locked by concurrent requests.
+    If building the message fails, the transaction is rolled back and the PendingResponse remains undelivered.
+    """
     assert client_public_key not in ['', None]
-    encoded_client_public_key = b64encode(client_public_key)
 
     with transaction.atomic(using='control'):
-        pending_response = PendingResponse.objects.select_for_update().filter(
-            client__public_key=encoded_client_public_key,
-            delivered=False,
-        ).order_by('created_at').first()
+        pending_response = PendingResponse.objects.dequeue(client_public_key)
 
         if pending_response is None:
             return None
 
-        assert pending_response.response_type_enum in set(PendingResponse.ResponseType)
-
-        if pending_response.response_type_enum != PendingResponse.ResponseType.ForcePaymentCommitted and not \
-                is_protocol_version_compatible(
-                    pending_response.subtask.task_to_compute.protocol_version
-                ):
-            log(logger,
-                f'Wrong version of golem messages in stored messages.'
-                f'Version stored in database is { pending_response.subtask.task_to_compute.protocol_version},'
-                f'Concent version is {settings.GOLEM_MESSAGES_VERSION}.',
-                subtask_id=pending_response.subtask.subtask_id,
-                client_public_key=client_public_key,
-                )
-            return message.concents.ServiceRefused(reason=message.concents.ServiceRefused.REASON.UnsupportedProtocolVersion)
-
-        if pending_response.response_type == PendingResponse.ResponseType.ForceReportComputedTask.name:  # pylint: disable=no-member
-            report_computed_task = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-            response_to_client = message.concents.ForceReportComputedTask(
-                report_computed_task=report_computed_task
+        (response_to_client, is_deliverable) = build_response_from_pending_response(pending_response, client_public_key)
+        if is_deliverable:
+            logging.log_receive_message_from_database(
+                logger,
+                response_to_client,
+                client_public_key,
+                pending_response.response_type,
+                pending_response.queue,
             )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
-
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceReportComputedTaskResponse.name:  # pylint: disable=no-member
-            if pending_response.subtask.ack_report_computed_task is not None:
-                ack_report_computed_task = deserialize_message(
-                    pending_response.subtask.ack_report_computed_task.data.tobytes())
-                response_to_client = message.concents.ForceReportComputedTaskResponse(
-                    ack_report_computed_task=ack_report_computed_task,
-                    reason=message.concents.ForceReportComputedTaskResponse.REASON.AckFromRequestor,
-                )
-                mark_message_as_delivered_and_log(pending_response, response_to_client)
+        else:
+            PendingResponse.objects.undeliver(pending_response)
+        return response_to_client
+
+
+def handle_messages_from_database_with_long_polling(
+    client_public_key: bytes,
+    maximum_wait_time: int,
+) -> Union[message.Message, None]:
+    """
+    Works like `handle_messages_from_database()` but if there are no pending messages for the client,
+    waits up to `maximum_wait_time` seconds for a notification that a new one has been queued.
+    """
+    assert isinstance(maximum_wait_time, int) and maximum_wait_time >= 0
+
+    if maximum_wait_time == 0:
+        return handle_messages_from_database(client_public_key)
+
+    deadline = time.monotonic() + maximum_wait_time
+    listener_class = SharedPendingResponseSubscription if settings.LONG_POLLING_SHARED_LISTENER else PendingResponseListener  # type: Any
+    with listener_class(client_public_key) as listener:
+        while True:
+            # The queue is checked only after LISTEN so that a message queued in the meantime is not missed.
+            response_to_client = handle_messages_from_database(client_public_key)
+            if response_to_client is not None:
                 return response_to_client
 
-            elif pending_response.subtask.reject_report_computed_task is not None:
-                reject_report_computed_task = deserialize_message(
-                    pending_response.subtask.reject_report_computed_task.data.tobytes())
-                response_to_client = message.concents.ForceReportComputedTaskResponse(
-                    reject_report_computed_task=reject_report_computed_task,
-                    reason=message.concents.ForceReportComputedTaskResponse.REASON.RejectFromRequestor,
-                )
-                if reject_report_computed_task.reason == message.tasks.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded:
-                    ack_report_computed_task = message.tasks.AckReportComputedTask(
-                        report_computed_task=deserialize_message(
-                            pending_response.subtask.report_computed_task.data.tobytes()),
-                    )
-                    sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-                    response_to_client = message.concents.ForceReportComputedTaskResponse(
-                        ack_report_computed_task=ack_report_computed_task,
-                        reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
-                    )
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0 or not listener.wait(remaining_time):
+                return None
+
+
+def handle_batch_of_messages_from_database(
+    client_public_key: bytes,
+    maximum_number_of_messages: int,
+) -> Optional[List[message.Message]]:
+    """
+    Returns up to `maximum_number_of_messages` oldest undelivered messages of given client
+    and marks all of them as delivered in a single transaction.
+    Pending responses which cannot be delivered right now (e.g. because of incompatible protocol version)
+    end the batch and are returned only if they are the first ones in the queue, exactly like in `receive`.
+    """
+    assert client_public_key not in ['', None]
+    assert isinstance(maximum_number_of_messages, int) and maximum_number_of_messages > 0
+    encoded_client_public_key = b64encode(client_public_key)
+
+    with transaction.atomic(using='control'):
+        pending_responses = PendingResponse.objects.select_for_update().select_related('client').filter(
+            client__public_key=encoded_client_public_key,
+            delivered=False,
+        ).order_by('created_at')[:maximum_number_of_messages]
+
+        responses_to_client = []  # type: List[message.Message]
+        for pending_response in pending_responses:
+            (response_to_client, is_deliverable) = build_response_from_pending_response(pending_response, client_public_key)
+            if is_deliverable:
                 mark_message_as_delivered_and_log(pending_response, response_to_client)
-                return response_to_client
+                responses_to_client.append(response_to_client)
             else:
-                ack_report_computed_task = message.tasks.AckReportComputedTask(
-                    report_computed_task=deserialize_message(
-                        pending_response.subtask.report_computed_task.data.tobytes()),
-                )
-                sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-                response_to_client = message.concents.ForceReportComputedTaskResponse(
-                    ack_report_computed_task=ack_report_computed_task,
-                    reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
-                )
-                mark_message_as_delivered_and_log(pending_response, response_to_client)
-                return response_to_client
+                if response_to_client is not None and len(responses_to_client) == 0:
+                    responses_to_client.append(response_to_client)
+                break
 
-        elif pending_response.response_type == PendingResponse.ResponseType.VerdictReportComputedTask.name:  # pylint: disable=no-member
-            ack_report_computed_task = message.tasks.AckReportComputedTask(
-                report_computed_task=deserialize_message(pending_response.subtask.report_computed_task.data.tobytes()),
-            )
-            sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
-            report_computed_task     = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-            response_to_client = message.concents.VerdictReportComputedTask(
-                ack_report_computed_task    = ack_report_computed_task,
-                force_report_computed_task  = message.concents.ForceReportComputedTask(
-                    report_computed_task = report_computed_task,
-                ),
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+        if len(responses_to_client) == 0:
+            return None
+        return responses_to_client
 
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultFailed.name:  # pylint: disable=no-member
-            task_to_compute = deserialize_message(pending_response.subtask.task_to_compute.data.tobytes())
-            response_to_client = message.concents.ForceGetTaskResultFailed(
-                task_to_compute = task_to_compute,
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
 
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultUpload.name:  # pylint: disable=no-member
-            force_get_task_result = deserialize_message(pending_response.subtask.force_get_task_result.data.tobytes())
-            file_transfer_token = create_file_transfer_token_for_golem_client(
-                force_get_task_result.report_computed_task,
-                client_public_key,
-                FileTransferToken.Operation.upload,
-            )
+def build_response_from_pending_response(
+    pending_response: PendingResponse,
+    client_public_key: bytes,
+) -> Tuple[Optional[message.Message], bool]:
+    """
+    Builds a message for the client out of given PendingResponse. Returns the message and a flag telling whether
+    it's the message the PendingResponse stands for, i.e. whether the PendingResponse should be marked as delivered.
+    Must be called inside a transaction in which the PendingResponse has been locked or claimed.
+    If the message has been built when the PendingResponse was created, it's only deserialized.
+
+    The subtask is fetched together with all the stored messages needed by the builder registered for
+    the response type in a single query. It can't be done in the query that locks the PendingResponse
+    because PostgreSQL does not allow FOR UPDATE on the nullable side of an outer join.
+    """
+    assert pending_response.response_type_enum in set(PendingResponse.ResponseType)
 
-            response_to_client = message.concents.ForceGetTaskResultUpload(
-                file_transfer_token=file_transfer_token,
-                force_get_task_result=force_get_task_result,
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+    if pending_response.response_type_enum not in PENDING_RESPONSE_BUILDERS:
+        return (None, False)
 
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceGetTaskResultDownload.name:  # pylint: disable=no-member
-            force_get_task_result = deserialize_message(pending_response.subtask.force_get_task_result.data.tobytes())
-            file_transfer_token  = create_file_transfer_token_for_golem_client(
-                force_get_task_result.report_computed_task,
-                client_public_key,
-                FileTransferToken.Operation.download,
-            )
+    if is_pending_response_payload_fresh(pending_response):
+        response_to_client = deserialize_message(bytes(pending_response.payload))
+        # The payload is serialized without a signature. The message is signed when it's dumped for the client.
+        response_to_client.sig = None
+        return (response_to_client, True)
 
-            response_to_client = message.concents.ForceGetTaskResultDownload(
-                file_transfer_token=file_transfer_token,
-                force_get_task_result=force_get_task_result,
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+    (build_response, related_messages) = PENDING_RESPONSE_BUILDERS[pending_response.response_type_enum]
 
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceSubtaskResults.name:  # pylint: disable=no-member
-            ack_report_computed_task = deserialize_message(pending_response.subtask.ack_report_computed_task.data.tobytes())
-            response_to_client = message.concents.ForceSubtaskResults(
-                ack_report_computed_task = ack_report_computed_task
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+    if pending_response.subtask_id is not None:
+        pending_response.subtask = Subtask.objects.select_related(*related_messages).get(pk=pending_response.subtask_id)
 
-        elif pending_response.response_type == PendingResponse.ResponseType.SubtaskResultsSettled.name:  # pylint: disable=no-member
-            task_to_compute = deserialize_message(pending_response.subtask.task_to_compute.data.tobytes())
-            response_to_client = message.concents.SubtaskResultsSettled(
-                origin=message.concents.SubtaskResultsSettled.Origin.ResultsRejected,
-                task_to_compute=task_to_compute,
+    if pending_response.response_type_enum != PendingResponse.ResponseType.ForcePaymentCommitted and not \
+            is_protocol_version_compatible(
+                pending_response.subtask.task_to_compute.protocol_version
+            ):
+        log(logger,
+            f'Wrong version of golem messages in stored messages.'
+            f'Version stored in database is { pending_response.subtask.task_to_compute.protocol_version},'
+            f'Concent version is {settings.GOLEM_MESSAGES_VERSION}.',
+            subtask_id=pending_response.subtask.subtask_id,
+            client_public_key=client_public_key,
             )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+        return (
+            message.concents.ServiceRefused(reason=message.concents.ServiceRefused.REASON.UnsupportedProtocolVersion),
+            False,
+        )
 
-        elif pending_response.response_type == PendingResponse.ResponseType.ForceSubtaskResultsResponse.name:  # pylint: disable=no-member
-            subtask_results_accepted = pending_response.subtask.subtask_results_accepted
-            subtask_results_rejected = pending_response.subtask.subtask_results_rejected
+    response_to_client = build_response(pending_response, client_public_key)
+    return (response_to_client, response_to_client is not None)
 
-            assert (subtask_results_rejected is None and subtask_results_accepted is not None) or \
-                   (subtask_results_accepted is None and subtask_results_rejected is not None)
 
-            if subtask_results_accepted is not None:
-                response_to_client = message.concents.ForceSubtaskResultsResponse(
-                    subtask_results_accepted=deserialize_message(subtask_results_accepted.data.tobytes()),
-                )
-            else:
-                response_to_client = message.concents.ForceSubtaskResultsResponse(
-                    subtask_results_rejected=deserialize_message(subtask_results_rejected.data.tobytes()),  # type: ignore
-                )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
-
-        elif pending_response.response_type == PendingResponse.ResponseType.SubtaskResultsRejected.name:  # pylint: disable=no-member
-            report_computed_task = deserialize_message(pending_response.subtask.report_computed_task.data.tobytes())
-            response_to_client = message.tasks.SubtaskResultsRejected(
-                reason=message.tasks.SubtaskResultsRejected.REASON.ConcentResourcesFailure,
-                report_computed_task=report_computed_task
-            )
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
-
-        elif pending_response.response_type == PendingResponse.ResponseType.ForcePaymentCommitted.name:  # pylint: disable=no-member
-            payment_message = pending_response.payments.filter(
-                pending_response__pk = pending_response.pk
-            ).order_by('id').last()
-
-            response_to_client = message.concents.ForcePaymentCommitted(
-                payment_ts=parse_datetime_to_timestamp(payment_message.payment_ts),
-                task_owner_key=payment_message.task_owner_key.tobytes(),
-                provider_eth_account=payment_message.provider_eth_account,
-                amount_paid=payment_message.amount_paid,
-                amount_pending=payment_message.amount_pending,
-            )
-            if payment_message.recipient_type == PaymentInfo.RecipientType.Requestor.name:  # pylint: disable=no-member
-                response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Requestor
-            elif payment_message.recipient_type == PaymentInfo.RecipientType.Provider.name:  # pylint: disable=no-member
-                response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Provider
-            else:
-                return None
-            mark_message_as_delivered_and_log(pending_response, response_to_client)
-            return response_to_client
+def build_force_get_task_result_upload(
+    pending_response: PendingResponse,
+    client_public_key: bytes,
+) -> message.concents.ForceGetTaskResultUpload:
+    force_get_task_result = pending_response.subtask.force_get_task_result.get_deserialized_message()
+    file_transfer_token = create_file_transfer_token_for_golem_client(
+        force_get_task_result.report_computed_task,
+        client_public_key,
+        FileTransferToken.Operation.upload,
+    )
+    return message.concents.ForceGetTaskResultUpload(
+        file_transfer_token=file_transfer_token,
+        force_get_task_result=force_get_task_result,
+    )
 
-        else:
-            return None
+
+def build_force_get_task_result_download(
+    pending_response: PendingResponse,
+    client_public_key: bytes,
+) -> message.concents.ForceGetTaskResultDownload:
+    force_get_task_result = pending_response.subtask.force_get_task_result.get_deserialized_message()
+    file_transfer_token = create_file_transfer_token_for_golem_client(
+        force_get_task_result.report_computed_task,
+        client_public_key,
+        FileTransferToken.Operation.download,
+    )
+    return message.concents.ForceGetTaskResultDownload(
+        file_transfer_token=file_transfer_token,
+        force_get_task_result=force_get_task_result,
+    )
+
+
+def build_force_payment_committed(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> Optional[message.concents.ForcePaymentCommitted]:
+    payment_message = pending_response.payments.filter(
+        pending_response__pk = pending_response.pk
+    ).order_by('id').last()
+
+    response_to_client = message.concents.ForcePaymentCommitted(
+        payment_ts=parse_datetime_to_timestamp(payment_message.payment_ts),
+        task_owner_key=payment_message.task_owner_key.tobytes(),
+        provider_eth_account=payment_message.provider_eth_account,
+        amount_paid=payment_message.amount_paid,
+        amount_pending=payment_message.amount_pending,
+    )
+    if payment_message.recipient_type == PaymentInfo.RecipientType.Requestor.name:  # pylint: disable=no-member
+        response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Requestor
+    elif payment_message.recipient_type == PaymentInfo.RecipientType.Provider.name:  # pylint: disable=no-member
+        response_to_client.recipient_type = message.concents.ForcePaymentCommitted.Actor.Provider
+    else:
+        return None
+    return response_to_client
+
+
+# Defines a function building the message for the client for each type of PendingResponse and the related
+# StoredMessages of the subtask it uses. TaskToCompute is always needed to check the protocol version.
+PENDING_RESPONSE_BUILDERS = {
+    **PRECOMPUTABLE_PENDING_RESPONSE_BUILDERS,
+    PendingResponse.ResponseType.ForceGetTaskResultUpload: (
+        build_force_get_task_result_upload,
+        ('task_to_compute', 'force_get_task_result'),
+    ),
+    PendingResponse.ResponseType.ForceGetTaskResultDownload: (
+        build_force_get_task_result_download,
+        ('task_to_compute', 'force_get_task_result'),
+    ),
+    PendingResponse.ResponseType.ForcePaymentCommitted: (
+        build_force_payment_committed,
+        (),
+    ),
+}  # type: Dict[PendingResponse.ResponseType, Tuple[PendingResponseBuilder, Tuple[str, ...]]]
 
 
 def mark_message_as_delivered_and_log(undelivered_message: PendingResponse, log_message: message.Message) -> None:
     undelivered_message.delivered = True
-    undelivered_message.full_clean()
-    undelivered_message.save()
+    undelivered_message.payload = None
+    # Only these fields change so full_clean() is not necessary. It would query for each of the related objects.
+    undelivered_message.save(update_fields=['delivered', 'payload', 'modified_at'])
 
     logging.log_receive_message_from_database(
         logger,
@@ -1223,7 +1257,7 @@ def update_and_return_updated_subtask(
     )
 
     # Concent should send e-mail notification when the last active subtask switches to a passive state.
-    if config.SOFT_SHUTDOWN_MODE is True and not Subtask.objects.filter(state__in=Subtask.ACTIVE_STATES).exists():  # pylint: disable=no-member
+    if is_soft_shutdown_mode_enabled() and not Subtask.objects.filter(state__in=Subtask.ACTIVE_STATES).exists():  # pylint: disable=no-member
         mail_admins(
             subject = 'Concent soft shutdown complete',
             message = (
@@ -1250,6 +1284,34 @@ def set_subtask_messages(
     Stores and adds relation of passed StoredMessages to given subtask.
     If the message name is not present in kwargs, it doesn't do anything with it.
     """
+    messages_to_store = select_subtask_messages_to_store(
+        subtask,
+        task_to_compute=task_to_compute,
+        report_computed_task=report_computed_task,
+        ack_report_computed_task=ack_report_computed_task,
+        reject_report_computed_task=reject_report_computed_task,
+        subtask_results_accepted=subtask_results_accepted,
+        subtask_results_rejected=subtask_results_rejected,
+        force_get_task_result=force_get_task_result,
+    )
+    store_and_set_subtask_messages(subtask, messages_to_store)
+    log_stored_messages_added_to_subtask(subtask, messages_to_store)
+
+
+def select_subtask_messages_to_store(
+    subtask: Subtask,
+    task_to_compute: Optional[message.TaskToCompute] = None,
+    report_computed_task: Optional[message.ReportComputedTask] = None,
+    ack_report_computed_task: Optional[message.tasks.AckReportComputedTask] = None,
+    reject_report_computed_task: Optional[message.tasks.RejectReportComputedTask] = None,
+    subtask_results_accepted: Optional[message.tasks.SubtaskResultsAccepted] = None,
+    subtask_results_rejected: Optional[message.tasks.SubtaskResultsRejected] = None,
+    force_get_task_result: Optional[message.concents.ForceGetTaskResult] = None
+) -> Dict[str, message.Message]:
+    """
+    Returns passed messages which should be stored and related to given subtask, by name of the related field.
+    A message is selected if the subtask does not have it yet or if it can be replaced in the current state.
+    """
     subtask_messages_to_set = {
         'task_to_compute': task_to_compute,
         'report_computed_task': report_computed_task,
@@ -1263,38 +1325,56 @@ def set_subtask_messages(
     assert set(subtask_messages_to_set).issubset({f.name for f in Subtask._meta.get_fields()})
     assert set(subtask_messages_to_set).issubset(set(Subtask.MESSAGE_FOR_FIELD))
 
+    messages_to_store = {}
     for message_name, message_type in Subtask.MESSAGE_FOR_FIELD.items():
         message_to_store = subtask_messages_to_set.get(message_name)
         if (
             message_to_store is not None and
             (
-                getattr(subtask, message_name) is None or
+                getattr(subtask, f'{message_name}_id') is None or
                 message_to_store.__class__ in Subtask.MESSAGE_REPLACEMENT_FOR_STATE[subtask.state_enum]
             )
         ):
             assert isinstance(message_to_store, message_type)
-            stored_message = store_message(
-                message_to_store,
-                subtask.task_id,
-                subtask.subtask_id,
-            )
-            setattr(subtask, message_name, stored_message)
-            logging.log_stored_message_added_to_subtask(
-                logger,
-                subtask.task_id,
-                subtask.subtask_id,
-                subtask.state,
-                message_type,
-                message_to_store.provider_id,
-                message_to_store.requestor_id,
-            )
+            messages_to_store[message_name] = message_to_store
+    return messages_to_store
 
 
-def store_message(
+def store_and_set_subtask_messages(subtask: Subtask, messages_to_store: Dict[str, message.Message]) -> None:
+    """
+    Stores given messages in StoredMessage table with a single query and adds relations to them to given subtask.
+    `messages_to_store` maps names of related fields of the subtask to messages.
+    """
+    assert set(messages_to_store).issubset(set(Subtask.MESSAGE_FOR_FIELD))
+
+    stored_messages = store_messages(
+        list(messages_to_store.values()),
+        subtask.task_id,
+        subtask.subtask_id,
+    )
+    for message_name, stored_message in zip(messages_to_store, stored_messages):
+        setattr(subtask, message_name, stored_message)
+
+
+def log_stored_messages_added_to_subtask(subtask: Subtask, stored_messages: Dict[str, message.Message]) -> None:
+    for message_name, stored_message in stored_messages.items():
+        logging.log_stored_message_added_to_subtask(
+            logger,
+            subtask.task_id,
+            subtask.subtask_id,
+            subtask.state,
+            Subtask.MESSAGE_FOR_FIELD[message_name],
+            stored_message.provider_id,
+            stored_message.requestor_id,
+        )
+
+
+def create_stored_message(
     golem_message: message.base.Message,
     task_id: str,
     subtask_id: str,
 ) -> StoredMessage:
+    """ Returns validated but not yet saved StoredMessage for given Golem message. """
     assert golem_message.header.type_ in library
 
     message_timestamp = parse_timestamp_to_utc_datetime(golem_message.timestamp)
@@ -1307,11 +1387,40 @@ def store_message(
         protocol_version=settings.GOLEM_MESSAGES_VERSION
     )
     stored_message.full_clean()
+
+    return stored_message
+
+
+def store_message(
+    golem_message: message.base.Message,
+    task_id: str,
+    subtask_id: str,
+) -> StoredMessage:
+    stored_message = create_stored_message(golem_message, task_id, subtask_id)
     stored_message.save()
 
     return stored_message
 
 
+def store_messages(
+    golem_messages: List[message.base.Message],
+    task_id: str,
+    subtask_id: str,
+) -> List[StoredMessage]:
+    """
+    Validates all given messages first and then stores them in StoredMessage table with a single query.
+    Returned StoredMessages are in the same order as given messages and have their ids set.
+    """
+    stored_messages = [
+        create_stored_message(golem_message, task_id, subtask_id)
+        for golem_message in golem_messages
+    ]
+    if len(stored_messages) > 0:
+        StoredMessage.objects.bulk_create(stored_messages)
+
+    return stored_messages
+
+
 def handle_send_subtask_results_verify(
     subtask_results_verify: message.concents.SubtaskResultsVerify
 ) -> Union[message.concents.AckSubtaskResultsVerify, message.concents.ServiceRefused]:
@@ -1393,6 +1502,7 @@ def handle_send_subtask_results_verify(
         )
 
     with transaction.atomic(using='control'):
+        lock_subtask(compute_task_def['subtask_id'])
         subtask = get_one_or_none(
             Subtask.objects.select_for_update(),
             subtask_id=compute_task_def['subtask_id'],
@@ -1414,7 +1524,7 @@ def handle_send_subtask_results_verify(
             if task_to_compute is not None and subtask.task_to_compute is not None:
                 validate_all_messages_identical([
                     task_to_compute,
-                    deserialize_message(subtask.task_to_compute.data.tobytes()),
+                    subtask.task_to_compute.get_deserialized_message(),
                 ])
 
             update_and_return_updated_subtask(
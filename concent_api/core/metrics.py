@@ -0,0 +1,125 @@
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from django.db.models import Count
+
+from common.constants import ConcentUseCase
+from common.database_replicas import read_from_replica
+from common.metrics import format_counters
+from common.metrics import format_gauges
+from common.metrics import format_histograms
+from common.metrics import metrics_file
+from core.models import DepositClaim
+from core.models import PendingResponse
+from core.models import Subtask
+# Registers histograms of request phases in metrics_file.
+import common.profiling  # noqa  # pylint: disable=unused-import
+
+
+def get_undelivered_pending_responses_per_queue() -> Dict[Tuple[str, ...], int]:
+    counts = {(queue.name,): 0 for queue in PendingResponse.Queue}
+    for row in read_from_replica(PendingResponse.objects.filter(
+        delivered=False,
+    )).values('queue').annotate(count=Count('id')).order_by():
+        counts[(row['queue'],)] = row['count']
+    return counts
+
+
+def get_active_subtasks_per_state() -> Dict[Tuple[str, ...], int]:
+    counts = {(state.name,): 0 for state in Subtask.ACTIVE_STATES}
+    for row in read_from_replica(Subtask.objects.filter(
+        state__in=[state.name for state in Subtask.ACTIVE_STATES],
+    )).values('state').annotate(count=Count('id')).order_by():
+        counts[(row['state'],)] = row['count']
+    return counts
+
+
+def get_deposit_claims_per_use_case() -> Dict[Tuple[str, ...], int]:
+    counts = {}  # type: Dict[Tuple[str, ...], int]
+    for row in read_from_replica(DepositClaim.objects.all()).values('concent_use_case').annotate(
+        count=Count('id'),
+        paid_count=Count('tx_hash'),
+    ).order_by():
+        use_case_name = ConcentUseCase(row['concent_use_case']).name
+        counts[(use_case_name, 'true')] = row['paid_count']
+        counts[(use_case_name, 'false')] = row['count'] - row['paid_count']
+    return counts
+
+
+def get_metrics_in_prometheus_text_format() -> str:
+    """
+    Returns metrics of requests and tasks and sizes of queues stored in the control database
+    in Prometheus text exposition format. Request and task metrics are summed over all processes
+    if METRICS_DIRECTORY is set, otherwise they come from this process only. Only the database gauges
+    are queried when this function is called, from a replica of the control database if one is usable.
+    """
+    shared_metrics = metrics_file.get_metrics_of_all_processes()
+    lines = []  # type: List[str]
+    lines += format_counters(
+        'concent_requests_total',
+        'Requests handled by Concent views.',
+        ('view', 'message_type', 'status_code'),
+        shared_metrics['request_counters'].get_snapshot(),
+    )
+    lines += format_histograms(
+        'concent_request_duration_seconds',
+        'Durations of requests handled by Concent views.',
+        ('view', 'message_type'),
+        shared_metrics['request_duration_histograms'],  # type: ignore
+    )
+    lines += format_histograms(
+        'concent_request_phase_duration_seconds',
+        'Durations of phases of requests measured by the request profiler.',
+        ('message_type', 'phase', 'metric'),
+        shared_metrics['phase_histograms'],  # type: ignore
+    )
+    lines += format_counters(
+        'concent_tasks_total',
+        'Celery tasks executed by Concent workers.',
+        ('task', 'outcome'),
+        shared_metrics['task_counters'].get_snapshot(),
+    )
+    lines += format_histograms(
+        'concent_task_duration_seconds',
+        'Durations of Celery tasks executed by Concent workers.',
+        ('task',),
+        shared_metrics['task_duration_histograms'],  # type: ignore
+    )
+    lines += format_counters(
+        'concent_subtask_locks_total',
+        'Advisory locks taken by message handlers to serialize requests concerning the same subtask.',
+        ('contended',),
+        shared_metrics['subtask_lock_counters'].get_snapshot(),
+    )
+    lines += format_histograms(
+        'concent_subtask_lock_wait_seconds',
+        'Times spent waiting for advisory locks of subtasks held by concurrent requests.',
+        (),
+        shared_metrics['subtask_lock_wait_histograms'],  # type: ignore
+    )
+    lines += format_counters(
+        'concent_dropped_log_records_total',
+        'Log records dropped by non-blocking logging handlers because their queues were full.',
+        ('handler',),
+        shared_metrics['dropped_log_record_counters'].get_snapshot(),
+    )
+    lines += format_gauges(
+        'concent_undelivered_pending_responses',
+        'Responses queued for clients and not delivered yet.',
+        ('queue',),
+        get_undelivered_pending_responses_per_queue(),
+    )
+    lines += format_gauges(
+        'concent_active_subtasks',
+        'Subtasks in active states.',
+        ('state',),
+        get_active_subtasks_per_state(),
+    )
+    lines += format_gauges(
+        'concent_deposit_claims',
+        'Claims against deposits, with and without a transaction.',
+        ('concent_use_case', 'paid'),
+        get_deposit_claims_per_use_case(),
+    )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# Names of Subtask states from Subtask.ACTIVE_STATES at the time of this migration.
+ACTIVE_STATE_NAMES = "'FORCING_REPORT', 'FORCING_RESULT_TRANSFER', 'FORCING_ACCEPTANCE', 'ADDITIONAL_VERIFICATION', 'VERIFICATION_FILE_TRANSFER'"
+
+
+def create_index(name: str, table: str, columns: str, condition: str = None) -> migrations.RunSQL:
+    # Indexes are created concurrently so that the tables are not locked for writes while they are being built.
+    return migrations.RunSQL(
+        sql=f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})' + (f' WHERE {condition}' if condition is not None else ''),
+        reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS {name}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ('core', '0017_auto_20181115_1219'),
+    ]
+
+    operations = [
+        # Undelivered pending responses of a client, oldest first (receive endpoints).
+        create_index(
+            'core_pendingresponse_undelivered_client_id_created_at_idx',
+            'core_pendingresponse',
+            'client_id, created_at',
+            'delivered = false',
+        ),
+        # Timed out subtasks in active states, oldest deadlines first (timed out subtasks sweeper).
+        create_index(
+            'core_subtask_active_next_deadline_idx',
+            'core_subtask',
+            'next_deadline',
+            f'state IN ({ACTIVE_STATE_NAMES})',
+        ),
+        # Subtasks of a client in active states (requests of the client).
+        create_index(
+            'core_subtask_active_requestor_id_next_deadline_idx',
+            'core_subtask',
+            'requestor_id, next_deadline',
+            f'state IN ({ACTIVE_STATE_NAMES})',
+        ),
+        create_index(
+            'core_subtask_active_provider_id_next_deadline_idx',
+            'core_subtask',
+            'provider_id, next_deadline',
+            f'state IN ({ACTIVE_STATE_NAMES})',
+        ),
+        # Sums of amounts of claims against a deposit (Bankster), computed with index-only scans.
+        create_index(
+            'core_depositclaim_payer_deposit_account_id_amount_idx',
+            'core_depositclaim',
+            'payer_deposit_account_id, amount',
+        ),
+    ]
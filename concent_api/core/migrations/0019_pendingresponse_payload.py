@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_indexes_for_hot_queries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingresponse',
+            name='payload',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+
+from common.helpers import deserialize_message
+from common.helpers import parse_datetime_to_timestamp
+from core.utils import calculate_maximum_download_time
+from core.utils import calculate_subtask_verification_time
+
+
+def fill_subtask_timing_columns(apps, _schema_editor):
+    Subtask = apps.get_model('core', 'Subtask')
+
+    for subtask in Subtask.objects.select_related('report_computed_task').iterator():
+        report_computed_task = deserialize_message(subtask.report_computed_task.data.tobytes())
+        subtask.maximum_download_time = calculate_maximum_download_time(
+            size=report_computed_task.size,
+            rate=settings.MINIMUM_UPLOAD_RATE,
+        )
+        subtask.subtask_verification_time = calculate_subtask_verification_time(report_computed_task)
+        subtask.download_deadline = parse_datetime_to_timestamp(subtask.computation_deadline) + subtask.subtask_verification_time
+        subtask.save(update_fields=['maximum_download_time', 'subtask_verification_time', 'download_deadline'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_pendingresponse_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='maximum_download_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='subtask_verification_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='download_deadline',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            fill_subtask_timing_columns,
+            reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='subtask',
+            name='maximum_download_time',
+            field=models.IntegerField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='subtask',
+            name='subtask_verification_time',
+            field=models.IntegerField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='subtask',
+            name='download_deadline',
+            field=models.IntegerField(blank=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ('core', '0020_subtask_timing_columns'),
+    ]
+
+    operations = [
+        # Subtasks with results still available for download (admin panel and soft shutdown status).
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS core_subtask_result_uploaded_download_deadline_idx ON core_subtask (download_deadline) WHERE state = 'RESULT_UPLOADED'",
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS core_subtask_result_uploaded_download_deadline_idx',
+        ),
+    ]
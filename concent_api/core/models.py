@@ -1,92 +1,55 @@
+from copy import deepcopy
 from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
 from typing import Union
 import base64
 import datetime
+import hashlib
 
 from django.conf import settings
 from django.core.validators import ValidationError
+from django.db import transaction
 from django.db.models import BinaryField
 from django.db.models import BooleanField
 from django.db.models import CharField
 from django.db.models import DateTimeField
 from django.db.models import DecimalField
-from django.db.models import ExpressionWrapper
-from django.db.models import F
 from django.db.models import ForeignKey
-from django.db.models import Func
 from django.db.models import IntegerField
 from django.db.models import Manager
 from django.db.models import Model
 from django.db.models import OneToOneField
 from django.db.models import PositiveSmallIntegerField
-from django.db.models import QuerySet
-from django.db.models import Value
+from django.utils import timezone
 
-from constance import config
 from golem_messages import message
 
+from common.caches import LRUCache
 from common.constants import ConcentUseCase
 from common.exceptions import ConcentInSoftShutdownMode
 from common.fields import Base64Field
 from common.fields import ChoiceEnum
-from common.helpers import deserialize_database_message
 from common.helpers import deserialize_message
 from common.helpers import parse_datetime_to_timestamp
 
+from .constants import CLIENTS_CACHE_SIZE
+from .constants import DESERIALIZED_MESSAGES_CACHE_SIZE
 from .constants import TASK_OWNER_KEY_LENGTH
 from .constants import ETHEREUM_ADDRESS_LENGTH
 from .constants import ETHEREUM_TRANSACTION_HASH_LENGTH
 from .constants import GOLEM_PUBLIC_KEY_LENGTH
 from .constants import MESSAGE_TASK_ID_MAX_LENGTH
+from .runtime_switches import is_soft_shutdown_mode_enabled
+from .utils import calculate_maximum_download_time
+from .utils import calculate_subtask_verification_time
 from .validation import validate_database_report_computed_task
 from .validation import validate_database_task_to_compute
 
-
-class SubtaskWithTimingColumnsManager(Manager):
-    """Creates maximum_download time, subtask_verification_time and download_deadline columns
-    maximum_download_time = DOWNLOAD_LEADIN_TIME + ceil((result_package_size / MINIMUM_UPLOAD_RATE << 10))
-    subtask_verification_time = (4 * CONCENT_MESSAGING_TIME) + (3 * maximum_download_time) + (0.5 * (computation_deadline - task_to_compute_timestamp))
-    download_deadline = computation_deadline + maximum_download_time
-    """
-
-    @classmethod
-    def with_maximum_download_time(cls, query_set: QuerySet) -> QuerySet:
-        bytes_per_sec = settings.MINIMUM_UPLOAD_RATE << 10
-        download_time = Func(F('result_package_size') / float(bytes_per_sec), function='CEIL')
-        return query_set.annotate(
-            maximum_download_time=Value(settings.DOWNLOAD_LEADIN_TIME) + download_time
-        )
-
-    @classmethod
-    def with_subtask_verification_time(cls, query_set: QuerySet) -> QuerySet:
-        task_to_compute_timestamp = Func(Value('epoch'), F('task_to_compute__timestamp'), function='DATE_PART')
-        subtask_timeout = Func(Value('epoch'), F('computation_deadline'), function='DATE_PART') - task_to_compute_timestamp
-        subtask_verification_time = (
-            4 * settings.CONCENT_MESSAGING_TIME) + (
-            3 * F('maximum_download_time')) + (
-            0.5 * subtask_timeout
-        )
-        return query_set.annotate(subtask_verification_time=ExpressionWrapper(
-            subtask_verification_time, output_field=IntegerField())
-        )
-
-    @classmethod
-    def with_download_deadline(cls, query_set: QuerySet) -> QuerySet:
-        return query_set.annotate(download_deadline=ExpressionWrapper(
-            Func(Value('epoch'), F('computation_deadline'), function='DATE_PART') +
-            F('subtask_verification_time'),
-            output_field=IntegerField())
-        )
-
-    @classmethod
-    def with_timing_columns(cls, query_set: QuerySet) -> QuerySet:
-        query_set_with_maximum_download_time = cls.with_maximum_download_time(query_set)
-        query_set_with_subtask_verification_time = cls.with_subtask_verification_time(query_set_with_maximum_download_time)
-        query_set_with_download_deadline = cls.with_download_deadline(query_set_with_subtask_verification_time)
-        return query_set_with_download_deadline
-
-    def get_queryset(self) -> QuerySet:
-        return self.with_timing_columns(super().get_queryset())
+deserialized_messages_cache = LRUCache(DESERIALIZED_MESSAGES_CACHE_SIZE)
+clients_cache = LRUCache(CLIENTS_CACHE_SIZE)
 
 
 class StoredMessage(Model):
@@ -101,14 +64,38 @@ class StoredMessage(Model):
     def __str__(self) -> str:
         return 'StoredMessage #{}, type:{}, {}'.format(self.id, self.type, self.timestamp)
 
+    def get_deserialized_message(self) -> message.Message:
+        """
+        Returns Golem message stored in `data`.
+        Deserialized messages are cached in the process by id and hash of the data, so that the same message
+        used several times while handling a request or in subsequent requests is deserialized only once.
+        Golem messages are mutable so a copy is returned every time.
+        """
+        data = bytes(self.data)
+        cache_key = (self.pk, hashlib.sha256(data).digest())
+        deserialized_message = deserialized_messages_cache.get(cache_key)
+        if deserialized_message is None:
+            deserialized_message = deserialize_message(data)
+            deserialized_messages_cache.set(cache_key, deserialized_message)
+        return deepcopy(deserialized_message)
+
 
 class ClientManager(Manager):
+    """
+    Client rows are never modified or deleted once created so ids of clients are cached in the process
+    by public key. An id gets into the cache only after the transaction that has read or created the row
+    is committed, so that the cache never contains ids of rows that have been rolled back.
+    """
 
     def get_or_create_full_clean(self, public_key: bytes) -> 'Client':
         """
         Returns Model instance.
         Does the same as get_or_create method, but also performs full_clean() on newly created instance.
         """
+        instance = self._get_from_cache(public_key)
+        if instance is not None:
+            return instance
+
         try:
             instance = self.get(public_key = base64.b64encode(public_key))
         except self.model.DoesNotExist:
@@ -117,8 +104,53 @@ class ClientManager(Manager):
             )
             instance.full_clean()
             instance.save()
+        self._add_to_cache_on_commit(instance)
         return instance
 
+    def get_or_create_many_full_clean(self, *public_keys: bytes) -> List['Client']:
+        """
+        Returns Model instances in the same order as given public keys.
+        Works like get_or_create_full_clean() but fetches all the clients that are not cached with a single query.
+        """
+        instances = {}  # type: Dict[bytes, Client]
+        for public_key in public_keys:
+            instance = self._get_from_cache(public_key)
+            if instance is not None:
+                instances[public_key] = instance
+
+        missing_public_keys = [public_key for public_key in public_keys if public_key not in instances]
+        if len(missing_public_keys) > 0:
+            for instance in self.filter(public_key__in = [base64.b64encode(public_key) for public_key in missing_public_keys]):
+                instances[instance.public_key_bytes] = instance
+                self._add_to_cache_on_commit(instance)
+
+        for public_key in missing_public_keys:
+            if public_key not in instances:
+                instance = self.model(
+                    public_key_bytes = public_key
+                )
+                instance.full_clean()
+                instance.save()
+                instances[public_key] = instance
+                self._add_to_cache_on_commit(instance)
+
+        return [instances[public_key] for public_key in public_keys]
+
+    def _get_from_cache(self, public_key: bytes) -> Optional['Client']:
+        client_id = clients_cache.get(public_key)
+        if client_id is None:
+            return None
+        return self.model.from_db(
+            self.db,
+            ['id', 'public_key'],
+            [client_id, base64.b64encode(public_key).decode()],
+        )
+
+    def _add_to_cache_on_commit(self, instance: 'Client') -> None:
+        public_key = instance.public_key_bytes
+        client_id = instance.pk
+        transaction.on_commit(lambda: clients_cache.set(public_key, client_id), using=self.db)
+
 
 class Client(Model):
     """
@@ -137,7 +169,6 @@ class Subtask(Model):
     Represents subtask states.
     """
     objects = Manager()
-    objects_with_timing_columns = SubtaskWithTimingColumnsManager()
 
     class SubtaskState(ChoiceEnum):
         FORCING_REPORT              = 'forcing_report'
@@ -359,6 +390,25 @@ class Subtask(Model):
 
     assert set(MESSAGE_REPLACEMENT_FOR_STATE) == set(SubtaskState)
 
+    # Fields compared with their values from the last validation to decide which validations clean() has to run again.
+    # Related messages are compared by their IDs so that the comparison does not load them from the database.
+    TRACKED_FIELDS = ('state', 'computation_deadline', 'result_package_size', *MESSAGE_FOR_FIELD)
+
+    # Related messages which must contain TaskToCompute equal to the one stored in Subtask.
+    MESSAGES_TO_VALIDATE_TASK_TO_COMPUTE = (
+        'report_computed_task',
+        'subtask_results_accepted',
+        'reject_report_computed_task',
+    )
+
+    # Related messages which must contain ReportComputedTask equal to the one stored in Subtask.
+    MESSAGES_TO_VALIDATE_REPORT_COMPUTED_TASK = (
+        'ack_report_computed_task',
+        'subtask_results_rejected',
+        'force_get_task_result',
+        'subtask_results_accepted',
+    )
+
     class Meta:
         unique_together = (
             ('requestor', 'task_id'),
@@ -404,9 +454,20 @@ class Subtask(Model):
     # Flag used to notify Concent Core that Storage Cluster has uploaded files related with this Subtask.
     result_upload_finished = BooleanField(default=False)
 
+    # Timing columns computed from report_computed_task when the subtask is saved, so that they can be filtered on
+    # and indexed. See _update_timing_columns().
+    # Time in seconds the provider has to upload the result, depending on result_package_size.
+    maximum_download_time = IntegerField(blank=True)
+    # Time in seconds after computation_deadline during which the requestor has to verify the result.
+    subtask_verification_time = IntegerField(blank=True)
+    # Timestamp until which the requestor can download the result, i.e. computation_deadline + subtask_verification_time.
+    download_deadline = IntegerField(blank=True)
+
     def __init__(self, *args: list, **kwargs: Union[str, int, datetime.datetime, StoredMessage, None]) -> None:
         super().__init__(*args, **kwargs)
         self._current_state_name = None
+        self._validated_field_values = None  # type: Optional[Dict[str, Any]]
+        self._timing_columns_report_computed_task_id = None  # type: Optional[int]
 
     def __repr__(self) -> str:
         return f"Subtask: task_id={self.task_id}, subtask_id={self.subtask_id}, state={self.state_enum}"
@@ -415,13 +476,28 @@ class Subtask(Model):
     def from_db(cls, db: str, field_names: list, values: tuple) -> 'Subtask':
         new = super().from_db(db, field_names, values)
         new._current_state_name = new.state  # pylint: disable=no-member
+        # Subtasks stored in the database have already been validated. If some of the tracked fields are deferred,
+        # reading them would cost a query, so the next clean() validates everything instead.
+        if all(cls._meta.get_field(field_name).attname in field_names for field_name in cls.TRACKED_FIELDS):
+            new._validated_field_values = new._get_tracked_field_values()
+        if 'report_computed_task_id' in field_names:
+            new._timing_columns_report_computed_task_id = new.report_computed_task_id  # pylint: disable=no-member
         return new
 
+    def save(self, *args: Any, **kwargs: Any) -> None:  # pylint: disable=arguments-differ
+        if self.report_computed_task_id != self._timing_columns_report_computed_task_id:
+            self._update_timing_columns()
+        super().save(*args, **kwargs)
+
     def clean(self) -> None:
         super().clean()
 
+        # Validations which deserialize messages or load them from the database are run only if the fields they
+        # depend on changed since the last validation. See _get_changed_fields().
+        changed_fields = self._get_changed_fields()
+
         # Concent should not accept anything that cause a transition to an active state in soft shutdown mode.
-        if config.SOFT_SHUTDOWN_MODE is True and self.state_enum in self.ACTIVE_STATES:
+        if is_soft_shutdown_mode_enabled() and self.state_enum in self.ACTIVE_STATES:
             raise ConcentInSoftShutdownMode
 
         # next_deadline must be datetime only for active states
@@ -458,7 +534,7 @@ class Subtask(Model):
             self._current_state_name = self.state
 
         # Both ack_report_computed_task and reject_report_computed_task cannot set at the same time.
-        if self.ack_report_computed_task is not None and self.reject_report_computed_task is not None:
+        if self._is_related_message_set('ack_report_computed_task') and self._is_related_message_set('reject_report_computed_task'):
             raise ValidationError(
                 'Both ack_report_computed_task and reject_report_computed_task cannot be set at the same time.'
             )
@@ -469,7 +545,7 @@ class Subtask(Model):
 
         # Check if all required related messages are not None in current state.
         for stored_message_name, states in Subtask.REQUIRED_RELATED_MESSAGES_IN_STATES.items():
-            if self.state_enum in states and getattr(self, stored_message_name) is None:
+            if self.state_enum in states and not self._is_related_message_set(stored_message_name):
                 raise ValidationError({
                     stored_message_name: '{} cannot be None in state {}.'.format(
                         stored_message_name,
@@ -479,7 +555,7 @@ class Subtask(Model):
 
         # Check if all related messages which must be None are None in current state.
         for stored_message_name, states in Subtask.UNSET_RELATED_MESSAGES_IN_STATES.items():
-            if self.state_enum in states and getattr(self, stored_message_name) is not None:
+            if self.state_enum in states and self._is_related_message_set(stored_message_name):
                 raise ValidationError({
                     stored_message_name: '{} must be None in state {}.'.format(
                         stored_message_name,
@@ -487,64 +563,51 @@ class Subtask(Model):
                     )
                 })
 
-        if isinstance(self.report_computed_task.data, bytes):
-            deserialized_report_computed_task = deserialize_message(self.report_computed_task.data)
-        else:
-            deserialized_report_computed_task = deserialize_message(self.report_computed_task.data.tobytes())  # pylint: disable=no-member
-
         # If available, the report_computed_task nested in force_get_task_result must match report_computed_task.
         if (
+            changed_fields & {'report_computed_task', 'force_get_task_result'} and
             self.force_get_task_result is not None and
-            deserialize_message(self.force_get_task_result.data).report_computed_task != deserialized_report_computed_task
+            self.force_get_task_result.get_deserialized_message().report_computed_task != self.report_computed_task.get_deserialized_message()
         ):
             raise ValidationError({
                 'force_get_task_result': "ReportComputedTask nested in ForceGetTaskResult must match Subtask's ReportComputedTask."
             })
 
-        if not self.result_package_size == deserialized_report_computed_task.size:
+        if (
+            changed_fields & {'report_computed_task', 'result_package_size'} and
+            not self.result_package_size == self.report_computed_task.get_deserialized_message().size
+        ):
             raise ValidationError({
                 'result_package_size': "ReportComputedTask size mismatch"
             })
 
-        if isinstance(self.task_to_compute.data, bytes):
-            deserialized_task_to_compute = deserialize_message(self.task_to_compute.data)
-        else:
-            deserialized_task_to_compute = deserialize_message(self.task_to_compute.data.tobytes())  # pylint: disable=no-member
-
-        if not parse_datetime_to_timestamp(self.computation_deadline) == deserialized_task_to_compute.compute_task_def['deadline']:
+        if (
+            changed_fields & {'task_to_compute', 'computation_deadline'} and
+            not parse_datetime_to_timestamp(self.computation_deadline) == self.task_to_compute.get_deserialized_message().compute_task_def['deadline']
+        ):
             raise ValidationError({
                 'computation_deadline': "TaskToCompute deadline mismatch"
             })
 
         # Validation for every nested message which is stored in Control database
         # Every nested message must be the same as message stored separately.
-        MESSAGES_TO_VALIDATE_TASK_TO_COMPUTE = [
-            self.report_computed_task,
-            self.subtask_results_accepted,
-            self.reject_report_computed_task,
-        ]
-        MESSAGES_TO_VALIDATE_REPORT_COMPUTED_TASK = [
-            self.ack_report_computed_task,
-            self.subtask_results_rejected,
-            self.force_get_task_result,
-            self.subtask_results_accepted,
-        ]
-
-        for task_to_compute_to_validate in MESSAGES_TO_VALIDATE_TASK_TO_COMPUTE:
-            if task_to_compute_to_validate is not None:
+        for stored_message_name in self.MESSAGES_TO_VALIDATE_TASK_TO_COMPUTE:
+            if changed_fields & {'task_to_compute', stored_message_name} and getattr(self, stored_message_name) is not None:
                 validate_database_task_to_compute(
-                    task_to_compute=deserialized_task_to_compute,
-                    message_to_compare=deserialize_database_message(task_to_compute_to_validate),
+                    task_to_compute=self.task_to_compute.get_deserialized_message(),
+                    message_to_compare=getattr(self, stored_message_name).get_deserialized_message(),
                 )
 
-        for report_computed_task_to_validate in MESSAGES_TO_VALIDATE_REPORT_COMPUTED_TASK:
-            if report_computed_task_to_validate is not None:
+        for stored_message_name in self.MESSAGES_TO_VALIDATE_REPORT_COMPUTED_TASK:
+            if changed_fields & {'report_computed_task', stored_message_name} and getattr(self, stored_message_name) is not None:
                 validate_database_report_computed_task(
-                    report_computed_task=deserialized_report_computed_task,
-                    message_to_compare=deserialize_database_message(report_computed_task_to_validate),
+                    report_computed_task=self.report_computed_task.get_deserialized_message(),
+                    message_to_compare=getattr(self, stored_message_name).get_deserialized_message(),
                 )
 
         for related_message_name in Subtask.MESSAGE_FOR_FIELD:
+            if related_message_name not in changed_fields:
+                continue
             related_message = getattr(self, related_message_name)
             assert isinstance(related_message, StoredMessage) or related_message is None
             if related_message is not None and related_message.protocol_version != settings.GOLEM_MESSAGES_VERSION:
@@ -553,6 +616,47 @@ class Subtask(Model):
                     f'Version in Concent is {settings.GOLEM_MESSAGES_VERSION}'
                 )
 
+        self._validated_field_values = self._get_tracked_field_values()
+
+    def _get_tracked_field_values(self) -> Dict[str, Any]:
+        return {
+            field_name: getattr(self, self._meta.get_field(field_name).attname)
+            for field_name in self.TRACKED_FIELDS
+        }
+
+    def _get_changed_fields(self) -> Set[str]:
+        """
+        Returns names of tracked fields whose values differ from the ones the subtask had when it was loaded
+        from the database or last validated. All tracked fields are returned for new subtasks and in strict mode.
+        """
+        tracked_field_values = self._get_tracked_field_values()
+        if settings.STRICT_SUBTASK_VALIDATION or self._state.adding or self._validated_field_values is None:
+            return set(tracked_field_values)
+
+        return {
+            field_name
+            for field_name, value in tracked_field_values.items()
+            if value != self._validated_field_values[field_name]
+        }
+
+    def _update_timing_columns(self) -> None:
+        """
+        All timing columns depend only on ReportComputedTask (and TaskToCompute nested in it), so they are computed
+        when the subtask is created and when its ReportComputedTask is replaced.
+        """
+        deserialized_report_computed_task = self.report_computed_task.get_deserialized_message()
+        self.maximum_download_time = calculate_maximum_download_time(
+            size=deserialized_report_computed_task.size,
+            rate=settings.MINIMUM_UPLOAD_RATE,
+        )
+        self.subtask_verification_time = calculate_subtask_verification_time(deserialized_report_computed_task)
+        self.download_deadline = parse_datetime_to_timestamp(self.computation_deadline) + self.subtask_verification_time
+        self._timing_columns_report_computed_task_id = self.report_computed_task_id
+
+    def _is_related_message_set(self, field_name: str) -> bool:
+        """ Checks if related message is set without loading it from the database if it has not been loaded yet. """
+        return getattr(self, self._meta.get_field(field_name).attname) is not None
+
     @property
     def state_enum(self) -> 'SubtaskState':
         return Subtask.SubtaskState[self.state]
@@ -562,11 +666,66 @@ class Subtask(Model):
         return Subtask.SubtaskState[self._current_state_name]  # type: ignore
 
 
+class PendingResponseManager(Manager):
+
+    def dequeue(self, client_public_key: bytes) -> Optional['PendingResponse']:
+        """
+        Atomically claims the oldest undelivered PendingResponse of the client with a single statement,
+        marks it as delivered and returns it. Rows locked by concurrent transactions are skipped instead of waited for.
+        The returned instance contains the payload as it was before it got cleared in the database.
+        If the message for the client can't be delivered, the claim must be reverted with `undeliver()`
+        or by rolling back the transaction.
+        """
+        pending_response_table = self.model._meta.db_table
+        client_table = Client._meta.db_table
+        dequeued_pending_responses = list(self.raw(
+            f"""
+            WITH claimed AS (
+                SELECT id, payload FROM {pending_response_table}
+                WHERE
+                    client_id = (SELECT id FROM {client_table} WHERE public_key = %s) AND
+                    delivered = false
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE {pending_response_table} AS pending_response
+            SET delivered = true, payload = NULL, modified_at = %s
+            FROM claimed
+            WHERE pending_response.id = claimed.id
+            RETURNING
+                pending_response.id,
+                pending_response.response_type,
+                pending_response.client_id,
+                pending_response.queue,
+                pending_response.delivered,
+                pending_response.subtask_id,
+                claimed.payload,
+                pending_response.created_at,
+                pending_response.modified_at
+            """,
+            [base64.b64encode(client_public_key).decode(), timezone.now()],
+        ))
+        assert len(dequeued_pending_responses) <= 1
+        return dequeued_pending_responses[0] if len(dequeued_pending_responses) == 1 else None
+
+    def undeliver(self, pending_response: 'PendingResponse') -> None:
+        """ Reverts `dequeue()` so that the PendingResponse is returned again by the next receive. """
+        self.filter(pk=pending_response.pk).update(
+            delivered=False,
+            payload=pending_response.payload,
+            modified_at=timezone.now(),
+        )
+        pending_response.delivered = False
+
+
 class PendingResponse(Model):
     """
     Stores information about messages to be returned from the `receive` or `receive-out-of-band` endpoint.
     """
 
+    objects = PendingResponseManager()
+
     class ResponseType(ChoiceEnum):
         ForceReportComputedTask         = 'ForceReportComputedTask'
         ForceReportComputedTaskResponse = 'ForceReportComputedTaskResponse'
@@ -597,6 +756,10 @@ class PendingResponse(Model):
 
     subtask              = ForeignKey(Subtask, blank = True, null = True)
 
+    # Serialized but neither signed nor encrypted message for the client, built when the response was created.
+    # Empty if the message is built only when the client receives it.
+    payload              = BinaryField(blank = True, null = True)
+
     created_at = DateTimeField(auto_now_add=True)
     modified_at = DateTimeField(auto_now=True)
 
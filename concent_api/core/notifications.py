@@ -0,0 +1,203 @@
+from base64 import b64encode
+from threading import Event
+from threading import Lock
+from threading import Thread
+import os
+import select
+import time
+from types import TracebackType
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Type
+
+from django.db import connections
+
+from core.constants import PENDING_RESPONSE_NOTIFICATION_CHANNEL
+
+
+def notify_about_new_pending_response(client_public_key: bytes) -> None:
+    """
+    Sends PostgreSQL notification about a new PendingResponse for the client with given public key.
+    The notification is delivered to listeners only when the current transaction gets committed.
+    """
+    with connections['control'].cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, %s)',
+            [PENDING_RESPONSE_NOTIFICATION_CHANNEL, b64encode(client_public_key).decode()],
+        )
+
+
+class PendingResponseListener:
+    """
+    Context manager which subscribes the connection to the control database to notifications sent by
+    `notify_about_new_pending_response()` and allows waiting for them without polling the database.
+
+    LISTEN takes effect only when committed so it must be used outside of a transaction.
+    """
+
+    def __init__(self, client_public_key: bytes) -> None:
+        self.encoded_client_public_key = b64encode(client_public_key).decode()
+        self.connection = connections['control']
+
+    def __enter__(self) -> 'PendingResponseListener':
+        assert not self.connection.in_atomic_block
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {PENDING_RESPONSE_NOTIFICATION_CHANNEL}')
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'UNLISTEN {PENDING_RESPONSE_NOTIFICATION_CHANNEL}')
+        del self.connection.connection.notifies[:]
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until a notification about a new PendingResponse for the client arrives or `timeout` seconds pass.
+        Returns True if the notification has been received.
+        """
+        raw_connection = self.connection.connection
+        deadline = time.monotonic() + timeout
+        while True:
+            while len(raw_connection.notifies) > 0:
+                notification = raw_connection.notifies.pop(0)
+                if notification.payload == self.encoded_client_public_key:
+                    return True
+
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0:
+                return False
+
+            (readable, _, _) = select.select([raw_connection], [], [], remaining_time)
+            if len(readable) == 0:
+                return False
+            raw_connection.poll()
+
+
+class SharedPendingResponseListener:
+    """
+    Listens to notifications sent by `notify_about_new_pending_response()` on a single dedicated connection per process
+    and wakes up the threads waiting for messages for the notified clients. Waiting threads do not hold any database
+    connection, so a threaded worker can keep many long-polling clients waiting at once.
+
+    The listening thread is started in the process which subscribes first, so the listener can be created
+    before worker processes are forked. If the dedicated connection breaks, all waiting threads are woken up
+    and the connection is opened again on the next subscription.
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions = {}  # type: Dict[str, List[Event]]
+        self._subscriptions_process_id = os.getpid()
+        self._lock = Lock()
+        self._listener_process_id = None  # type: Optional[int]
+
+    def subscribe(self, client_public_key: bytes) -> Event:
+        """
+        Returns an event which is set when a notification for given client arrives.
+        LISTEN is already in effect when this function returns.
+        """
+        self._start_listener_if_needed()
+        event = Event()
+        with self._lock:
+            self._subscriptions.setdefault(b64encode(client_public_key).decode(), []).append(event)
+        return event
+
+    def unsubscribe(self, client_public_key: bytes, event: Event) -> None:
+        encoded_client_public_key = b64encode(client_public_key).decode()
+        with self._lock:
+            events = self._subscriptions.get(encoded_client_public_key, [])
+            if event in events:
+                events.remove(event)
+            if len(events) == 0:
+                self._subscriptions.pop(encoded_client_public_key, None)
+
+    def dispatch_notification(self, encoded_client_public_key: str) -> None:
+        with self._lock:
+            for event in self._subscriptions.get(encoded_client_public_key, []):
+                event.set()
+
+    def _wake_up_all_subscribers(self) -> None:
+        with self._lock:
+            for events in self._subscriptions.values():
+                for event in events:
+                    event.set()
+
+    def _start_listener_if_needed(self) -> None:
+        if self._listener_process_id == os.getpid():
+            return
+        with self._lock:
+            if self._listener_process_id == os.getpid():
+                return
+            # Subscriptions inherited from the parent process belong to threads which do not exist in this process.
+            # When the listener is only restarted after its connection broke, the waiting threads keep their subscriptions.
+            if self._subscriptions_process_id != os.getpid():
+                self._subscriptions = {}
+                self._subscriptions_process_id = os.getpid()
+            control_connection = connections['control']
+            raw_connection = control_connection.get_new_connection(control_connection.get_connection_params())
+            raw_connection.autocommit = True
+            with raw_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {PENDING_RESPONSE_NOTIFICATION_CHANNEL}')
+            Thread(target=self._dispatch_notifications, args=(raw_connection,), daemon=True).start()
+            self._listener_process_id = os.getpid()
+
+    def _dispatch_notifications(self, raw_connection: Any) -> None:
+        try:
+            while True:
+                select.select([raw_connection], [], [])
+                raw_connection.poll()
+                while len(raw_connection.notifies) > 0:
+                    self.dispatch_notification(raw_connection.notifies.pop(0).payload)
+        except Exception:  # pylint: disable=broad-except
+            with self._lock:
+                self._listener_process_id = None
+            self._wake_up_all_subscribers()
+            raw_connection.close()
+
+
+shared_pending_response_listener = SharedPendingResponseListener()
+
+
+class SharedPendingResponseSubscription:
+    """
+    Context manager with the same interface as `PendingResponseListener` which waits for notifications
+    received by `shared_pending_response_listener` instead of listening on the connection of the current thread.
+    The connections of the current thread are closed before waiting so that they do not stay idle.
+    Connections in a transaction can't be closed, so the view must not be atomic for any database.
+    """
+
+    def __init__(self, client_public_key: bytes) -> None:
+        self.client_public_key = client_public_key
+        self.event = None  # type: Optional[Event]
+
+    def __enter__(self) -> 'SharedPendingResponseSubscription':
+        self.event = shared_pending_response_listener.subscribe(self.client_public_key)
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        assert self.event is not None
+        shared_pending_response_listener.unsubscribe(self.client_public_key, self.event)
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Blocks until a notification about a new PendingResponse for the client arrives or `timeout` seconds pass.
+        Returns True if the notification has been received.
+        """
+        assert self.event is not None
+        for connection in connections.all():
+            if not connection.in_atomic_block:
+                connection.close()
+        is_notified = self.event.wait(timeout)
+        self.event.clear()
+        return is_notified
@@ -16,7 +16,6 @@ from golem_sci.events import ForcedPaymentEvent
 from psycopg2 import errorcodes as pg_errorcodes
 
 from common.constants import ConcentUseCase
-from common.helpers import deserialize_message
 from common.helpers import ethereum_public_key_to_address
 from common.helpers import get_current_utc_timestamp
 from common.logging import log
@@ -248,7 +247,7 @@ def finalize_payment(deposit_claim: DepositClaim) -> Optional[str]:
         elif deposit_claim.concent_use_case == ConcentUseCase.ADDITIONAL_VERIFICATION:
             subtask = Subtask.objects.filter(subtask_id=deposit_claim.subtask_id).first()  # pylint: disable=no-member
             if subtask is not None:
-                task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+                task_to_compute = subtask.task_to_compute.get_deserialized_message()
                 if task_to_compute.requestor_ethereum_address == deposit_claim.payer_deposit_account.ethereum_address:
                     ethereum_transaction_hash = service.force_subtask_payment(  # pylint: disable=no-value-for-parameter
                         requestor_eth_address=deposit_claim.payer_deposit_account.ethereum_address,
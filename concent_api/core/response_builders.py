@@ -0,0 +1,196 @@
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from django.conf import settings
+
+from golem_messages import message
+
+from common.helpers import get_current_utc_timestamp
+from common.helpers import parse_datetime_to_timestamp
+from common.helpers import sign_message
+from core.models import PendingResponse
+from core.utils import is_protocol_version_compatible
+
+PendingResponseBuilder = Callable[[PendingResponse, bytes], Optional[message.Message]]
+
+
+def build_force_report_computed_task(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.ForceReportComputedTask:
+    return message.concents.ForceReportComputedTask(
+        report_computed_task=pending_response.subtask.report_computed_task.get_deserialized_message(),
+    )
+
+
+def build_force_report_computed_task_response(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.ForceReportComputedTaskResponse:
+    if pending_response.subtask.ack_report_computed_task is not None:
+        return message.concents.ForceReportComputedTaskResponse(
+            ack_report_computed_task=pending_response.subtask.ack_report_computed_task.get_deserialized_message(),
+            reason=message.concents.ForceReportComputedTaskResponse.REASON.AckFromRequestor,
+        )
+
+    if pending_response.subtask.reject_report_computed_task is not None:
+        reject_report_computed_task = pending_response.subtask.reject_report_computed_task.get_deserialized_message()
+        if reject_report_computed_task.reason != message.tasks.RejectReportComputedTask.REASON.SubtaskTimeLimitExceeded:
+            return message.concents.ForceReportComputedTaskResponse(
+                reject_report_computed_task=reject_report_computed_task,
+                reason=message.concents.ForceReportComputedTaskResponse.REASON.RejectFromRequestor,
+            )
+
+    ack_report_computed_task = message.tasks.AckReportComputedTask(
+        report_computed_task=pending_response.subtask.report_computed_task.get_deserialized_message(),
+    )
+    sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
+    return message.concents.ForceReportComputedTaskResponse(
+        ack_report_computed_task=ack_report_computed_task,
+        reason=message.concents.ForceReportComputedTaskResponse.REASON.ConcentAck,
+    )
+
+
+def build_verdict_report_computed_task(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.VerdictReportComputedTask:
+    ack_report_computed_task = message.tasks.AckReportComputedTask(
+        report_computed_task=pending_response.subtask.report_computed_task.get_deserialized_message(),
+    )
+    sign_message(ack_report_computed_task, settings.CONCENT_PRIVATE_KEY)
+    return message.concents.VerdictReportComputedTask(
+        ack_report_computed_task    = ack_report_computed_task,
+        force_report_computed_task  = message.concents.ForceReportComputedTask(
+            report_computed_task = pending_response.subtask.report_computed_task.get_deserialized_message(),
+        ),
+    )
+
+
+def build_force_get_task_result_failed(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.ForceGetTaskResultFailed:
+    return message.concents.ForceGetTaskResultFailed(
+        task_to_compute = pending_response.subtask.task_to_compute.get_deserialized_message(),
+    )
+
+
+def build_force_subtask_results(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.ForceSubtaskResults:
+    return message.concents.ForceSubtaskResults(
+        ack_report_computed_task = pending_response.subtask.ack_report_computed_task.get_deserialized_message(),
+    )
+
+
+def build_subtask_results_settled(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.SubtaskResultsSettled:
+    return message.concents.SubtaskResultsSettled(
+        origin=message.concents.SubtaskResultsSettled.Origin.ResultsRejected,
+        task_to_compute=pending_response.subtask.task_to_compute.get_deserialized_message(),
+    )
+
+
+def build_force_subtask_results_response(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.concents.ForceSubtaskResultsResponse:
+    subtask_results_accepted = pending_response.subtask.subtask_results_accepted
+    subtask_results_rejected = pending_response.subtask.subtask_results_rejected
+
+    assert (subtask_results_rejected is None and subtask_results_accepted is not None) or \
+           (subtask_results_accepted is None and subtask_results_rejected is not None)
+
+    if subtask_results_accepted is not None:
+        return message.concents.ForceSubtaskResultsResponse(
+            subtask_results_accepted=subtask_results_accepted.get_deserialized_message(),
+        )
+    return message.concents.ForceSubtaskResultsResponse(
+        subtask_results_rejected=subtask_results_rejected.get_deserialized_message(),  # type: ignore
+    )
+
+
+def build_subtask_results_rejected(
+    pending_response: PendingResponse,
+    _client_public_key: bytes,
+) -> message.tasks.SubtaskResultsRejected:
+    return message.tasks.SubtaskResultsRejected(
+        reason=message.tasks.SubtaskResultsRejected.REASON.ConcentResourcesFailure,
+        report_computed_task=pending_response.subtask.report_computed_task.get_deserialized_message(),
+    )
+
+
+# Defines a function building the message for the client for each type of PendingResponse which depends only on
+# the subtask and the related StoredMessages of the subtask it uses. Messages of these types can be built and stored
+# in advance, when the PendingResponse is created. TaskToCompute is always needed to check the protocol version.
+PRECOMPUTABLE_PENDING_RESPONSE_BUILDERS = {
+    PendingResponse.ResponseType.ForceReportComputedTask: (
+        build_force_report_computed_task,
+        ('task_to_compute', 'report_computed_task'),
+    ),
+    PendingResponse.ResponseType.ForceReportComputedTaskResponse: (
+        build_force_report_computed_task_response,
+        ('task_to_compute', 'report_computed_task', 'ack_report_computed_task', 'reject_report_computed_task'),
+    ),
+    PendingResponse.ResponseType.VerdictReportComputedTask: (
+        build_verdict_report_computed_task,
+        ('task_to_compute', 'report_computed_task'),
+    ),
+    PendingResponse.ResponseType.ForceGetTaskResultFailed: (
+        build_force_get_task_result_failed,
+        ('task_to_compute',),
+    ),
+    PendingResponse.ResponseType.ForceSubtaskResults: (
+        build_force_subtask_results,
+        ('task_to_compute', 'ack_report_computed_task'),
+    ),
+    PendingResponse.ResponseType.SubtaskResultsSettled: (
+        build_subtask_results_settled,
+        ('task_to_compute',),
+    ),
+    PendingResponse.ResponseType.ForceSubtaskResultsResponse: (
+        build_force_subtask_results_response,
+        ('task_to_compute', 'subtask_results_accepted', 'subtask_results_rejected'),
+    ),
+    PendingResponse.ResponseType.SubtaskResultsRejected: (
+        build_subtask_results_rejected,
+        ('task_to_compute', 'report_computed_task'),
+    ),
+}  # type: Dict[PendingResponse.ResponseType, Tuple[PendingResponseBuilder, Tuple[str, ...]]]
+
+
+def build_pending_response_payload(pending_response: PendingResponse, client_public_key: bytes) -> Optional[bytes]:
+    """
+    Builds and serializes the message for the client out of given, not yet delivered PendingResponse.
+    Returns None if the message can't be built in advance or if precomputing is disabled.
+    The payload is neither signed nor encrypted. Like any other response, it's signed and encrypted
+    for the client when the message is received.
+    """
+    if (
+        settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE == 0 or
+        pending_response.response_type_enum not in PRECOMPUTABLE_PENDING_RESPONSE_BUILDERS or
+        not is_protocol_version_compatible(pending_response.subtask.task_to_compute.protocol_version)
+    ):
+        return None
+
+    (build_response, _related_messages) = PRECOMPUTABLE_PENDING_RESPONSE_BUILDERS[pending_response.response_type_enum]
+    response_to_client = build_response(pending_response, client_public_key)
+    return response_to_client.serialize()
+
+
+def is_pending_response_payload_fresh(pending_response: PendingResponse) -> bool:
+    """
+    Precomputed messages have timestamps from the moment the PendingResponse was created. Clients reject
+    messages which are too old so the payload is used only for PendingResponses which are not older than
+    PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE. Older ones are built again when received.
+    """
+    return (
+        pending_response.payload is not None and
+        get_current_utc_timestamp() - parse_datetime_to_timestamp(pending_response.created_at) <= settings.PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE
+    )
@@ -0,0 +1,30 @@
+from typing import Any
+
+from constance import config
+
+from common.caches import ExpiringCache
+
+from .constants import RUNTIME_SWITCHES_CACHE_TIMEOUT
+
+runtime_switches_cache = ExpiringCache(RUNTIME_SWITCHES_CACHE_TIMEOUT)
+
+
+def get_runtime_switch(name: str) -> Any:
+    """
+    Returns value of a constance config option. The database backend of constance makes a query on every read,
+    so values are cached in the process for RUNTIME_SWITCHES_CACHE_TIMEOUT seconds.
+    """
+    value = runtime_switches_cache.get(name)
+    if value is None:
+        value = getattr(config, name)
+        runtime_switches_cache.set(name, value)
+    return value
+
+
+def is_soft_shutdown_mode_enabled() -> bool:
+    return get_runtime_switch('SOFT_SHUTDOWN_MODE') is True
+
+
+def invalidate_runtime_switch(sender: Any, key: str, **kwargs: Any) -> None:  # pylint: disable=unused-argument
+    """ Receiver of constance `config_updated` signal, sent when a config option is changed e.g. in the admin panel. """
+    runtime_switches_cache.delete(key)
@@ -4,8 +4,11 @@ from typing import Any
 from typing import List
 from typing import Optional
 from typing import Union
+import hashlib
+import time
 
 from django.conf import settings
+from django.db import connections
 from django.db import transaction
 from django.db.models import Model
 from django.db.models import Q
@@ -16,11 +19,13 @@ from golem_messages.message.concents import ForcePayment
 from golem_messages.message.tasks import SubtaskResultsAccepted
 
 from common.constants import ConcentUseCase
-from common.helpers import deserialize_message
 from common.helpers import get_current_utc_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
 from common.logging import log
+from common.logging import LoggingLevel
+from common.metrics import record_subtask_lock
 from core.exceptions import UnsupportedProtocolVersion
+from core.models import Client
 from core.models import DepositClaim
 from core.models import PendingResponse
 from core.models import Subtask
@@ -69,7 +74,7 @@ def _update_timed_out_subtask(subtask: Subtask) -> None:
             subtask=subtask,
         )
     elif subtask.state == Subtask.SubtaskState.FORCING_ACCEPTANCE.name:  # pylint: disable=no-member
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+        task_to_compute = subtask.task_to_compute.get_deserialized_message()
 
         def finalize_claim_for_acceptance_case() -> None:
             finalize_deposit_claim(
@@ -117,7 +122,7 @@ def _update_timed_out_subtask(subtask: Subtask) -> None:
             subtask=subtask,
         )
     elif subtask.state == Subtask.SubtaskState.ADDITIONAL_VERIFICATION.name:  # pylint: disable=no-member
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+        task_to_compute = subtask.task_to_compute.get_deserialized_message()
 
         def finalize_claim_for_additional_verification_case() -> None:
             finalize_deposit_claim(
@@ -214,30 +219,93 @@ def pre_process_message_related_subtasks(
 
 def update_all_timed_out_subtasks_of_a_client(client_public_key: bytes) -> None:
     """
-    Function looks for all subtasks in active state of client. All found subtasks are processed in separate transactions,
-    locked in database, file status is verified (check additional conditions in verify_file_status) and subtask's state
-    is updated in _update_timed_out_subtask
+    Function looks for client's subtasks in active states which are either timed out or have their result
+    upload finished. Normally timed out subtasks are processed by `update_timed_out_subtasks()` running in background,
+    so this is a single, cheap query and the loop is executed only if the client polls before the sweeper gets to them.
+    All found subtasks are processed in separate transactions, locked in database, file status is verified
+    (check additional conditions in verify_file_status) and subtask's state is updated in _update_timed_out_subtask
     """
 
     encoded_client_public_key = b64encode(client_public_key)
-
-    clients_subtask_list = Subtask.objects.filter(
-        Q(requestor__public_key=encoded_client_public_key) | Q(provider__public_key=encoded_client_public_key),
-        state__in=[state.name for state in Subtask.ACTIVE_STATES],
+    current_datetime = parse_timestamp_to_utc_datetime(get_current_utc_timestamp())
+    active_state_names = [state.name for state in Subtask.ACTIVE_STATES]
+
+    # Client's id is fetched first so that subtasks can be filtered without joining Client table
+    # and partial indexes on requestor and provider in active states can be used.
+    client_id = Client.objects.filter(public_key=encoded_client_public_key).values_list('id', flat=True).first()
+    if client_id is None:
+        return
+
+    clients_subtask_ids = list(
+        Subtask.objects.filter(
+            Q(requestor_id=client_id) | Q(provider_id=client_id),
+            Q(next_deadline__lte=current_datetime) | Q(
+                state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
+                result_upload_finished=True,
+            ),
+            state__in=active_state_names,
+        ).values_list('subtask_id', flat=True)
     )
-    # Check if files are uploaded for all clients subtasks. It is checked for all clients subtasks, not only timeouted.
-    for subtask in clients_subtask_list:
+    for subtask_id in clients_subtask_ids:
         with transaction.atomic(using='control'):
-            Subtask.objects.select_for_update().filter(subtask_id=subtask.subtask_id)
+            subtask = get_one_or_none(
+                subtask_or_query_set=Subtask.objects.select_for_update(),
+                subtask_id=subtask_id,
+                state__in=active_state_names,
+            )
+            # Subtask could have been already processed by the sweeper after the query above.
+            if subtask is None:
+                continue
+
             verify_file_status(subtask=subtask, client_public_key=client_public_key)
 
             # Subtask may change it's state to passive (RESULT UPLOADED) in verify_file_status. In this case there
             # is no need to call _update_timed_out_subtask any more. Next_deadline will be set to None, so it is
             # necessary to check it before checking if deadline is exceeded.
-            if subtask.next_deadline is not None and subtask.next_deadline <= parse_timestamp_to_utc_datetime(get_current_utc_timestamp()):
+            if subtask.next_deadline is not None and subtask.next_deadline <= current_datetime:
                 _update_timed_out_subtask(subtask)
 
 
+def update_timed_out_subtasks(maximum_number_of_subtasks: int) -> int:
+    """
+    Processes up to `maximum_number_of_subtasks` subtasks in active states with exceeded deadlines, oldest deadlines
+    first, in a single transaction. Subtasks locked by other transactions (e.g. requests of their clients being
+    processed right now) are skipped and will be picked up later. Each subtask is processed in its own savepoint
+    so that a subtask which can't be processed is only logged and rolled back without affecting the others.
+    Returns the number of successfully processed subtasks.
+    """
+    assert isinstance(maximum_number_of_subtasks, int) and maximum_number_of_subtasks > 0
+
+    current_datetime = parse_timestamp_to_utc_datetime(get_current_utc_timestamp())
+
+    number_of_processed_subtasks = 0
+    with transaction.atomic(using='control'):
+        # Requestors are prefetched in a separate query rather than joined so that their rows are not locked as well.
+        timed_out_subtasks = list(
+            Subtask.objects.select_for_update(skip_locked=True).filter(
+                state__in=[state.name for state in Subtask.ACTIVE_STATES],
+                next_deadline__lte=current_datetime,
+            ).prefetch_related('requestor').order_by('next_deadline')[:maximum_number_of_subtasks]
+        )
+        for subtask in timed_out_subtasks:
+            try:
+                with transaction.atomic(using='control'):
+                    # The same check that happens when the requestor polls for messages.
+                    verify_file_status(subtask=subtask, client_public_key=subtask.requestor.public_key_bytes)
+                    if subtask.next_deadline is not None:
+                        _update_timed_out_subtask(subtask)
+                number_of_processed_subtasks += 1
+            except Exception as exception:  # pylint: disable=broad-except
+                log(
+                    logger,
+                    f'Timed out subtask could not be updated and will be retried later. Exception: {exception}.',
+                    subtask_id=subtask.subtask_id,
+                    logging_level=LoggingLevel.EXCEPTION,
+                )
+
+    return number_of_processed_subtasks
+
+
 def update_subtask_state(subtask: Subtask, state: str, next_deadline: Union[int, float, None] = None) -> None:
     old_state = subtask.state
     subtask.state = state
@@ -309,6 +377,42 @@ def get_one_or_none(
         return None if len(instances) == 0 else instances[0]
 
 
+def get_subtask_lock_key(subtask_id: str) -> int:
+    """ Returns a signed 64-bit integer derived from subtask_id, usable as a key of PostgreSQL advisory locks. """
+    return int.from_bytes(hashlib.blake2b(subtask_id.encode(), digest_size=8).digest(), byteorder='big', signed=True)
+
+
+def lock_subtask(subtask_id: str) -> None:
+    """
+    Takes a transaction-level PostgreSQL advisory lock keyed on a hash of subtask_id in the control database.
+    Rows of subtasks which do not exist yet cannot be locked with SELECT ... FOR UPDATE, so without it concurrent
+    requests concerning the same new subtask all try to store it and all but one fail with IntegrityError.
+    With the lock taken before checking if the subtask exists, they wait until the transaction which holds it ends
+    and then find the subtask it has stored.
+    """
+    assert isinstance(subtask_id, str)
+    assert transaction.get_connection(using='control').in_atomic_block
+
+    lock_key = get_subtask_lock_key(subtask_id)
+    with connections['control'].cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [lock_key])
+        if cursor.fetchone()[0]:
+            record_subtask_lock(None)
+            return
+
+        start_time = time.monotonic()
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [lock_key])
+        wait_time = time.monotonic() - start_time
+
+    record_subtask_lock(wait_time)
+    log(
+        logger,
+        f'Waited {wait_time:.3f} s for a concurrent request to release the lock of the subtask.',
+        subtask_id=subtask_id,
+        logging_level=LoggingLevel.INFO,
+    )
+
+
 def finalize_deposit_claim(
     subtask_id: str,
     concent_use_case: ConcentUseCase,
@@ -10,7 +10,6 @@ from common import logging
 from common.constants import ConcentUseCase
 from common.decorators import log_task_errors
 from common.decorators import provides_concent_feature
-from common.helpers import deserialize_message
 from common.helpers import get_current_utc_timestamp
 from common.helpers import parse_datetime_to_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
@@ -49,7 +48,7 @@ def upload_finished(subtask_id: str) -> None:
         )
         return
 
-    report_computed_task = deserialize_message(subtask.report_computed_task.data.tobytes())
+    report_computed_task = subtask.report_computed_task.get_deserialized_message()
 
     # Check subtask state, if it's VERIFICATION FILE TRANSFER, proceed with the task.
     if subtask.state_enum == Subtask.SubtaskState.VERIFICATION_FILE_TRANSFER:
@@ -210,7 +209,7 @@ def verification_result(
     # If the time is already past next_deadline for the subtask (SubtaskResultsRejected.timestamp + AVCT)
     # worker ignores worker's message and processes the timeout.
     if subtask.next_deadline < parse_timestamp_to_utc_datetime(get_current_utc_timestamp()):
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+        task_to_compute = subtask.task_to_compute.get_deserialized_message()
         # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
 
         def finalize_claims() -> None:
@@ -252,7 +251,7 @@ def verification_result(
                 subtask=subtask,
             )
 
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+        task_to_compute = subtask.task_to_compute.get_deserialized_message()
 
         def finalize_claims() -> None:  # pylint: disable=function-redefined
             delete_deposit_claim(
@@ -285,7 +284,7 @@ def verification_result(
                 f'Verification_result_task processing error result with: RESULT {result_enum.name}. ERROR MESSAGE {error_message}. ERROR CODE {error_code}',
                 subtask_id=subtask_id,
             )
-        task_to_compute = deserialize_message(subtask.task_to_compute.data.tobytes())
+        task_to_compute = subtask.task_to_compute.get_deserialized_message()
 
         # Worker makes a payment from requestor's deposit just like in the forced acceptance use case.
 
@@ -10,6 +10,7 @@ from django.db.models import Q
 from django.db.models import QuerySet
 from django.db.models import Value
 from django.db.models.functions import Greatest
+from common.database_replicas import read_from_replica
 from common.helpers import parse_timestamp_to_utc_datetime
 from common.helpers import get_current_utc_timestamp
 from core.models import Subtask
@@ -20,6 +21,8 @@ ACTIVE_STATE_NAMES = [state.name for state in Subtask.ACTIVE_STATES]
 PASSIVE_STATE_NAMES = [state.name for state in Subtask.PASSIVE_STATES]
 
 
+# Queries which decide whether Concent can be shut down always read from the primary database.
+# A replica might not see a subtask that has just become active. Only the counts can be read from a replica.
 def get_active_subtasks() -> QuerySet:
     current_timestamp = get_current_utc_timestamp()
     return Subtask.objects.filter(
@@ -30,7 +33,7 @@ def get_active_subtasks() -> QuerySet:
 
 def get_passive_with_downloads_subtasks() -> QuerySet:
     current_timestamp = get_current_utc_timestamp()
-    return Subtask.objects_with_timing_columns.filter(
+    return Subtask.objects.filter(
         download_deadline__gte=current_timestamp, state=Subtask.SubtaskState.RESULT_UPLOADED.name  # pylint: disable=no-member
     )
 
@@ -39,7 +42,7 @@ def get_longest_lasting_subtask_timestamp() -> Optional[int]:
     """Returns greatest value from 'next_deadline' and 'download_deadline' columns for Subtasks that are not timed out."""
 
     current_timestamp = get_current_utc_timestamp()
-    filtered_subtasks = Subtask.objects_with_timing_columns.annotate(
+    filtered_subtasks = Subtask.objects.annotate(
         next_deadline_timestamp=ExpressionWrapper(
             Func(Value('epoch'), F('next_deadline'), function='DATE_PART'),
             output_field=IntegerField()
@@ -77,7 +80,7 @@ def get_shutdown_mode_state() -> bool:
 
 @register.assignment_tag
 def get_active_subtasks_count() -> int:
-    return get_active_subtasks().count()
+    return read_from_replica(get_active_subtasks()).count()
 
 
 @register.assignment_tag
@@ -87,7 +90,7 @@ def are_active_subtasks_present() -> bool:
 
 @register.assignment_tag
 def get_subtasks_with_downloads_count() -> int:
-    return get_passive_with_downloads_subtasks().count()
+    return read_from_replica(get_passive_with_downloads_subtasks()).count()
 
 
 def are_downloads_subtasks_present() -> bool:
@@ -0,0 +1,350 @@
+"""
+Benchmarks of the requests on the hot path of the `send`, `receive` and gatekeeper `download` endpoints.
+Each request is sent through the test client, so it passes all the middleware and decorators of the view, and the number
+of SQL queries it makes is compared with the baseline stored in benchmark_baseline.json. The number of queries does not
+depend on the machine so the baseline is committed and the benchmarks run with the rest of the test suite.
+
+Time per request is compared only if CONCENT_BENCHMARK_TIME_BASELINE environment variable contains a path to a file
+with times recorded on the same machine. That file is local and is not committed to the repository.
+
+Benchmarks missing from a baseline fail. To record the baselines, or to replace them after an intended change,
+run the benchmarks with CONCENT_UPDATE_BENCHMARK_BASELINE=1:
+
+    CONCENT_UPDATE_BENCHMARK_BASELINE=1 CONCENT_BENCHMARK_TIME_BASELINE=/tmp/benchmark_times.json pytest core/tests/test_benchmarks.py
+"""
+from base64 import b64encode
+from logging import getLogger
+from statistics import median
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+import json
+import os
+import time
+
+import mock
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from golem_messages import message
+from golem_messages.factories.concents import FileTransferTokenFactory
+from golem_messages.message.concents import FileTransferToken
+from golem_messages.shortcuts import dump
+
+from common.helpers import get_current_utc_timestamp
+from common.logging import LoggingLevel
+from common.logging import log
+from common.query_budgets import count_queries
+from common.testing_helpers import generate_ecc_key_pair
+from core.tests.utils import ConcentIntegrationTestCase
+from core.tests.utils import add_time_offset_to_date
+from core.tests.utils import get_timestamp_string
+
+logger = getLogger(__name__)
+
+(CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
+
+# File in which the number of queries per request of each benchmark is stored.
+QUERY_COUNT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Environment variable with a path to the local file in which the time per request of each benchmark is stored.
+TIME_BASELINE_ENVIRONMENT_VARIABLE = 'CONCENT_BENCHMARK_TIME_BASELINE'
+
+# Environment variable which makes the benchmarks store their results as the new baselines instead of comparing them.
+UPDATE_BASELINE_ENVIRONMENT_VARIABLE = 'CONCENT_UPDATE_BENCHMARK_BASELINE'
+
+# Number of requests sent by each benchmark if time is compared. The median time of a request is compared with the baseline.
+# The number of queries is the same for each request so it's enough to send one if only queries are compared.
+BENCHMARK_ITERATIONS = 20
+
+# Maximum relative increase of the median time of a request over the baseline before the benchmark fails.
+TIME_REGRESSION_THRESHOLD = 0.5
+
+BenchmarkResult = NamedTuple(
+    'BenchmarkResult',
+    [
+        ('time', float),
+        ('number_of_queries', int),
+    ]
+)
+
+
+def load_baseline(baseline_path: Optional[str]) -> Dict[str, Any]:
+    if baseline_path is None or not os.path.exists(baseline_path):
+        return {}
+    with open(baseline_path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def store_baseline(baseline_path: str, baseline: Dict[str, Any]) -> None:
+    with open(baseline_path, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=4, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def measure(
+    prepare: Callable[[], Any],
+    send_request: Callable[[], HttpResponse],
+    expected_status_code: int,
+    number_of_requests: int,
+) -> BenchmarkResult:
+    """
+    Sends the request `number_of_requests` times. Each request is sent in a transaction which is rolled back afterwards
+    so that every request sees the same database state. `prepare` is called in the same transaction before each request
+    and is not measured.
+    """
+    times = []  # type: List[float]
+    numbers_of_queries = []  # type: List[int]
+    for _ in range(number_of_requests):
+        with transaction.atomic(using='control'), transaction.atomic(using='storage'):
+            prepare()
+            with count_queries() as query_counter:
+                start_time = time.perf_counter()
+                response = send_request()
+                times.append(time.perf_counter() - start_time)
+            numbers_of_queries.append(query_counter.number_of_queries)
+            transaction.set_rollback(True, using='storage')
+            transaction.set_rollback(True, using='control')
+
+        assert response.status_code == expected_status_code, f'Benchmarked request returned {response!r}: {response.content!r}.'
+    return BenchmarkResult(median(times), max(numbers_of_queries))
+
+
+@override_settings(
+    CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
+    CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
+    CONCENT_MESSAGING_TIME=10,  # seconds
+    FORCE_ACCEPTANCE_TIME=10,  # seconds
+    PAYMENT_DUE_TIME=10,  # seconds
+    CONCENT_ETHEREUM_PUBLIC_KEY='b51e9af1ae9303315ca0d6f08d15d8fbcaecf6958f037cc68f9ec18a77c6f63eae46daaba5c637e06a3e4a52a2452725aafba3d4fda4e15baf48798170eb7412',
+    STORAGE_CLUSTER_ADDRESS='http://devel.concent.golem.network/',
+)
+class EndpointsBenchmark(ConcentIntegrationTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.is_baseline_updated = bool(os.environ.get(UPDATE_BASELINE_ENVIRONMENT_VARIABLE))
+        cls.time_baseline_path = os.environ.get(TIME_BASELINE_ENVIRONMENT_VARIABLE) or None
+        cls.query_count_baseline = load_baseline(QUERY_COUNT_BASELINE_PATH)
+        cls.time_baseline = load_baseline(cls.time_baseline_path)
+        cls.is_baseline_modified = False
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.is_baseline_modified:
+            store_baseline(QUERY_COUNT_BASELINE_PATH, cls.query_count_baseline)
+            if cls.time_baseline_path is not None:
+                store_baseline(cls.time_baseline_path, cls.time_baseline)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.patcher = mock.patch('core.message_handlers.calculate_subtask_verification_time', return_value=10)
+        self.addCleanup(self.patcher.stop)
+        self.patcher.start()
+        self.current_time = get_timestamp_string()
+
+    def _measure_and_compare_with_baseline(
+        self,
+        benchmark_name: str,
+        prepare: Callable[[], Any],
+        send_request: Callable[[], HttpResponse],
+        expected_status_code: int,
+    ) -> None:
+        result = measure(
+            prepare,
+            send_request,
+            expected_status_code,
+            BENCHMARK_ITERATIONS if self.time_baseline_path is not None else 1,
+        )
+        log(
+            logger,
+            f'{benchmark_name}: {result.time * 1000:.3f} ms, {result.number_of_queries} queries per request',
+            logging_level=LoggingLevel.INFO,
+        )
+        if self.is_baseline_updated:
+            self.query_count_baseline[benchmark_name] = result.number_of_queries
+            self.time_baseline[benchmark_name] = result.time
+            type(self).is_baseline_modified = True
+            return
+
+        self.assertIn(
+            benchmark_name,
+            self.query_count_baseline,
+            f'{benchmark_name} is missing from {QUERY_COUNT_BASELINE_PATH}. '
+            f'Record the baseline by running the benchmarks with {UPDATE_BASELINE_ENVIRONMENT_VARIABLE}=1.',
+        )
+        self.assertLessEqual(
+            result.number_of_queries,
+            self.query_count_baseline[benchmark_name],
+            f'{benchmark_name} makes more SQL queries per request than in the baseline.',
+        )
+
+        if self.time_baseline_path is None:
+            return
+        self.assertIn(
+            benchmark_name,
+            self.time_baseline,
+            f'{benchmark_name} is missing from {self.time_baseline_path}. '
+            f'Record the baseline by running the benchmarks with {UPDATE_BASELINE_ENVIRONMENT_VARIABLE}=1.',
+        )
+        self.assertLessEqual(
+            result.time,
+            self.time_baseline[benchmark_name] * (1 + TIME_REGRESSION_THRESHOLD),
+            f'{benchmark_name} is more than {TIME_REGRESSION_THRESHOLD:.0%} slower than in the baseline.',
+        )
+
+    def _get_force_report_computed_task(self) -> message.concents.ForceReportComputedTask:
+        return self._get_deserialized_force_report_computed_task(
+            timestamp=add_time_offset_to_date(self.current_time, -5),
+            report_computed_task=self._get_deserialized_report_computed_task(
+                timestamp=add_time_offset_to_date(self.current_time, -5),
+                task_to_compute=self._get_deserialized_task_to_compute(
+                    timestamp=add_time_offset_to_date(self.current_time, -10),
+                    deadline=add_time_offset_to_date(self.current_time, 60),
+                ),
+            ),
+        )
+
+    def _get_subtask_results_accepted(self, payment_ts: str) -> message.tasks.SubtaskResultsAccepted:
+        return self._get_deserialized_subtask_results_accepted(
+            timestamp=add_time_offset_to_date(payment_ts, -10),
+            payment_ts=payment_ts,
+            report_computed_task=self._get_deserialized_report_computed_task(
+                timestamp=add_time_offset_to_date(payment_ts, -20),
+                task_to_compute=self._get_deserialized_task_to_compute(
+                    timestamp=add_time_offset_to_date(payment_ts, -30),
+                    deadline=add_time_offset_to_date(payment_ts, -20),
+                ),
+            ),
+        )
+
+    def test_send_force_report_computed_task(self):
+        force_report_computed_task = self._get_force_report_computed_task()
+        serialized_force_report_computed_task = self._get_serialized_force_report_computed_task(
+            force_report_computed_task=force_report_computed_task,
+            timestamp=force_report_computed_task.timestamp,
+        )
+
+        self._measure_and_compare_with_baseline(
+            'send_force_report_computed_task',
+            lambda: None,
+            lambda: self.send_request(url='core:send', data=serialized_force_report_computed_task),
+            202,
+        )
+
+    def test_send_ack_report_computed_task(self):
+        force_report_computed_task = self._get_force_report_computed_task()
+        serialized_force_report_computed_task = self._get_serialized_force_report_computed_task(
+            force_report_computed_task=force_report_computed_task,
+            timestamp=force_report_computed_task.timestamp,
+        )
+        serialized_ack_report_computed_task = self._get_serialized_ack_report_computed_task(
+            timestamp=add_time_offset_to_date(self.current_time, -1),
+            ack_report_computed_task=self._get_deserialized_ack_report_computed_task(
+                timestamp=add_time_offset_to_date(self.current_time, -1),
+                report_computed_task=force_report_computed_task.report_computed_task,
+                signer_private_key=self.REQUESTOR_PRIVATE_KEY,
+            ),
+        )
+
+        self._measure_and_compare_with_baseline(
+            'send_ack_report_computed_task',
+            lambda: self.send_request(url='core:send', data=serialized_force_report_computed_task),
+            lambda: self.send_request(url='core:send', data=serialized_ack_report_computed_task),
+            202,
+        )
+
+    def test_send_force_subtask_results(self):
+        # With subtask verification time and FORCE_ACCEPTANCE_TIME equal to 10 seconds the request is accepted
+        # between 10 and 20 seconds after the deadline of the task.
+        serialized_force_subtask_results = self._get_serialized_force_subtask_results(
+            timestamp=self.current_time,
+            ack_report_computed_task=self._get_deserialized_ack_report_computed_task(
+                timestamp=add_time_offset_to_date(self.current_time, -14),
+                report_computed_task=self._get_deserialized_report_computed_task(
+                    timestamp=add_time_offset_to_date(self.current_time, -15),
+                    task_to_compute=self._get_deserialized_task_to_compute(
+                        timestamp=add_time_offset_to_date(self.current_time, -25),
+                        deadline=add_time_offset_to_date(self.current_time, -15),
+                    ),
+                ),
+                signer_private_key=self.REQUESTOR_PRIVATE_KEY,
+            ),
+        )
+
+        self._measure_and_compare_with_baseline(
+            'send_force_subtask_results',
+            lambda: None,
+            lambda: self.send_request(url='core:send', data=serialized_force_subtask_results),
+            202,
+        )
+
+    def test_send_force_payment(self):
+        payment_ts = add_time_offset_to_date(self.current_time, -3600)
+        serialized_force_payment = self._get_serialized_force_payment(
+            timestamp=self.current_time,
+            subtask_results_accepted_list=[
+                self._get_subtask_results_accepted(payment_ts),
+                self._get_subtask_results_accepted(payment_ts),
+            ],
+        )
+
+        self._measure_and_compare_with_baseline(
+            'send_force_payment',
+            lambda: None,
+            lambda: self.send_request(url='core:send', data=serialized_force_payment),
+            200,
+        )
+
+    def test_receive(self):
+        force_report_computed_task = self._get_force_report_computed_task()
+        serialized_force_report_computed_task = self._get_serialized_force_report_computed_task(
+            force_report_computed_task=force_report_computed_task,
+            timestamp=force_report_computed_task.timestamp,
+        )
+        serialized_client_authorization = self._create_client_auth_message(
+            self.REQUESTOR_PRIVATE_KEY,
+            self.REQUESTOR_PUBLIC_KEY,
+        )
+
+        self._measure_and_compare_with_baseline(
+            'receive',
+            lambda: self.send_request(url='core:send', data=serialized_force_report_computed_task),
+            lambda: self.send_request(url='core:receive', data=serialized_client_authorization),
+            200,
+        )
+
+    def test_gatekeeper_download(self):
+        download_token = FileTransferTokenFactory(
+            token_expiration_deadline=get_current_utc_timestamp() + 3600,
+            storage_cluster_address=settings.STORAGE_CLUSTER_ADDRESS,
+            authorized_client_public_key=self.PROVIDER_PUBLIC_KEY,
+            operation=FileTransferToken.Operation.download,
+        )
+        download_token.files[0]['path'] = 'blender/benchmark/test_task/scene-Helicopter-27-cycles.blend'
+        download_token.files[0]['checksum'] = 'sha1:95a0f391c7ad86686ab1366bcd519ba5ab3cce89'
+        authorization_header = 'Golem ' + b64encode(
+            dump(download_token, settings.CONCENT_PRIVATE_KEY, settings.CONCENT_PUBLIC_KEY)
+        ).decode()
+        concent_auth_header = self._create_client_auth_message_as_header(
+            self.PROVIDER_PRIVATE_KEY,
+            self.PROVIDER_PUBLIC_KEY,
+        )
+
+        self._measure_and_compare_with_baseline(
+            'gatekeeper_download',
+            lambda: None,
+            lambda: self.client.get(
+                reverse('gatekeeper:download') + download_token.files[0]['path'],
+                HTTP_AUTHORIZATION=authorization_header,
+                HTTP_CONCENT_AUTH=concent_auth_header,
+            ),
+            200,
+        )
@@ -18,6 +18,7 @@ from common.constants import ErrorCode
 from common.constants import ERROR_IN_GOLEM_MESSAGE
 from common.helpers import get_current_utc_timestamp
 from common.helpers import parse_timestamp_to_utc_datetime
+from common.helpers import unpack_serialized_messages_from_batch
 from common.testing_helpers import generate_ecc_key_pair
 from core.message_handlers import store_subtask
 from core.models import Client
@@ -25,7 +26,9 @@ from core.models import StoredMessage
 from core.models import PendingResponse
 from core.models import Subtask
 from core.tests.utils import ConcentIntegrationTestCase
+from core.transfer_operations import store_pending_message
 from core.utils import hex_to_bytes_convert
+from core.views import receive_long_poll
 
 (CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
 
@@ -803,6 +806,181 @@ class CoreViewReceiveTest(ConcentIntegrationTestCase):
         self.assertEqual(decoded_message.ack_report_computed_task.report_computed_task.task_to_compute.sig,
                          self.task_to_compute.sig)
 
+    def test_receive_batch_should_return_all_pending_messages_in_order_they_were_added_to_queue_and_mark_them_as_delivered(self):
+        message_timestamp = parse_timestamp_to_utc_datetime(get_current_utc_timestamp())
+        stored_messages = {}
+        for name, golem_message in [
+            ('report_computed_task', self.report_computed_task),
+            ('want_to_compute_task', self.want_to_compute_task),
+            ('task_to_compute', self.task_to_compute),
+            ('ack_report_computed_task', message.tasks.AckReportComputedTask(report_computed_task=self.report_computed_task)),
+        ]:
+            stored_message = StoredMessage(
+                type=golem_message.header.type_,
+                timestamp=message_timestamp,
+                data=golem_message.serialize(),
+                task_id=self.compute_task_def['task_id'],  # pylint: disable=no-member
+                subtask_id=self.compute_task_def['subtask_id'],  # pylint: disable=no-member
+                protocol_version=settings.GOLEM_MESSAGES_VERSION,
+            )
+            stored_message.full_clean()
+            stored_message.save()
+            stored_messages[name] = stored_message
+
+        client_provider = Client(
+            public_key_bytes=self.PROVIDER_PUBLIC_KEY
+        )
+        client_provider.full_clean()
+        client_provider.save()
+
+        client_requestor = Client(
+            public_key_bytes=self.REQUESTOR_PUBLIC_KEY
+        )
+        client_requestor.full_clean()
+        client_requestor.save()
+
+        subtask = Subtask(
+            task_id                  = self.compute_task_def['task_id'],
+            subtask_id               = self.compute_task_def['subtask_id'],
+            report_computed_task     = stored_messages['report_computed_task'],
+            task_to_compute          = stored_messages['task_to_compute'],
+            want_to_compute_task     = stored_messages['want_to_compute_task'],
+            ack_report_computed_task = stored_messages['ack_report_computed_task'],
+            state                    = Subtask.SubtaskState.REPORTED.name,  # pylint: disable=no-member
+            provider                 = client_provider,
+            requestor                = client_requestor,
+            result_package_size=self.size,
+            computation_deadline=parse_timestamp_to_utc_datetime(self.compute_task_def['deadline'])
+        )
+        subtask.full_clean()
+        subtask.save()
+
+        for response_type, queue in [
+            (PendingResponse.ResponseType.ForceReportComputedTask, PendingResponse.Queue.Receive),  # pylint: disable=no-member
+            (PendingResponse.ResponseType.VerdictReportComputedTask, PendingResponse.Queue.ReceiveOutOfBand),  # pylint: disable=no-member
+        ]:
+            pending_response = PendingResponse(
+                response_type=response_type.name,
+                client=client_requestor,
+                queue=queue.name,
+                subtask=subtask,
+            )
+            pending_response.full_clean()
+            pending_response.save()
+
+        with freeze_time("2017-11-17 12:00:00"):
+            response = self.send_request(
+                url='core:receive_batch',
+                data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+            )
+
+        self.assertEqual(response.status_code, 200)
+        decoded_messages = [
+            load(
+                serialized_message,
+                self.REQUESTOR_PRIVATE_KEY,
+                CONCENT_PUBLIC_KEY,
+                check_time=False,
+            )
+            for serialized_message in unpack_serialized_messages_from_batch(response.content)
+        ]
+
+        self.assertEqual(len(decoded_messages), 2)
+        self.assertIsInstance(decoded_messages[0], message.concents.ForceReportComputedTask)
+        self.assertIsInstance(decoded_messages[1], message.concents.VerdictReportComputedTask)
+        self.assertEqual(decoded_messages[0].report_computed_task.task_to_compute.sig, self.task_to_compute.sig)
+        self.assertFalse(PendingResponse.objects.filter(delivered=False).exists())
+
+    def _store_force_report_computed_task_with_precomputed_payload(self):
+        with freeze_time("2017-11-17 10:00:00"):
+            subtask = store_subtask(
+                task_id=self.compute_task_def['task_id'],
+                subtask_id=self.compute_task_def['subtask_id'],
+                provider_public_key=self.PROVIDER_PUBLIC_KEY,
+                requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=self.compute_task_def['deadline'] + settings.CONCENT_MESSAGING_TIME,
+                task_to_compute=self.task_to_compute,
+                report_computed_task=self.report_computed_task,
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.REQUESTOR_PUBLIC_KEY,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+        self.assertIsNotNone(PendingResponse.objects.get(subtask=subtask).payload)
+
+    @override_settings(PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE=60)
+    def test_receive_should_return_precomputed_payload_signed_and_encrypted_for_the_client(self):
+        self._store_force_report_computed_task_with_precomputed_payload()
+
+        with freeze_time("2017-11-17 10:00:30"):
+            response = self.send_request(
+                url='core:receive',
+                data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+            )
+
+        self.assertEqual(response.status_code, 200)
+        decoded_message = load(
+            response.content,
+            self.REQUESTOR_PRIVATE_KEY,
+            CONCENT_PUBLIC_KEY,
+            check_time=False,
+        )
+        self.assertIsInstance(decoded_message, message.concents.ForceReportComputedTask)
+        self.assertEqual(decoded_message.timestamp, self._create_timestamp_from_string("2017-11-17 10:00:00"))
+        self.assertEqual(decoded_message.report_computed_task, self.report_computed_task)
+        self.assertFalse(PendingResponse.objects.filter(delivered=False).exists())
+
+    @override_settings(PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE=60)
+    def test_receive_batch_should_return_precomputed_payload_signed_and_encrypted_for_the_client(self):
+        self._store_force_report_computed_task_with_precomputed_payload()
+
+        with freeze_time("2017-11-17 10:00:30"):
+            response = self.send_request(
+                url='core:receive_batch',
+                data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+            )
+
+        self.assertEqual(response.status_code, 200)
+        decoded_messages = [
+            load(
+                serialized_message,
+                self.REQUESTOR_PRIVATE_KEY,
+                CONCENT_PUBLIC_KEY,
+                check_time=False,
+            )
+            for serialized_message in unpack_serialized_messages_from_batch(response.content)
+        ]
+        self.assertEqual(len(decoded_messages), 1)
+        self.assertIsInstance(decoded_messages[0], message.concents.ForceReportComputedTask)
+        self.assertEqual(decoded_messages[0].report_computed_task, self.report_computed_task)
+
+    def test_receive_long_poll_should_not_be_wrapped_in_transaction_on_any_database(self):
+        self.assertEqual(receive_long_poll._non_atomic_requests, {'control', 'storage'})  # pylint: disable=protected-access
+
+    @freeze_time("2017-11-17 10:00:00")
+    @override_settings(LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME=0)
+    def test_receive_long_poll_return_http_204_if_no_messages_in_database(self):
+        response = self.send_request(
+            url='core:receive_long_poll',
+            data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content.decode(), '')
+
+    @freeze_time("2017-11-17 10:00:00")
+    def test_receive_batch_return_http_204_if_no_messages_in_database(self):
+        response = self.send_request(
+            url='core:receive_batch',
+            data=self._create_client_auth_message(self.REQUESTOR_PRIVATE_KEY, self.REQUESTOR_PUBLIC_KEY),
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content.decode(), '')
+
 
 @override_settings(
     CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
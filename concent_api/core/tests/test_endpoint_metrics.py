@@ -0,0 +1,67 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from common.exceptions import ConcentFeatureIsNotAvailable
+from common.metrics import dropped_log_record_counters
+from common.metrics import request_counters
+from common.metrics import request_duration_histograms
+from common.testing_helpers import generate_ecc_key_pair
+from core.tests.utils import ConcentIntegrationTestCase
+
+
+(CONCENT_PRIVATE_KEY, CONCENT_PUBLIC_KEY) = generate_ecc_key_pair()
+
+
+@override_settings(
+    CONCENT_PRIVATE_KEY=CONCENT_PRIVATE_KEY,
+    CONCENT_PUBLIC_KEY=CONCENT_PUBLIC_KEY,
+)
+class MetricsEndpointTest(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        request_counters.clear()
+        request_duration_histograms.clear()
+        dropped_log_record_counters.clear()
+
+    def tearDown(self):
+        request_counters.clear()
+        request_duration_histograms.clear()
+        dropped_log_record_counters.clear()
+        super().tearDown()
+
+    def test_that_metrics_endpoint_returns_request_and_queue_metrics_in_prometheus_text_format(self):
+        response = self._send_force_report_computed_task()
+        self.assertEqual(response.status_code, 202)
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        content = response.content.decode()
+        self.assertIn('# TYPE concent_requests_total counter', content)
+        self.assertIn('concent_requests_total{view="send",message_type="ForceReportComputedTask",status_code="202"} 1', content)
+        self.assertIn('concent_request_duration_seconds_bucket{view="send",message_type="ForceReportComputedTask",le="+Inf"} 1', content)
+        self.assertIn('concent_request_duration_seconds_count{view="send",message_type="ForceReportComputedTask"} 1', content)
+        self.assertIn('concent_undelivered_pending_responses{queue="Receive"} 1', content)
+        self.assertIn('concent_active_subtasks{state="FORCING_REPORT"} 1', content)
+        self.assertIn('# TYPE concent_deposit_claims gauge', content)
+
+    def test_that_metrics_endpoint_returns_number_of_dropped_log_records(self):
+        dropped_log_record_counters.increment(('console',), 3)
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('concent_dropped_log_records_total{handler="console"} 3', response.content.decode())
+
+    def test_that_metrics_endpoint_accepts_only_get_requests(self):
+        response = self.client.post(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 405)
+
+    @override_settings(
+        CONCENT_FEATURES=[],
+    )
+    def test_that_metrics_endpoint_is_not_available_without_metrics_feature(self):
+        self.assertRaises(ConcentFeatureIsNotAvailable, self.client.get, reverse('metrics'))
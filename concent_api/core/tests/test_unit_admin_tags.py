@@ -1,5 +1,6 @@
 import datetime
 import hashlib
+import mock
 from freezegun import freeze_time
 from golem_messages.message.concents import ForceGetTaskResult
 from golem_messages.factories.tasks import ReportComputedTaskFactory
@@ -8,6 +9,9 @@ from common.helpers import parse_timestamp_to_utc_datetime
 from core.message_handlers import store_subtask
 from core.models import Subtask
 from core.templatetags.admin_tags import get_longest_lasting_subtask_timestamp, get_time_until_concent_can_be_shut_down
+from core.templatetags.admin_tags import are_active_subtasks_present
+from core.templatetags.admin_tags import are_only_with_downloads_subtasks_present
+from core.templatetags.admin_tags import get_active_subtasks_count
 from core.tests.utils import ConcentIntegrationTestCase
 from core.utils import hex_to_bytes_convert
 
@@ -139,3 +143,15 @@ class TestAdminTagsQuerySet(ConcentIntegrationTestCase):
             )
 
             self.assertEqual(get_time_until_concent_can_be_shut_down(), datetime.timedelta(0))
+
+    def test_that_only_subtask_counts_are_read_from_replica(self):
+        with mock.patch('core.templatetags.admin_tags.read_from_replica', side_effect=lambda query_set: query_set) as read_from_replica_mock:
+            are_active_subtasks_present()
+            are_only_with_downloads_subtasks_present()
+            get_time_until_concent_can_be_shut_down()
+
+            read_from_replica_mock.assert_not_called()
+
+            get_active_subtasks_count()
+
+            read_from_replica_mock.assert_called_once()
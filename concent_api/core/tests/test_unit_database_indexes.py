@@ -0,0 +1,92 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models import QuerySet
+from django.db.models import Sum
+from django.test import TestCase
+
+from common.helpers import get_current_utc_timestamp
+from common.helpers import parse_timestamp_to_utc_datetime
+from core.models import DepositClaim
+from core.models import PendingResponse
+from core.models import Subtask
+
+
+class TestIndexesForHotQueries(TestCase):
+    """
+    Checks that queries executed for every request use the indexes created for them instead of sequential scans.
+    Test tables are nearly empty so sequential scans are disabled to make planner choose between indexes only.
+    """
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        self.active_state_names = [state.name for state in Subtask.ACTIVE_STATES]
+        self.current_datetime = parse_timestamp_to_utc_datetime(get_current_utc_timestamp())
+
+    def _get_query_plan(self, query_set: QuerySet) -> str:  # pylint: disable=no-self-use
+        (sql, params) = query_set.query.sql_with_params()
+        with connections['control'].cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def test_that_undelivered_pending_responses_of_client_are_fetched_using_index(self):
+        query_plan = self._get_query_plan(
+            PendingResponse.objects.filter(
+                client_id=1,
+                delivered=False,
+            ).order_by('created_at')[:1]
+        )
+
+        self.assertIn('core_pendingresponse_undelivered_client_id_created_at_idx', query_plan)
+        self.assertNotIn('Sort', query_plan)
+
+    def test_that_timed_out_subtasks_are_fetched_using_index(self):
+        query_plan = self._get_query_plan(
+            Subtask.objects.filter(
+                state__in=self.active_state_names,
+                next_deadline__lte=self.current_datetime,
+            ).order_by('next_deadline')[:10]
+        )
+
+        self.assertIn('core_subtask_active_next_deadline_idx', query_plan)
+        self.assertNotIn('Sort', query_plan)
+
+    def test_that_active_subtasks_of_client_are_fetched_using_indexes(self):
+        query_plan = self._get_query_plan(
+            Subtask.objects.filter(
+                Q(requestor_id=1) | Q(provider_id=1),
+                Q(next_deadline__lte=self.current_datetime) | Q(
+                    state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER.name,  # pylint: disable=no-member
+                    result_upload_finished=True,
+                ),
+                state__in=self.active_state_names,
+            ).values_list('subtask_id', flat=True)
+        )
+
+        self.assertIn('core_subtask_active_requestor_id_next_deadline_idx', query_plan)
+        self.assertIn('core_subtask_active_provider_id_next_deadline_idx', query_plan)
+
+    def test_that_subtasks_with_pending_downloads_are_fetched_using_index(self):
+        query_plan = self._get_query_plan(
+            Subtask.objects.filter(
+                state=Subtask.SubtaskState.RESULT_UPLOADED.name,  # pylint: disable=no-member
+                download_deadline__gte=get_current_utc_timestamp(),
+            )
+        )
+
+        self.assertIn('core_subtask_result_uploaded_download_deadline_idx', query_plan)
+
+    def test_that_sum_of_claims_against_deposit_is_computed_using_index(self):
+        query_plan = self._get_query_plan(
+            DepositClaim.objects.filter(
+                payer_deposit_account_id=1,
+            ).values(
+                'payer_deposit_account_id',
+            ).annotate(
+                sum_of_existing_claims=Sum('amount'),
+            )
+        )
+
+        self.assertIn('core_depositclaim_payer_deposit_account_id_amount_idx', query_plan)
@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+import mock
+
 from django.conf import settings
 from django.test import override_settings
 from django.test.utils import freeze_time
@@ -8,11 +10,17 @@ from golem_messages import message
 from common.helpers import parse_timestamp_to_utc_datetime
 from core.exceptions import GolemMessageValidationError
 from core.message_handlers import are_items_unique
+from core.message_handlers import PENDING_RESPONSE_BUILDERS
+from core.message_handlers import handle_messages_from_database
+from core.message_handlers import handle_messages_from_database_with_long_polling
 from core.message_handlers import update_and_return_updated_subtask
 from core.message_handlers import store_subtask
+from core.models import PendingResponse
+from core.models import StoredMessage
 from core.models import Subtask
 from core.tests.utils import ConcentIntegrationTestCase
 from core.tests.utils import parse_iso_date_to_timestamp
+from core.transfer_operations import store_pending_message
 from core.utils import hex_to_bytes_convert
 from core.validation import validate_reject_report_computed_task
 
@@ -27,6 +35,65 @@ class TestMessageHandlers(TestCase):
         self.assertFalse(response)
 
 
+class TestHandleMessagesFromDatabaseWithLongPolling(TestCase):
+
+    def setUp(self):
+        self.client_public_key = b'\x01' * 64
+        self.response_to_client = message.concents.ServiceRefused(
+            reason=message.concents.ServiceRefused.REASON.InvalidRequest,
+        )
+
+    def test_that_pending_message_is_returned_without_waiting(self):
+        with mock.patch('core.message_handlers.handle_messages_from_database', return_value=self.response_to_client) as handle_messages_mock, \
+                mock.patch('core.message_handlers.PendingResponseListener') as listener_mock:
+            response = handle_messages_from_database_with_long_polling(self.client_public_key, 10)
+
+        self.assertEqual(response, self.response_to_client)
+        handle_messages_mock.assert_called_once_with(self.client_public_key)
+        listener_mock.return_value.__enter__.return_value.wait.assert_not_called()
+
+    def test_that_queue_is_checked_again_after_notification(self):
+        with mock.patch('core.message_handlers.handle_messages_from_database', side_effect=[None, self.response_to_client]) as handle_messages_mock, \
+                mock.patch('core.message_handlers.PendingResponseListener') as listener_mock:
+            listener_mock.return_value.__enter__.return_value.wait.return_value = True
+            response = handle_messages_from_database_with_long_polling(self.client_public_key, 10)
+
+        self.assertEqual(response, self.response_to_client)
+        self.assertEqual(handle_messages_mock.call_count, 2)
+        listener_mock.assert_called_once_with(self.client_public_key)
+        listener_mock.return_value.__enter__.return_value.wait.assert_called_once()
+
+    def test_that_none_is_returned_if_no_notification_arrives_before_timeout(self):
+        with mock.patch('core.message_handlers.handle_messages_from_database', return_value=None) as handle_messages_mock, \
+                mock.patch('core.message_handlers.PendingResponseListener') as listener_mock:
+            listener_mock.return_value.__enter__.return_value.wait.return_value = False
+            response = handle_messages_from_database_with_long_polling(self.client_public_key, 10)
+
+        self.assertIsNone(response)
+        handle_messages_mock.assert_called_once_with(self.client_public_key)
+
+    def test_that_listener_is_not_used_if_maximum_wait_time_is_zero(self):
+        with mock.patch('core.message_handlers.handle_messages_from_database', return_value=None) as handle_messages_mock, \
+                mock.patch('core.message_handlers.PendingResponseListener') as listener_mock:
+            response = handle_messages_from_database_with_long_polling(self.client_public_key, 0)
+
+        self.assertIsNone(response)
+        handle_messages_mock.assert_called_once_with(self.client_public_key)
+        listener_mock.assert_not_called()
+
+    @override_settings(LONG_POLLING_SHARED_LISTENER=True)
+    def test_that_shared_listener_is_used_if_enabled(self):
+        with mock.patch('core.message_handlers.handle_messages_from_database', side_effect=[None, self.response_to_client]), \
+                mock.patch('core.message_handlers.PendingResponseListener') as listener_mock, \
+                mock.patch('core.message_handlers.SharedPendingResponseSubscription') as subscription_mock:
+            subscription_mock.return_value.__enter__.return_value.wait.return_value = True
+            response = handle_messages_from_database_with_long_polling(self.client_public_key, 10)
+
+        self.assertEqual(response, self.response_to_client)
+        subscription_mock.assert_called_once_with(self.client_public_key)
+        listener_mock.assert_not_called()
+
+
 @override_settings(
     CONCENT_MESSAGING_TIME=10,  # seconds
 )
@@ -131,6 +198,187 @@ class TestSubtaskStoreAndUpdate(ConcentIntegrationTestCase):
         self.assertEqual(subtask_state, Subtask.SubtaskState.REPORTED.name)  # pylint: disable=no-member
         self.assertEqual(subtask.next_deadline, None)
 
+    def test_that_store_subtask_stores_all_messages_with_single_query(self):
+        with mock.patch('core.models.StoredMessage.objects.bulk_create', wraps=StoredMessage.objects.bulk_create) as bulk_create_mock:
+            subtask = store_subtask(
+                task_id=self.task_to_compute.compute_task_def['task_id'],
+                subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+                provider_public_key=self.provider_public_key,
+                requestor_public_key=self.requestor_public_key,
+                state=Subtask.SubtaskState.FORCING_RESULT_TRANSFER,
+                next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+                task_to_compute=self.task_to_compute,
+                report_computed_task=self.report_computed_task,
+                force_get_task_result=self.force_get_task_result,
+            )
+
+        bulk_create_mock.assert_called_once()
+        self.assertEqual(StoredMessage.objects.count(), 4)
+        subtask = Subtask.objects.get(pk=subtask.pk)
+        self.assertEqual(subtask.task_to_compute.get_deserialized_message(), self.task_to_compute)
+        self.assertEqual(subtask.want_to_compute_task.get_deserialized_message(), self.task_to_compute.want_to_compute_task)
+        self.assertEqual(subtask.report_computed_task.get_deserialized_message(), self.report_computed_task)
+        self.assertEqual(subtask.force_get_task_result.get_deserialized_message(), self.force_get_task_result)
+
+    def test_that_pending_response_is_built_with_single_query_for_subtask_and_related_messages(self):
+        subtask = store_subtask(
+            task_id=self.task_to_compute.compute_task_def['task_id'],
+            subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.provider_public_key,
+            requestor_public_key=self.requestor_public_key,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+        pending_response = PendingResponse(
+            response_type=PendingResponse.ResponseType.ForceReportComputedTask.name,  # pylint: disable=no-member
+            client=subtask.requestor,
+            queue=PendingResponse.Queue.Receive.name,  # pylint: disable=no-member
+            subtask=subtask,
+        )
+        pending_response.full_clean()
+        pending_response.save()
+
+        # SAVEPOINT, UPDATE ... RETURNING, SELECT subtask with related messages, RELEASE SAVEPOINT
+        with self.assertNumQueries(4, using='control'):
+            response_to_client = handle_messages_from_database(self.requestor_public_key)
+
+        self.assertIsInstance(response_to_client, message.concents.ForceReportComputedTask)
+        self.assertEqual(response_to_client.report_computed_task, self.report_computed_task)
+        self.assertTrue(PendingResponse.objects.get(pk=pending_response.pk).delivered)
+
+    def test_that_every_pending_response_type_has_registered_builder(self):
+        self.assertEqual(set(PENDING_RESPONSE_BUILDERS), set(PendingResponse.ResponseType))
+
+    @override_settings(PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE=60)
+    def test_that_precomputed_payload_is_delivered_without_querying_for_subtask(self):
+        with freeze_time("2017-12-01 11:00:00"):
+            subtask = store_subtask(
+                task_id=self.task_to_compute.compute_task_def['task_id'],
+                subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+                provider_public_key=self.provider_public_key,
+                requestor_public_key=self.requestor_public_key,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+                task_to_compute=self.task_to_compute,
+                report_computed_task=self.report_computed_task,
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.requestor_public_key,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+        pending_response = PendingResponse.objects.get(subtask=subtask)
+        self.assertIsNotNone(pending_response.payload)
+
+        with freeze_time("2017-12-01 11:00:30"):
+            # SAVEPOINT, UPDATE ... RETURNING, RELEASE SAVEPOINT
+            with self.assertNumQueries(3, using='control'):
+                response_to_client = handle_messages_from_database(self.requestor_public_key)
+
+        self.assertIsInstance(response_to_client, message.concents.ForceReportComputedTask)
+        self.assertEqual(response_to_client.report_computed_task, self.report_computed_task)
+        pending_response.refresh_from_db()
+        self.assertTrue(pending_response.delivered)
+        self.assertIsNone(pending_response.payload)
+
+    @override_settings(PENDING_RESPONSE_PAYLOAD_MAXIMUM_AGE=60)
+    def test_that_message_is_built_again_if_precomputed_payload_is_too_old(self):
+        with freeze_time("2017-12-01 11:00:00"):
+            subtask = store_subtask(
+                task_id=self.task_to_compute.compute_task_def['task_id'],
+                subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+                provider_public_key=self.provider_public_key,
+                requestor_public_key=self.requestor_public_key,
+                state=Subtask.SubtaskState.FORCING_REPORT,
+                next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+                task_to_compute=self.task_to_compute,
+                report_computed_task=self.report_computed_task,
+            )
+            store_pending_message(
+                response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+                client_public_key=self.requestor_public_key,
+                queue=PendingResponse.Queue.Receive,
+                subtask=subtask,
+            )
+
+        with freeze_time("2017-12-01 11:01:01"):
+            response_to_client = handle_messages_from_database(self.requestor_public_key)
+
+        self.assertIsInstance(response_to_client, message.concents.ForceReportComputedTask)
+        self.assertEqual(response_to_client.timestamp, parse_iso_date_to_timestamp("2017-12-01 11:01:01"))
+        self.assertEqual(response_to_client.report_computed_task, self.report_computed_task)
+
+    def test_that_payload_is_not_precomputed_by_default(self):
+        subtask = store_subtask(
+            task_id=self.task_to_compute.compute_task_def['task_id'],
+            subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.provider_public_key,
+            requestor_public_key=self.requestor_public_key,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+        store_pending_message(
+            response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+            client_public_key=self.requestor_public_key,
+            queue=PendingResponse.Queue.Receive,
+            subtask=subtask,
+        )
+
+        self.assertIsNone(PendingResponse.objects.get(subtask=subtask).payload)
+
+    def test_that_pending_response_remains_undelivered_if_building_message_fails(self):
+        subtask = store_subtask(
+            task_id=self.task_to_compute.compute_task_def['task_id'],
+            subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.provider_public_key,
+            requestor_public_key=self.requestor_public_key,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+        store_pending_message(
+            response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+            client_public_key=self.requestor_public_key,
+            queue=PendingResponse.Queue.Receive,
+            subtask=subtask,
+        )
+
+        with mock.patch('core.message_handlers.build_response_from_pending_response', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                handle_messages_from_database(self.requestor_public_key)
+
+        self.assertFalse(PendingResponse.objects.get(subtask=subtask).delivered)
+
+    def test_that_pending_response_remains_undelivered_if_protocol_version_is_not_supported(self):
+        subtask = store_subtask(
+            task_id=self.task_to_compute.compute_task_def['task_id'],
+            subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.provider_public_key,
+            requestor_public_key=self.requestor_public_key,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+        store_pending_message(
+            response_type=PendingResponse.ResponseType.ForceReportComputedTask,
+            client_public_key=self.requestor_public_key,
+            queue=PendingResponse.Queue.Receive,
+            subtask=subtask,
+        )
+
+        with mock.patch('core.message_handlers.is_protocol_version_compatible', return_value=False):
+            response_to_client = handle_messages_from_database(self.requestor_public_key)
+
+        self.assertIsInstance(response_to_client, message.concents.ServiceRefused)
+        self.assertFalse(PendingResponse.objects.get(subtask=subtask).delivered)
+
 
 class TestValidateRejectReportComputedTask(ConcentIntegrationTestCase):
 
@@ -2,6 +2,7 @@ import mock
 import pytest
 from django.test import override_settings
 from django.core.exceptions import ValidationError
+from freezegun import freeze_time
 
 from golem_messages import factories
 from golem_messages import message
@@ -9,15 +10,24 @@ from golem_messages.factories import tasks
 from golem_messages.utils import encode_hex
 
 from common.constants import ConcentUseCase
+from common.exceptions import ConcentInSoftShutdownMode
+from common.helpers import deserialize_message
+from common.helpers import get_current_utc_timestamp
+from common.helpers import parse_timestamp_to_utc_datetime
 from core.constants import ETHEREUM_ADDRESS_LENGTH
 from core.constants import ETHEREUM_TRANSACTION_HASH_LENGTH
 from core.constants import MOCK_TRANSACTION
+from core.message_handlers import create_stored_message
 from core.message_handlers import store_message
 from core.message_handlers import store_subtask
 from core.models import Client
+from core.models import clients_cache
 from core.models import DepositAccount
 from core.models import DepositClaim
+from core.models import PendingResponse
+from core.models import StoredMessage
 from core.models import Subtask
+from core.models import deserialized_messages_cache
 from core.tests.utils import ConcentIntegrationTestCase
 from core.utils import hex_to_bytes_convert
 
@@ -348,14 +358,14 @@ class ProtocolVersionValidationTest(ConcentIntegrationTestCase):
         self.first_communication_protocol_version = '1.11.1'
         self.second_communication_protocol_version = '2.13.0'
 
-    def store_message_with_custom_protocol_version(
+    def create_stored_message_with_custom_protocol_version(
         self,
         golem_message: message.base.Message,
         task_id: str,
         subtask_id: str,
     ):
         with override_settings(GOLEM_MESSAGES_VERSION=self.first_communication_protocol_version):
-            return store_message(
+            return create_stored_message(
                 golem_message=golem_message,
                 task_id=task_id,
                 subtask_id=subtask_id
@@ -368,7 +378,7 @@ class ProtocolVersionValidationTest(ConcentIntegrationTestCase):
 
             report_computed_task=tasks.ReportComputedTaskFactory(task_to_compute=task_to_compute)
             with self.assertRaises(ValidationError) as error:
-                with mock.patch('core.message_handlers.store_message', side_effect=self.store_message_with_custom_protocol_version):
+                with mock.patch('core.message_handlers.create_stored_message', side_effect=self.create_stored_message_with_custom_protocol_version):
                     store_subtask(
                         task_id=task_to_compute.task_id,
                         subtask_id=task_to_compute.subtask_id,
@@ -385,3 +395,205 @@ class ProtocolVersionValidationTest(ConcentIntegrationTestCase):
             f"Version in Concent is {self.second_communication_protocol_version}",
             str(error.exception)
         )
+
+
+class SubtaskIncrementalValidationTest(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        task_to_compute = tasks.TaskToComputeFactory()
+        store_subtask(
+            task_id=task_to_compute.task_id,
+            subtask_id=task_to_compute.subtask_id,
+            provider_public_key=hex_to_bytes_convert(task_to_compute.provider_public_key),
+            requestor_public_key=hex_to_bytes_convert(task_to_compute.requestor_public_key),
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=get_current_utc_timestamp() + 10,
+            task_to_compute=task_to_compute,
+            report_computed_task=tasks.ReportComputedTaskFactory(task_to_compute=task_to_compute),
+        )
+        self.subtask = Subtask.objects.get(subtask_id=task_to_compute.subtask_id)
+        self.subtask.state = Subtask.SubtaskState.REPORTED.name  # pylint: disable=no-member
+        self.subtask.next_deadline = None
+
+    @override_settings(STRICT_SUBTASK_VALIDATION=False)
+    def test_that_state_change_does_not_deserialize_related_messages(self):
+        with mock.patch.object(StoredMessage, 'get_deserialized_message') as get_deserialized_message_mock:
+            self.subtask.full_clean()
+
+        get_deserialized_message_mock.assert_not_called()
+
+    @override_settings(STRICT_SUBTASK_VALIDATION=False)
+    def test_that_changed_field_is_validated_against_related_messages(self):
+        self.subtask.result_package_size += 1
+
+        with self.assertRaises(ValidationError) as error:
+            self.subtask.full_clean()
+
+        self.assertIn('result_package_size', error.exception.message_dict)
+
+    @override_settings(STRICT_SUBTASK_VALIDATION=False)
+    def test_that_field_changed_after_previous_validation_is_validated(self):
+        self.subtask.full_clean()
+        self.subtask.result_package_size += 1
+
+        with self.assertRaises(ValidationError):
+            self.subtask.full_clean()
+
+    @override_settings(STRICT_SUBTASK_VALIDATION=False)
+    def test_that_subtask_in_active_state_cannot_be_modified_in_soft_shutdown_mode_even_if_state_does_not_change(self):
+        subtask = Subtask.objects.get(pk=self.subtask.pk)
+        subtask.next_deadline = parse_timestamp_to_utc_datetime(get_current_utc_timestamp() + 20)
+
+        with mock.patch('core.models.is_soft_shutdown_mode_enabled', return_value=True):
+            with self.assertRaises(ConcentInSoftShutdownMode):
+                subtask.full_clean()
+
+    @override_settings(STRICT_SUBTASK_VALIDATION=True)
+    def test_that_all_validations_are_run_in_strict_mode(self):
+        with mock.patch.object(
+            StoredMessage,
+            'get_deserialized_message',
+            autospec=True,
+            side_effect=StoredMessage.get_deserialized_message,
+        ) as get_deserialized_message_mock:
+            self.subtask.full_clean()
+
+        get_deserialized_message_mock.assert_called()
+
+
+class StoredMessageGetDeserializedMessageTest(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        deserialized_messages_cache.clear()
+        self.task_to_compute = tasks.TaskToComputeFactory()
+        self.stored_message = store_message(
+            golem_message=self.task_to_compute,
+            task_id=self.task_to_compute.task_id,
+            subtask_id=self.task_to_compute.subtask_id,
+        )
+
+    def test_that_get_deserialized_message_returns_stored_message(self):
+        stored_message = StoredMessage.objects.get(pk=self.stored_message.pk)
+
+        self.assertEqual(stored_message.get_deserialized_message(), self.task_to_compute)
+
+    def test_that_message_is_deserialized_only_once_and_copy_is_returned_every_time(self):
+        stored_message = StoredMessage.objects.get(pk=self.stored_message.pk)
+
+        with mock.patch('core.models.deserialize_message', wraps=deserialize_message) as deserialize_message_mock:
+            first_deserialized_message = stored_message.get_deserialized_message()
+            second_deserialized_message = StoredMessage.objects.get(pk=self.stored_message.pk).get_deserialized_message()
+
+        deserialize_message_mock.assert_called_once()
+        self.assertEqual(first_deserialized_message, second_deserialized_message)
+        self.assertIsNot(first_deserialized_message, second_deserialized_message)
+        self.assertEqual(deserialized_messages_cache.hits, 1)
+
+    def test_that_message_is_deserialized_again_if_data_changes(self):
+        stored_message = StoredMessage.objects.get(pk=self.stored_message.pk)
+        stored_message.get_deserialized_message()
+
+        other_task_to_compute = tasks.TaskToComputeFactory()
+        stored_message.data = other_task_to_compute.serialize()
+
+        self.assertEqual(stored_message.get_deserialized_message(), other_task_to_compute)
+
+
+class ClientManagerCacheTest(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        clients_cache.clear()
+
+    def test_that_get_or_create_many_full_clean_returns_clients_in_order_of_public_keys(self):
+        existing_client = Client.objects.get_or_create_full_clean(self.REQUESTOR_PUBLIC_KEY)
+
+        (provider, requestor) = Client.objects.get_or_create_many_full_clean(
+            self.PROVIDER_PUBLIC_KEY,
+            self.REQUESTOR_PUBLIC_KEY,
+        )
+
+        self.assertEqual(provider.public_key_bytes, self.PROVIDER_PUBLIC_KEY)
+        self.assertEqual(requestor.pk, existing_client.pk)
+        self.assertEqual(Client.objects.count(), 2)
+
+    def test_that_get_or_create_many_full_clean_fetches_existing_clients_with_single_query(self):
+        Client.objects.get_or_create_full_clean(self.PROVIDER_PUBLIC_KEY)
+        Client.objects.get_or_create_full_clean(self.REQUESTOR_PUBLIC_KEY)
+
+        with self.assertNumQueries(1, using='control'):
+            Client.objects.get_or_create_many_full_clean(self.PROVIDER_PUBLIC_KEY, self.REQUESTOR_PUBLIC_KEY)
+
+    def test_that_client_is_not_cached_until_transaction_is_committed(self):
+        Client.objects.get_or_create_full_clean(self.PROVIDER_PUBLIC_KEY)
+
+        self.assertEqual(len(clients_cache), 0)
+
+    def test_that_cached_client_is_returned_without_querying_database(self):
+        with mock.patch('core.models.transaction.on_commit', side_effect=lambda func, using: func()):
+            client = Client.objects.get_or_create_full_clean(self.PROVIDER_PUBLIC_KEY)
+
+        with self.assertNumQueries(0, using='control'):
+            cached_client = Client.objects.get_or_create_full_clean(self.PROVIDER_PUBLIC_KEY)
+            (cached_client_from_many, ) = Client.objects.get_or_create_many_full_clean(self.PROVIDER_PUBLIC_KEY)
+
+        self.assertEqual(cached_client.pk, client.pk)
+        self.assertEqual(cached_client.public_key_bytes, self.PROVIDER_PUBLIC_KEY)
+        self.assertEqual(cached_client_from_many.pk, client.pk)
+
+
+class PendingResponseManagerDequeueTest(ConcentIntegrationTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client.objects.get_or_create_full_clean(self.PROVIDER_PUBLIC_KEY)
+
+    def _store_pending_response(self, payload=None):
+        pending_response = PendingResponse(
+            response_type=PendingResponse.ResponseType.ForcePaymentCommitted.name,  # pylint: disable=no-member
+            client=self.client,
+            queue=PendingResponse.Queue.Receive.name,  # pylint: disable=no-member
+            payload=payload,
+        )
+        pending_response.full_clean()
+        pending_response.save()
+        return pending_response
+
+    def test_that_dequeue_returns_none_if_there_are_no_undelivered_pending_responses(self):
+        self._store_pending_response()
+        PendingResponse.objects.update(delivered=True)
+
+        self.assertIsNone(PendingResponse.objects.dequeue(self.PROVIDER_PUBLIC_KEY))
+        self.assertIsNone(PendingResponse.objects.dequeue(self.REQUESTOR_PUBLIC_KEY))
+
+    def test_that_dequeue_claims_oldest_undelivered_pending_response_with_single_query(self):
+        with freeze_time("2018-01-01 10:00:00"):
+            oldest_pending_response = self._store_pending_response(payload=b'payload')
+        with freeze_time("2018-01-01 10:00:01"):
+            newer_pending_response = self._store_pending_response()
+
+        with self.assertNumQueries(1, using='control'):
+            dequeued_pending_response = PendingResponse.objects.dequeue(self.PROVIDER_PUBLIC_KEY)
+
+        self.assertEqual(dequeued_pending_response.pk, oldest_pending_response.pk)
+        self.assertTrue(dequeued_pending_response.delivered)
+        self.assertEqual(bytes(dequeued_pending_response.payload), b'payload')
+
+        oldest_pending_response.refresh_from_db()
+        self.assertTrue(oldest_pending_response.delivered)
+        self.assertIsNone(oldest_pending_response.payload)
+        newer_pending_response.refresh_from_db()
+        self.assertFalse(newer_pending_response.delivered)
+
+    def test_that_undeliver_reverts_dequeue(self):
+        pending_response = self._store_pending_response(payload=b'payload')
+
+        dequeued_pending_response = PendingResponse.objects.dequeue(self.PROVIDER_PUBLIC_KEY)
+        PendingResponse.objects.undeliver(dequeued_pending_response)
+
+        pending_response.refresh_from_db()
+        self.assertFalse(pending_response.delivered)
+        self.assertEqual(bytes(pending_response.payload), b'payload')
+        self.assertEqual(PendingResponse.objects.dequeue(self.PROVIDER_PUBLIC_KEY).pk, pending_response.pk)
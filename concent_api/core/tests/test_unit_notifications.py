@@ -0,0 +1,105 @@
+from base64 import b64encode
+import os
+
+import mock
+from django.test import TestCase
+
+from core.notifications import SharedPendingResponseListener
+from core.notifications import SharedPendingResponseSubscription
+
+
+class SharedPendingResponseListenerTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_public_key = b'\x01' * 64
+        self.different_client_public_key = b'\x02' * 64
+        self.listener = SharedPendingResponseListener()
+        patcher = mock.patch.object(self.listener, '_start_listener_if_needed')
+        self.addCleanup(patcher.stop)
+        self.start_listener_mock = patcher.start()
+
+    def test_that_subscribing_starts_listener(self):
+        self.listener.subscribe(self.client_public_key)
+
+        self.start_listener_mock.assert_called_once_with()
+
+    def test_that_notification_wakes_up_only_subscribers_of_notified_client(self):
+        event = self.listener.subscribe(self.client_public_key)
+        other_event = self.listener.subscribe(self.different_client_public_key)
+
+        self.listener.dispatch_notification(b64encode(self.client_public_key).decode())
+
+        self.assertTrue(event.is_set())
+        self.assertFalse(other_event.is_set())
+
+    def test_that_unsubscribed_event_is_not_set(self):
+        event = self.listener.subscribe(self.client_public_key)
+        self.listener.unsubscribe(self.client_public_key, event)
+
+        self.listener.dispatch_notification(b64encode(self.client_public_key).decode())
+
+        self.assertFalse(event.is_set())
+
+    def test_that_broken_connection_wakes_up_all_subscribers(self):
+        event = self.listener.subscribe(self.client_public_key)
+        other_event = self.listener.subscribe(self.different_client_public_key)
+        raw_connection = mock.Mock()
+
+        with mock.patch('core.notifications.select.select', side_effect=OSError):
+            self.listener._dispatch_notifications(raw_connection)  # pylint: disable=protected-access
+
+        self.assertTrue(event.is_set())
+        self.assertTrue(other_event.is_set())
+        raw_connection.close.assert_called_once_with()
+
+
+class SharedPendingResponseListenerRestartTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client_public_key = b'\x01' * 64
+        self.listener = SharedPendingResponseListener()
+        self.listener._listener_process_id = os.getpid()  # pylint: disable=protected-access
+        self.event = self.listener.subscribe(self.client_public_key)
+        self.listener._listener_process_id = None  # pylint: disable=protected-access
+
+    def _start_listener(self):
+        with mock.patch('core.notifications.connections'), \
+                mock.patch('core.notifications.Thread'):
+            self.listener._start_listener_if_needed()  # pylint: disable=protected-access
+
+    def test_that_subscriptions_are_kept_when_listener_is_restarted_in_the_same_process(self):
+        self._start_listener()
+
+        self.listener.dispatch_notification(b64encode(self.client_public_key).decode())
+
+        self.assertTrue(self.event.is_set())
+
+    def test_that_subscriptions_inherited_from_parent_process_are_discarded(self):
+        self.listener._subscriptions_process_id = os.getpid() + 1  # pylint: disable=protected-access
+
+        self._start_listener()
+
+        self.listener.dispatch_notification(b64encode(self.client_public_key).decode())
+
+        self.assertFalse(self.event.is_set())
+
+
+class SharedPendingResponseSubscriptionTestCase(TestCase):
+
+    def test_that_connections_to_all_databases_are_closed_before_waiting(self):
+        listener = SharedPendingResponseListener()
+        control_connection = mock.Mock(in_atomic_block=False)
+        storage_connection = mock.Mock(in_atomic_block=False)
+
+        with mock.patch('core.notifications.shared_pending_response_listener', listener), \
+                mock.patch.object(listener, '_start_listener_if_needed'), \
+                mock.patch('core.notifications.connections') as connections_mock:
+            connections_mock.all.return_value = [control_connection, storage_connection]
+            with SharedPendingResponseSubscription(b'\x01' * 64) as subscription:
+                is_notified = subscription.wait(0)
+
+        self.assertFalse(is_notified)
+        control_connection.close.assert_called_once_with()
+        storage_connection.close.assert_called_once_with()
@@ -0,0 +1,38 @@
+import mock
+from constance import config
+from constance.test import override_config
+from django.test import TestCase
+
+from core.runtime_switches import get_runtime_switch
+from core.runtime_switches import is_soft_shutdown_mode_enabled
+from core.runtime_switches import runtime_switches_cache
+
+
+class RuntimeSwitchesTestCase(TestCase):
+
+    multi_db = True
+
+    def setUp(self):
+        super().setUp()
+        runtime_switches_cache.clear()
+
+    @override_config(SOFT_SHUTDOWN_MODE=True)
+    def test_that_soft_shutdown_mode_is_read_from_config(self):
+        self.assertTrue(is_soft_shutdown_mode_enabled())
+
+    @override_config(SOFT_SHUTDOWN_MODE=False)
+    def test_that_cached_value_is_returned_without_reading_config(self):
+        self.assertFalse(get_runtime_switch('SOFT_SHUTDOWN_MODE'))
+
+        with mock.patch('core.runtime_switches.config') as config_mock:
+            self.assertFalse(get_runtime_switch('SOFT_SHUTDOWN_MODE'))
+
+        self.assertEqual(config_mock.mock_calls, [])
+
+    @override_config(SOFT_SHUTDOWN_MODE=False)
+    def test_that_changing_config_invalidates_cached_value(self):
+        self.assertFalse(is_soft_shutdown_mode_enabled())
+
+        config.SOFT_SHUTDOWN_MODE = True
+
+        self.assertTrue(is_soft_shutdown_mode_enabled())
@@ -1,17 +1,32 @@
+from threading import Event
+from threading import Thread
+from threading import Timer
 import uuid
 
+import mock
 import pytest
 from assertpy import assert_that
 from django.conf import settings
+from django.db import connections
+from django.db import transaction
 from django.test import override_settings
+from freezegun import freeze_time
 
 from common.helpers import parse_timestamp_to_utc_datetime
+from common.metrics import subtask_lock_counters
+from common.metrics import subtask_lock_wait_histograms
 from core.message_handlers import store_message
 from core.message_handlers import store_subtask
 from core.models import Client
+from core.models import PendingResponse
 from core.models import Subtask
+from core.subtask_helpers import _update_timed_out_subtask
 from core.subtask_helpers import get_one_or_none
+from core.subtask_helpers import get_subtask_lock_key
 from core.subtask_helpers import is_state_transition_possible
+from core.subtask_helpers import lock_subtask
+from core.subtask_helpers import update_all_timed_out_subtasks_of_a_client
+from core.subtask_helpers import update_timed_out_subtasks
 from core.tests.utils import ConcentIntegrationTestCase
 from core.utils import hex_to_bytes_convert
 from core.utils import is_protocol_version_compatible
@@ -83,6 +98,141 @@ class TestGetOneOrNoneSubtaskFromDatabase(ConcentIntegrationTestCase):
         self.assertIsNone(subtask)
 
 
+class TestUpdateTimedOutSubtasks(ConcentIntegrationTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.compute_task_def = self._get_deserialized_compute_task_def()
+
+        self.task_to_compute = self._get_deserialized_task_to_compute(
+            compute_task_def=self.compute_task_def,
+        )
+        self.report_computed_task = self._get_deserialized_report_computed_task(
+            task_to_compute=self.task_to_compute,
+        )
+        self.next_deadline = int(self.task_to_compute.compute_task_def['deadline']) + settings.CONCENT_MESSAGING_TIME
+
+        self.subtask = store_subtask(
+            task_id=self.task_to_compute.compute_task_def['task_id'],
+            subtask_id=self.task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=self.next_deadline,
+            task_to_compute=self.task_to_compute,
+            report_computed_task=self.report_computed_task,
+        )
+
+    def test_that_timed_out_subtask_is_moved_to_passive_state_and_pending_responses_are_stored(self) -> None:
+        with freeze_time(parse_timestamp_to_utc_datetime(self.next_deadline + 1)):
+            number_of_processed_subtasks = update_timed_out_subtasks(10)
+
+        self.subtask.refresh_from_db()
+        self.assertEqual(number_of_processed_subtasks, 1)
+        self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.REPORTED)
+        self.assertEqual(PendingResponse.objects.filter(subtask=self.subtask).count(), 2)
+
+    def test_that_subtask_which_is_not_timed_out_is_not_updated(self) -> None:
+        with freeze_time(parse_timestamp_to_utc_datetime(self.next_deadline - 1)):
+            number_of_processed_subtasks = update_timed_out_subtasks(10)
+
+        self.subtask.refresh_from_db()
+        self.assertEqual(number_of_processed_subtasks, 0)
+        self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.FORCING_REPORT)
+        self.assertFalse(PendingResponse.objects.filter(subtask=self.subtask).exists())
+
+    def test_that_subtask_which_fails_to_be_updated_does_not_prevent_updating_other_subtasks(self) -> None:
+        task_to_compute = self._get_deserialized_task_to_compute(
+            compute_task_def=self._get_deserialized_compute_task_def(
+                deadline=int(self.task_to_compute.compute_task_def['deadline']) + 1,
+            ),
+        )
+        other_subtask = store_subtask(
+            task_id=task_to_compute.compute_task_def['task_id'],
+            subtask_id=task_to_compute.compute_task_def['subtask_id'],
+            provider_public_key=self.PROVIDER_PUBLIC_KEY,
+            requestor_public_key=self.REQUESTOR_PUBLIC_KEY,
+            state=Subtask.SubtaskState.FORCING_REPORT,
+            next_deadline=self.next_deadline + 1,
+            task_to_compute=task_to_compute,
+            report_computed_task=self._get_deserialized_report_computed_task(task_to_compute=task_to_compute),
+        )
+
+        def update_subtask_or_fail(subtask):
+            if subtask.pk == self.subtask.pk:
+                raise ValueError('Failure')
+            _update_timed_out_subtask(subtask)
+
+        with freeze_time(parse_timestamp_to_utc_datetime(self.next_deadline + 2)), \
+                mock.patch('core.subtask_helpers._update_timed_out_subtask', side_effect=update_subtask_or_fail), \
+                mock.patch('core.subtask_helpers.log') as log_mock:
+            number_of_processed_subtasks = update_timed_out_subtasks(10)
+
+        self.subtask.refresh_from_db()
+        other_subtask.refresh_from_db()
+        self.assertEqual(number_of_processed_subtasks, 1)
+        self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.FORCING_REPORT)
+        self.assertEqual(other_subtask.state_enum, Subtask.SubtaskState.REPORTED)
+        self.assertFalse(PendingResponse.objects.filter(subtask=self.subtask).exists())
+        log_mock.assert_called_once()
+
+    def test_that_subtask_already_processed_by_sweeper_is_not_updated_again_when_client_polls(self) -> None:
+        with freeze_time(parse_timestamp_to_utc_datetime(self.next_deadline + 1)):
+            update_timed_out_subtasks(10)
+            update_all_timed_out_subtasks_of_a_client(self.PROVIDER_PUBLIC_KEY)
+
+        self.subtask.refresh_from_db()
+        self.assertEqual(self.subtask.state_enum, Subtask.SubtaskState.REPORTED)
+        self.assertEqual(PendingResponse.objects.filter(subtask=self.subtask).count(), 2)
+
+
+class TestLockSubtask(ConcentIntegrationTestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        subtask_lock_counters.clear()
+        subtask_lock_wait_histograms.clear()
+        self.subtask_id = str(uuid.uuid4())
+
+    def _hold_lock_in_another_transaction(self, lock_taken: Event, release_lock: Event) -> None:
+        try:
+            with transaction.atomic(using='control'):
+                with connections['control'].cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [get_subtask_lock_key(self.subtask_id)])
+                lock_taken.set()
+                release_lock.wait(timeout=10)
+        finally:
+            connections['control'].close()
+
+    def test_that_lock_key_is_the_same_for_the_same_subtask_id_and_fits_in_bigint(self) -> None:
+        lock_key = get_subtask_lock_key(self.subtask_id)
+
+        self.assertEqual(lock_key, get_subtask_lock_key(self.subtask_id))
+        self.assertNotEqual(lock_key, get_subtask_lock_key(str(uuid.uuid4())))
+        self.assertTrue(-2 ** 63 <= lock_key < 2 ** 63)
+
+    def test_that_lock_which_is_not_held_is_taken_without_waiting(self) -> None:
+        lock_subtask(self.subtask_id)
+
+        self.assertEqual(subtask_lock_counters.get_snapshot(), {('false',): 1})
+        self.assertEqual(subtask_lock_wait_histograms.get_snapshot(), {})
+
+    def test_that_lock_held_by_another_transaction_is_waited_for_and_recorded_as_contended(self) -> None:
+        lock_taken = Event()
+        release_lock = Event()
+        thread = Thread(target=self._hold_lock_in_another_transaction, args=(lock_taken, release_lock))
+        thread.start()
+        self.assertTrue(lock_taken.wait(timeout=10))
+
+        Timer(0.2, release_lock.set).start()
+        lock_subtask(self.subtask_id)
+        thread.join()
+
+        self.assertEqual(subtask_lock_counters.get_snapshot(), {('true',): 1})
+        self.assertEqual(subtask_lock_wait_histograms.get_snapshot()[()]['count'], 1)
+
+
 class TestAreAllStoredMessagesCompatibleWithProtocolVersion(ConcentIntegrationTestCase):
 
     def setUp(self) -> None:
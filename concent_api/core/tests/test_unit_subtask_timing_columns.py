@@ -1,4 +1,5 @@
 from assertpy import assert_that
+import mock
 from django.conf import settings
 from django.test import override_settings
 import pytest
@@ -27,11 +28,14 @@ def store_report_computed_task_as_subtask(report_computed_task):
     )
 
 
-class TestSubtaskWithTimingColumnsManagerQuerySet():
+class TestSubtaskTimingColumns():
     @pytest.fixture(autouse=True)
     def setUp(self):
         self.report_computed_task = ReportComputedTaskFactory()
+
+    def _store_and_get_subtask(self):
         store_report_computed_task_as_subtask(self.report_computed_task)
+        return Subtask.objects.get(subtask_id=self.report_computed_task.task_to_compute.subtask_id)
 
     @pytest.mark.django_db
     @pytest.mark.parametrize(
@@ -56,8 +60,7 @@ class TestSubtaskWithTimingColumnsManagerQuerySet():
         ):
             subtask_verification_time = calculate_subtask_verification_time(self.report_computed_task)
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).subtask_verification_time
+                self._store_and_get_subtask().subtask_verification_time
             ).is_equal_to(
                 subtask_verification_time
             )
@@ -72,8 +75,7 @@ class TestSubtaskWithTimingColumnsManagerQuerySet():
         ):
             subtask_verification_time = calculate_subtask_verification_time(self.report_computed_task)
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).subtask_verification_time
+                self._store_and_get_subtask().subtask_verification_time
             ).is_equal_to(
                 subtask_verification_time
             )
@@ -104,8 +106,7 @@ class TestSubtaskWithTimingColumnsManagerQuerySet():
                 rate=settings.MINIMUM_UPLOAD_RATE,
             )
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).maximum_download_time
+                self._store_and_get_subtask().maximum_download_time
             ).is_equal_to(
                 maximum_download_deadline
             )
@@ -121,8 +122,7 @@ class TestSubtaskWithTimingColumnsManagerQuerySet():
                 rate=settings.MINIMUM_UPLOAD_RATE,
             )
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).maximum_download_time
+                self._store_and_get_subtask().maximum_download_time
             ).is_equal_to(
                 maximum_download_deadline
             )
@@ -148,31 +148,31 @@ class TestSubtaskWithTimingColumnsManagerQuerySet():
             CONCENT_MESSAGING_TIME=concent_messaging_time,
             CUSTOM_PROTOCOL_TIMES=custom_protocol_times,
         ):
+            subtask = self._store_and_get_subtask()
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).download_deadline
+                subtask.download_deadline
             ).is_equal_to(
-                parse_datetime_to_timestamp(
-                    Subtask.objects_with_timing_columns.get(
-                        subtask_id=self.report_computed_task.task_to_compute.subtask_id
-                    ).computation_deadline
-                ) + Subtask.objects_with_timing_columns.get(
-                    subtask_id=self.report_computed_task.task_to_compute.subtask_id
-                ).subtask_verification_time,
+                parse_datetime_to_timestamp(subtask.computation_deadline) + subtask.subtask_verification_time,
             )
 
     @pytest.mark.django_db
     def test_that_download_deadline_query_gives_correct_value_without_protocol_custom_times(self):
         with override_settings(CUSTOM_PROTOCOL_TIMES=False):
+            subtask = self._store_and_get_subtask()
             assert_that(
-                Subtask.objects_with_timing_columns.
-                get(subtask_id=self.report_computed_task.task_to_compute.subtask_id).download_deadline
+                subtask.download_deadline
             ).is_equal_to(
-                parse_datetime_to_timestamp(
-                    Subtask.objects_with_timing_columns.get(
-                        subtask_id=self.report_computed_task.task_to_compute.subtask_id
-                    ).computation_deadline
-                ) + Subtask.objects_with_timing_columns.get(
-                    subtask_id=self.report_computed_task.task_to_compute.subtask_id
-                ).subtask_verification_time,
+                parse_datetime_to_timestamp(subtask.computation_deadline) + subtask.subtask_verification_time,
             )
+
+    @pytest.mark.django_db
+    def test_that_timing_columns_are_not_computed_again_when_report_computed_task_does_not_change(self):
+        subtask = self._store_and_get_subtask()
+        subtask.state = Subtask.SubtaskState.FAILED.name  # pylint: disable=no-member
+        subtask.next_deadline = None
+
+        with mock.patch('core.models.calculate_subtask_verification_time') as calculate_subtask_verification_time_mock:
+            subtask.full_clean()
+            subtask.save()
+
+        calculate_subtask_verification_time_mock.assert_not_called()
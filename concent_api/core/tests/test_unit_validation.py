@@ -27,7 +27,9 @@ from core.subtask_helpers import are_keys_and_addresses_unique_in_message_subtas
 from core.subtask_helpers import are_subtask_results_accepted_messages_signed_by_the_same_requestor
 from core.tests.utils import ConcentIntegrationTestCase
 from core.tests.utils import generate_uuid_for_tests
+from core.validation import is_golem_message_signed_with_key
 from core.validation import validate_all_messages_identical
+from core.validation import verified_signatures_cache
 from core.validation import validate_compute_task_def
 from core.validation import validate_ethereum_addresses
 from core.validation import validate_frames
@@ -62,6 +64,37 @@ class TestValidateGolemMessageSubtaskResultsRejected(TestCase):
             validate_golem_message_subtask_results_rejected(subtask_results_rejected)
 
 
+class TestIsGolemMessageSignedWithKey(TestCase):
+
+    def setUp(self):
+        verified_signatures_cache.clear()
+        (self.private_key, self.public_key) = generate_ecc_key_pair()
+        (_, self.different_public_key) = generate_ecc_key_pair()
+        self.task_to_compute = sign_message(TaskToComputeFactory(), self.private_key)
+
+    def test_that_successful_verification_is_cached(self):
+        self.assertTrue(is_golem_message_signed_with_key(self.public_key, self.task_to_compute))
+
+        with mock.patch.object(TaskToCompute, 'verify_signature') as verify_signature_mock:
+            self.assertTrue(is_golem_message_signed_with_key(self.public_key, self.task_to_compute))
+
+        verify_signature_mock.assert_not_called()
+        self.assertEqual(verified_signatures_cache.hits, 1)
+
+    def test_that_failed_verification_is_not_cached(self):
+        self.assertFalse(is_golem_message_signed_with_key(self.different_public_key, self.task_to_compute))
+        self.assertFalse(is_golem_message_signed_with_key(self.different_public_key, self.task_to_compute))
+
+        self.assertEqual(len(verified_signatures_cache), 0)
+
+    def test_that_cached_verification_is_not_used_for_different_public_key_or_modified_message(self):
+        self.assertTrue(is_golem_message_signed_with_key(self.public_key, self.task_to_compute))
+
+        self.assertFalse(is_golem_message_signed_with_key(self.different_public_key, self.task_to_compute))
+        self.task_to_compute.price += 1
+        self.assertFalse(is_golem_message_signed_with_key(self.public_key, self.task_to_compute))
+
+
 class ValidatorsTest(TestCase):
     def test_that_function_raises_exception_when_ethereum_addres_has_wrong_type(self):
         with self.assertRaises(ConcentValidationError):
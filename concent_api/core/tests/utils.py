@@ -56,6 +56,7 @@ from core.models import DepositAccount
 from core.models import PendingResponse
 from core.models import StoredMessage
 from core.models import Subtask
+from core.runtime_switches import runtime_switches_cache
 from core.utils import calculate_concent_verification_time
 from core.utils import calculate_maximum_download_time
 from core.utils import generate_uuid
@@ -82,6 +83,9 @@ class ConcentIntegrationTestCase(TestCase):
     def setUp(self):
         super().setUp()
 
+        # Values of constance config options cached by previous tests could be rolled back in the database.
+        runtime_switches_cache.clear()
+
         # Keys
         (self.PROVIDER_PRIVATE_KEY,                 self.PROVIDER_PUBLIC_KEY)               = generate_ecc_key_pair()
         (self.REQUESTOR_PRIVATE_KEY,                self.REQUESTOR_PUBLIC_KEY)              = generate_ecc_key_pair()
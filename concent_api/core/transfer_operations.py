@@ -21,6 +21,8 @@ from core.models import Client
 from core.models import PaymentInfo
 from core.models import PendingResponse
 from core.models import Subtask
+from core.notifications import notify_about_new_pending_response
+from core.response_builders import build_pending_response_payload
 from core.utils import calculate_maximum_download_time
 from core.utils import calculate_subtask_verification_time
 
@@ -72,6 +74,7 @@ def store_pending_message(
             queue=queue.name,
             subtask=subtask,
         )
+        receive_queue.payload = build_pending_response_payload(receive_queue, client_public_key)
         receive_queue.full_clean()
         receive_queue.save()
         if payment_message is not None:
@@ -86,6 +89,7 @@ def store_pending_message(
             )
             payment_committed_message.full_clean()
             payment_committed_message.save()
+        notify_about_new_pending_response(client_public_key)
     except IntegrityError:
         raise CreateModelIntegrityError
 
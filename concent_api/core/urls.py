@@ -1,6 +1,8 @@
 from django.conf.urls import url
 
 from .views import receive
+from .views import receive_batch
+from .views import receive_long_poll
 from .views import send
 from .views import protocol_constants
 
@@ -8,5 +10,7 @@ urlpatterns = [
     url(r'^send/$', send, name='send'),
     url(r'^receive/$', receive, name='receive'),
     url(r'^receive-out-of-band/$', receive, name='receive_out_of_band'),
+    url(r'^receive-batch/$', receive_batch, name='receive_batch'),
+    url(r'^receive-long-poll/$', receive_long_poll, name='receive_long_poll'),
     url(r'^protocol-constants/$', protocol_constants, name='protocol_constants'),
 ]
@@ -13,8 +13,10 @@ from golem_messages.exceptions import MessageError
 from golem_messages.message.tasks import RejectReportComputedTask
 from golem_messages.message.tasks import ReportComputedTask
 
+from common.caches import LRUCache
 from common.constants import ErrorCode
 from common.exceptions import ConcentValidationError
+from common.helpers import get_message_field_accessors
 from common.logging import log
 from common.logging import LoggingLevel
 from common.validations import validate_secure_hash_algorithm
@@ -23,6 +25,7 @@ from core.constants import ETHEREUM_ADDRESS_LENGTH
 from core.constants import GOLEM_PUBLIC_KEY_HEX_LENGTH
 from core.constants import GOLEM_PUBLIC_KEY_LENGTH
 from core.constants import MESSAGE_TASK_ID_MAX_LENGTH
+from core.constants import SIGNATURE_VERIFICATION_CACHE_SIZE
 from core.constants import SCENE_FILE_EXTENSION
 from core.exceptions import FrameNumberValidationError
 from core.exceptions import Http400
@@ -32,6 +35,8 @@ from core.utils import hex_to_bytes_convert
 
 logger = getLogger(__name__)
 
+verified_signatures_cache = LRUCache(SIGNATURE_VERIFICATION_CACHE_SIZE)
+
 
 def validate_value_is_int_convertible_and_positive(value: int) -> None:
     """
@@ -132,10 +137,15 @@ def validate_all_messages_identical(golem_messages_list: List[message.Message])
     assert len(set(type(golem_message) for golem_message in golem_messages_list)) == 1
 
     base_golem_message = golem_messages_list[0]
+    accessors = get_message_field_accessors(type(base_golem_message))
+    base_slot_values = accessors.get_slot_values(base_golem_message)
 
     for i, golem_message in enumerate(golem_messages_list[1:], start=1):
-        for slot in base_golem_message.__slots__:
-            if getattr(base_golem_message, slot) != getattr(golem_message, slot):
+        slot_values = accessors.get_slot_values(golem_message)
+        if slot_values == base_slot_values:
+            continue
+        for slot, base_slot_value, slot_value in zip(accessors.slots, base_slot_values, slot_values):
+            if base_slot_value != slot_value:
                 raise ConcentValidationError(
                     '{} messages are not identical. '
                     'There is a difference between messages with index 0 on passed list and with index {}'
@@ -143,8 +153,8 @@ def validate_all_messages_identical(golem_messages_list: List[message.Message])
                         type(base_golem_message).__name__,
                         i,
                         slot,
-                        getattr(base_golem_message, slot),
-                        getattr(golem_message, slot),
+                        base_slot_value,
+                        slot_value,
                     ),
                     error_code=ErrorCode.MESSAGES_NOT_IDENTICAL,
                 )
@@ -166,7 +176,15 @@ def is_golem_message_signed_with_key(
     validate_bytes_public_key(public_key, 'public_key')
 
     try:
+        # Only successful verifications are cached. The key contains hash of signed data (header and payload),
+        # the signature itself and the public key so a cache hit means that exactly this verification has already passed.
+        cache_key = (golem_message.get_short_hash(), golem_message.sig, public_key) if golem_message.sig is not None else None
+        if cache_key is not None and verified_signatures_cache.get(cache_key) is not None:
+            return True
+
         is_valid = golem_message.verify_signature(public_key)
+        if is_valid and cache_key is not None:
+            verified_signatures_cache.set(cache_key, True)
     except MessageError as exception:
         is_valid = False
         log(
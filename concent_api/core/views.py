@@ -1,4 +1,6 @@
 from logging import getLogger
+from typing import List
+from typing import Optional
 from typing import Union
 
 from django.conf import settings
@@ -13,13 +15,18 @@ from golem_messages.message import Message
 
 from common import logging
 from common.decorators import provides_concent_feature
+from common.profiling import profile_phase
 from core.decorators import handle_errors_and_responses
 from core.decorators import log_communication
 from core.decorators import require_golem_auth_message
 from core.decorators import require_golem_message
 from core.decorators import validate_protocol_version_in_core
+from core.constants import MAXIMUM_NUMBER_OF_MESSAGES_IN_RECEIVE_BATCH
+from core.message_handlers import handle_batch_of_messages_from_database
 from core.message_handlers import handle_message
 from core.message_handlers import handle_messages_from_database
+from core.message_handlers import handle_messages_from_database_with_long_polling
+from core.metrics import get_metrics_in_prometheus_text_format
 from core.subtask_helpers import pre_process_message_related_subtasks
 from core.subtask_helpers import update_all_timed_out_subtasks_of_a_client
 
@@ -37,14 +44,16 @@ logger = getLogger(__name__)
 def send(_request: HttpRequest, client_message: Message, client_public_key: bytes) -> Union[Message, HttpResponse]:
     assert isinstance(client_public_key, bytes) or client_public_key is None
     if client_public_key is not None:
-        pre_process_message_related_subtasks(client_message, client_public_key)
+        with profile_phase('pre_process_subtasks'):
+            pre_process_message_related_subtasks(client_message, client_public_key)
     logging.log_message_received(
         logger,
         client_message,
         client_public_key,
     )
 
-    return handle_message(client_message)
+    with profile_phase('handle_message'):
+        return handle_message(client_message)
 
 
 @provides_concent_feature('concent-api')
@@ -55,11 +64,59 @@ def send(_request: HttpRequest, client_message: Message, client_public_key: byte
 @handle_errors_and_responses(database_name='control')
 @transaction.non_atomic_requests(using='control')
 def receive(_request: HttpRequest, _message: Message, _client_public_key: bytes) -> Union[Message, HttpResponse]:
+    assert isinstance(_message.client_public_key, bytes)
+    with profile_phase('update_timed_out_subtasks'):
+        update_all_timed_out_subtasks_of_a_client(
+            client_public_key=_message.client_public_key,
+        )
+    with profile_phase('handle_message'):
+        return handle_messages_from_database(client_public_key=_message.client_public_key)
+
+
+@provides_concent_feature('concent-api')
+@csrf_exempt
+@require_POST
+@require_golem_auth_message
+@validate_protocol_version_in_core
+@handle_errors_and_responses(database_name='control')
+@transaction.non_atomic_requests(using='control')
+@transaction.non_atomic_requests(using='storage')
+def receive_long_poll(_request: HttpRequest, _message: Message, _client_public_key: bytes) -> Union[Message, HttpResponse]:
+    """
+    Works like `receive` but if the queue is empty, the request is held for up to LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME
+    seconds and the message is returned as soon as it is queued.
+    """
     assert isinstance(_message.client_public_key, bytes)
     update_all_timed_out_subtasks_of_a_client(
         client_public_key=_message.client_public_key,
     )
-    return handle_messages_from_database(client_public_key=_message.client_public_key)
+    return handle_messages_from_database_with_long_polling(
+        client_public_key=_message.client_public_key,
+        maximum_wait_time=settings.LONG_POLLING_RECEIVE_MAXIMUM_WAIT_TIME,
+    )
+
+
+@provides_concent_feature('concent-api')
+@csrf_exempt
+@require_POST
+@require_golem_auth_message
+@validate_protocol_version_in_core
+@handle_errors_and_responses(database_name='control')
+@transaction.non_atomic_requests(using='control')
+def receive_batch(_request: HttpRequest, _message: Message, _client_public_key: bytes) -> Optional[List[Message]]:
+    """
+    Works like `receive` but returns up to MAXIMUM_NUMBER_OF_MESSAGES_IN_RECEIVE_BATCH pending messages at once.
+    Each message is signed and encrypted separately and the response body is their concatenation,
+    with every message preceded by its length (see `pack_serialized_messages_into_batch()`).
+    """
+    assert isinstance(_message.client_public_key, bytes)
+    update_all_timed_out_subtasks_of_a_client(
+        client_public_key=_message.client_public_key,
+    )
+    return handle_batch_of_messages_from_database(
+        client_public_key=_message.client_public_key,
+        maximum_number_of_messages=MAXIMUM_NUMBER_OF_MESSAGES_IN_RECEIVE_BATCH,
+    )
 
 
 @require_GET
@@ -74,3 +131,13 @@ def protocol_constants(_request: HttpRequest) -> JsonResponse:
             'payment_due_time': settings.PAYMENT_DUE_TIME,
         }
     )
+
+
+@provides_concent_feature('metrics')
+@require_GET
+def metrics(_request: HttpRequest) -> HttpResponse:
+    """ Endpoint which returns metrics of this Concent instance in Prometheus text exposition format. """
+    return HttpResponse(
+        get_metrics_in_prometheus_text_format(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
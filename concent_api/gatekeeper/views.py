@@ -19,6 +19,7 @@ from golem_messages.shortcuts import load
 
 from common import logging
 from common.constants import ErrorCode
+from common.decorators import enforce_query_budget
 from common.decorators import provides_concent_feature
 from common.helpers import get_current_utc_timestamp
 from common.validations import validate_file_transfer_token
@@ -33,6 +34,7 @@ logger = getLogger(__name__)
 @csrf_exempt
 @require_POST
 @validate_protocol_version_in_gatekeeper
+@enforce_query_budget
 def upload(request: HttpRequest) -> JsonResponse:
     logging.log_request_received(
         logger,
@@ -66,6 +68,7 @@ def upload(request: HttpRequest) -> JsonResponse:
 @csrf_exempt
 @require_safe
 @validate_protocol_version_in_gatekeeper
+@enforce_query_budget
 def download(request: HttpRequest) -> JsonResponse:
     logging.log_request_received(
         logger,